@@ -1,10 +1,25 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { useRouter } from 'next/router';
 import Head from 'next/head';
 import LoadingSpinner from '../components/LoadingSpinner';
 import Layout from '../components/Layout';
 
 const API_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8002';
+const MAX_SUBMIT_RETRIES = 3;
+
+// crypto.randomUUID only exists in secure contexts (https or localhost)
+function newRequestId() {
+  if (typeof crypto !== 'undefined' && crypto.randomUUID) {
+    return crypto.randomUUID();
+  }
+  const bytes = new Uint8Array(16);
+  if (typeof crypto !== 'undefined' && crypto.getRandomValues) {
+    crypto.getRandomValues(bytes);
+  } else {
+    for (let i = 0; i < bytes.length; i++) bytes[i] = Math.floor(Math.random() * 256);
+  }
+  return Array.from(bytes, b => b.toString(16).padStart(2, '0')).join('');
+}
 
 export default function Quiz() {
   const router = useRouter();
@@ -18,6 +33,9 @@ export default function Quiz() {
   const [error, setError] = useState(null);
   const [loadingStatus, setLoadingStatus] = useState('Initializing...');
   const [retryCount, setRetryCount] = useState(0);
+  const [questionBankVersion, setQuestionBankVersion] = useState(null);
+  // Lets the backend start generating before the last answer; sent again with the submit
+  const speculationId = useRef(null);
 
   const fetchQuestions = async () => {
     try {
@@ -36,6 +54,7 @@ export default function Quiz() {
       }
       
       setQuestions(data.questions);
+      setQuestionBankVersion(data.version || null);
       setIsLoading(false);
       setError(null);
     } catch (error) {
@@ -79,14 +98,44 @@ export default function Quiz() {
     setSelectedOption(option);
   };
 
+  const formatUserInfo = () => ({
+    company_name: userInfo.companyName,
+    website_url: userInfo.websiteUrl,
+    name: userInfo.name,
+    role: userInfo.role || null
+  });
+
+  const formatAnswers = (answerMap) => Object.entries(answerMap).map(([id, answer]) => ({
+    question_id: parseInt(id),
+    answer
+  }));
+
+  // Best effort: a failed or skipped speculation only means the submit generates as usual
+  const speculate = (answerMap) => {
+    if (!speculationId.current) {
+      speculationId.current = newRequestId();
+    }
+    fetch(`${API_URL}/api/speculate`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({
+        speculation_id: speculationId.current,
+        user_info: formatUserInfo(),
+        answers: formatAnswers(answerMap)
+      })
+    }).catch(() => {});
+  };
+
   const handleNext = () => {
     if (!selectedOption) return;
 
     // Save answer
-    setAnswers({
+    const updatedAnswers = {
       ...answers,
       [questions[currentQuestionIndex].id]: selectedOption
-    });
+    };
+    setAnswers(updatedAnswers);
+    speculate(updatedAnswers);
 
     // Move to next question or submit if last
     if (currentQuestionIndex < questions.length - 1) {
@@ -103,32 +152,50 @@ export default function Quiz() {
       setLoadingStatus('Submitting answers...');
       
       // Transform userInfo to match backend expectations
-      const formattedUserInfo = {
-        company_name: userInfo.companyName,
-        website_url: userInfo.websiteUrl,
-        name: userInfo.name,
-        role: userInfo.role || null
-      };
-      
-      const response = await fetch(`${API_URL}/api/submit-quiz`, {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({
-          user_info: formattedUserInfo,
-          answers: Object.entries(answers).map(([id, answer]) => ({
-            question_id: parseInt(id),
-            answer
-          }))
-        })
+      const body = JSON.stringify({
+        user_info: formatUserInfo(),
+        question_bank_version: questionBankVersion,
+        speculation_id: speculationId.current,
+        answers: formatAnswers(answers)
       });
 
+      // One key for every retry of this submission, so the server runs the pipeline once
+      const idempotencyKey = newRequestId();
+
+      // The server sheds load with 503 + Retry-After; wait as told and try again.
+      // Network errors are retried too: the key makes a repeated POST safe.
+      let response;
+      for (let attempt = 0; ; attempt++) {
+        try {
+          response = await fetch(`${API_URL}/api/submit-quiz`, {
+            method: 'POST',
+            headers: {
+              'Content-Type': 'application/json',
+              'Idempotency-Key': idempotencyKey,
+            },
+            body
+          });
+        } catch (networkError) {
+          if (attempt >= MAX_SUBMIT_RETRIES) {
+            throw networkError;
+          }
+          setLoadingStatus('Connection lost, retrying...');
+          await new Promise(resolve => setTimeout(resolve, 2000 * (attempt + 1)));
+          continue;
+        }
+        if (response.status !== 503 || attempt >= MAX_SUBMIT_RETRIES) {
+          break;
+        }
+        const retryAfter = parseInt(response.headers.get('Retry-After'), 10) || 5;
+        setLoadingStatus('Server is busy, retrying shortly...');
+        await new Promise(resolve => setTimeout(resolve, Math.min(retryAfter, 30) * 1000));
+      }
+
       const data = await response.json();
       console.log('Quiz submission response:', data);
 
       if (!data.success) {
-        throw new Error(data.error || 'Submission failed');
+        throw new Error(data.error || data.detail || 'Submission failed');
       }
 
       // Store results in localStorage
@@ -2,6 +2,8 @@ import { useState, useEffect } from 'react';
 import { useRouter } from 'next/router';
 import Head from 'next/head';
 
+const API_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8002';
+
 export default function Scripts() {
   const router = useRouter();
   const [results, setResults] = useState(null);
@@ -10,6 +12,8 @@ export default function Scripts() {
   const [copyStatus, setCopyStatus] = useState('');
   const [email, setEmail] = useState('');
   const [emailSent, setEmailSent] = useState(false);
+  const [scriptStatus, setScriptStatus] = useState('');
+  const [regenerating, setRegenerating] = useState('');
 
   useEffect(() => {
     // Get results from local storage
@@ -24,16 +28,76 @@ export default function Scripts() {
     setIsLoading(false);
   }, [router]);
 
+  // Results generated in lazy mode carry ideas only; write each script when it is opened
+  useEffect(() => {
+    if (!results || !results.result_id || !results.ideas || results.scripts[activeScriptIndex]) {
+      return;
+    }
+    let cancelled = false;
+    setScriptStatus('Writing this script...');
+    fetch(`${API_URL}/api/results/${results.result_id}/scripts/${activeScriptIndex}`)
+      .then(response => {
+        if (!response.ok) {
+          throw new Error('Script generation failed');
+        }
+        return response.json();
+      })
+      .then(script => {
+        if (cancelled) return;
+        const scripts = [...results.scripts];
+        scripts[activeScriptIndex] = script;
+        const updated = { ...results, scripts };
+        setResults(updated);
+        localStorage.setItem('quizResults', JSON.stringify(updated));
+        setScriptStatus('');
+      })
+      .catch(() => {
+        if (!cancelled) setScriptStatus('Could not write this script. Refresh the page to try again.');
+      });
+    return () => { cancelled = true; };
+  }, [results, activeScriptIndex]);
+
+  const activeScript = results && results.scripts ? results.scripts[activeScriptIndex] : null;
+
+  // Replace only the disliked script or idea; the rest of the results stay as they are
+  const handleRegenerate = (target) => {
+    if (!results || !results.result_id || regenerating) return;
+    const index = activeScriptIndex;
+    setRegenerating(target);
+    fetch(`${API_URL}/api/results/${results.result_id}/ideas/${index}/regenerate?target=${target}`, { method: 'POST' })
+      .then(response => {
+        if (!response.ok) {
+          throw new Error('Regeneration failed');
+        }
+        return response.json();
+      })
+      .then(data => {
+        const ideas = [...results.ideas];
+        ideas[index] = { ...ideas[index], ...data.idea, description: data.idea.concept };
+        const scripts = [...results.scripts];
+        scripts[index] = data.script;
+        const updated = { ...results, ideas, scripts };
+        setResults(updated);
+        localStorage.setItem('quizResults', JSON.stringify(updated));
+      })
+      .catch(() => {
+        setCopyStatus('Could not regenerate. Please try again.');
+        setTimeout(() => setCopyStatus(''), 3000);
+      })
+      .finally(() => setRegenerating(''));
+  };
+
   const handleCopyScript = () => {
+    if (!activeScript) return;
     const scriptText = `
 CONTENT:
-${results.scripts[activeScriptIndex].content}
+${activeScript.content}
 
 DELIVERY NOTES:
-${results.scripts[activeScriptIndex].delivery_notes}
+${activeScript.delivery_notes}
 
 EDITING NOTES:
-${results.scripts[activeScriptIndex].editing_notes}
+${activeScript.editing_notes}
 `;
 
     navigator.clipboard.writeText(scriptText)
@@ -150,24 +214,43 @@ ${results.scripts[activeScriptIndex].editing_notes}
           <div className="mb-6">
             <h5 className="font-semibold text-[#2C3E50] mb-2">Script Content:</h5>
             <div className="bg-[#F8F9FA] p-4 rounded-lg text-[#2C3E50] mb-4 whitespace-pre-wrap">
-              {results.scripts[activeScriptIndex].content}
+              {activeScript ? activeScript.content : scriptStatus}
             </div>
           </div>
           
           <div className="mb-6">
             <h5 className="font-semibold text-[#2C3E50] mb-2">Delivery Notes:</h5>
             <div className="bg-[#F8F9FA] p-4 rounded-lg text-[#2C3E50] mb-4">
-              {results.scripts[activeScriptIndex].delivery_notes}
+              {activeScript && activeScript.delivery_notes}
             </div>
           </div>
           
           <div className="mb-8">
             <h5 className="font-semibold text-[#2C3E50] mb-2">Editing Notes:</h5>
             <div className="bg-[#F8F9FA] p-4 rounded-lg text-[#2C3E50]">
-              {results.scripts[activeScriptIndex].editing_notes}
+              {activeScript && activeScript.editing_notes}
             </div>
           </div>
           
+          {results.result_id && (
+            <div className="flex gap-4 mb-4">
+              <button
+                onClick={() => handleRegenerate('script')}
+                disabled={!!regenerating}
+                className="flex-1 border border-[#2C3E50] text-[#2C3E50] py-3 px-6 rounded-lg font-medium hover:bg-[#F8F9FA] transition-colors duration-300 disabled:opacity-50"
+              >
+                {regenerating === 'script' ? 'Rewriting...' : 'Regenerate Script'}
+              </button>
+              <button
+                onClick={() => handleRegenerate('idea')}
+                disabled={!!regenerating}
+                className="flex-1 border border-[#2C3E50] text-[#2C3E50] py-3 px-6 rounded-lg font-medium hover:bg-[#F8F9FA] transition-colors duration-300 disabled:opacity-50"
+              >
+                {regenerating === 'idea' ? 'Thinking...' : 'New Idea'}
+              </button>
+            </div>
+          )}
+
           <button
             onClick={handleCopyScript}
             className="w-full bg-[#2C3E50] text-white py-3 px-6 rounded-lg font-medium text-lg hover:bg-[#1a2530] transition-colors duration-300 focus:outline-none focus:ring-2 focus:ring-offset-2 focus:ring-[#2C3E50] mb-4"
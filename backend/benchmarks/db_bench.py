@@ -0,0 +1,159 @@
+"""
+Write/read throughput benchmark for the quiz result schema.
+
+Each "submission" writes the same row tree as a real quiz submission
+(user, quiz result, shared company row, script result, 5 ideas, 5 scripts).
+Writers run concurrently while readers load recent results, so the
+numbers reflect reader/writer contention as well as raw insert speed.
+
+Usage:
+    python benchmarks/db_bench.py --writers 8 --submissions 200 --readers 2
+    python benchmarks/db_bench.py --profile default   # stock SQLite for comparison
+    python benchmarks/db_bench.py --url postgresql+psycopg2://...  # any backend
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from database import Base, create_db_engine, get_pool_stats
+from models.models import User, QuizResult, VideoIdea, Script, ScriptResult
+from services.company_store import upsert_company
+
+SCRIPT_BODY = (
+    "**Hook:** Stop scrolling - this changes how your team ships.\n"
+    "**Main Points:**\n- Point one with supporting detail\n- Point two\n- Point three\n"
+    "**Call to Action:** Book a demo today.\n**Signature Move:** Whiteboard slam.\n"
+) * 8
+
+def write_submission(session, writer_id: int, n: int):
+    """Insert one full submission tree in a single transaction"""
+    user = User(name=f"bench-{writer_id}-{n}", company_name="Acme", website_url="https://acme.test")
+    session.add(user)
+    session.flush()
+    session.add(QuizResult(
+        user_id=user.id,
+        answers=[{"question_id": q, "answer": "A"} for q in range(1, 6)],
+        matched_influencer="Gary"
+    ))
+    user.company = upsert_company(session, "Acme", "https://acme.test", [f"Acme point {i}" for i in range(5)])
+    result = ScriptResult(user_id=user.id, influencer="Gary", influencer_style="Motivational")
+    session.add(result)
+    session.flush()
+    for i in range(5):
+        idea = VideoIdea(script_result_id=result.id, title=f"Idea {i}", description="Concept")
+        session.add(idea)
+        session.flush()
+        session.add(Script(
+            video_idea_id=idea.id,
+            content=SCRIPT_BODY,
+            delivery_notes="High energy",
+            editing_notes="Fast cuts"
+        ))
+    session.commit()
+
+def run(url: str, profile: str, writers: int, submissions: int, readers: int) -> dict:
+    engine = create_db_engine(url, profile=profile)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+    stats = {"writes": 0, "write_errors": 0, "reads": 0}
+    lock = threading.Lock()
+    writers_done = threading.Event()
+
+    def writer(writer_id: int):
+        session = Session()
+        try:
+            for n in range(submissions):
+                try:
+                    write_submission(session, writer_id, n)
+                    with lock:
+                        stats["writes"] += 1
+                except OperationalError:
+                    session.rollback()
+                    with lock:
+                        stats["write_errors"] += 1
+        finally:
+            session.close()
+
+    def reader():
+        session = Session()
+        try:
+            while not writers_done.is_set():
+                rows = (
+                    session.query(ScriptResult)
+                    .order_by(ScriptResult.id.desc())
+                    .limit(20)
+                    .all()
+                )
+                for row in rows:
+                    _ = row.influencer
+                session.rollback()  # End the read transaction so WAL can checkpoint
+                with lock:
+                    stats["reads"] += 1
+        finally:
+            session.close()
+
+    reader_threads = [threading.Thread(target=reader) for _ in range(readers)]
+    writer_threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+
+    start = time.perf_counter()
+    for t in reader_threads + writer_threads:
+        t.start()
+    for t in writer_threads:
+        t.join()
+    write_elapsed = time.perf_counter() - start
+    writers_done.set()
+    for t in reader_threads:
+        t.join()
+    pool_stats = get_pool_stats(engine)
+    engine.dispose()
+
+    return {
+        "profile": profile,
+        "writes": stats["writes"],
+        "write_errors": stats["write_errors"],
+        "writes_per_sec": stats["writes"] / write_elapsed if write_elapsed else 0.0,
+        "reads_per_sec": stats["reads"] / write_elapsed if write_elapsed else 0.0,
+        "elapsed": write_elapsed,
+        "pool": pool_stats,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark quiz result writes/reads")
+    parser.add_argument("--url", help="Database URL (defaults to a fresh temporary SQLite file)")
+    parser.add_argument("--profile", choices=["production", "default", "both"], default="both")
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--submissions", type=int, default=100, help="Submissions per writer")
+    parser.add_argument("--readers", type=int, default=2)
+    args = parser.parse_args()
+
+    profiles = ["default", "production"] if args.profile == "both" else [args.profile]
+    for profile in profiles:
+        if args.url:
+            url = args.url
+        else:
+            tmpdir = tempfile.mkdtemp(prefix="quiz-bench-")
+            url = f"sqlite:///{os.path.join(tmpdir, 'bench.db')}"
+        result = run(url, profile, args.writers, args.submissions, args.readers)
+        print(
+            f"{result['profile']:>10}: {result['writes']} submissions in {result['elapsed']:.2f}s "
+            f"({result['writes_per_sec']:.1f} writes/s, {result['reads_per_sec']:.1f} reads/s, "
+            f"{result['write_errors']} lock errors)"
+        )
+        pool = result["pool"]
+        if "checkouts" in pool:
+            print(
+                f"{'':>10}  pool: {pool['checkouts']} checkouts, max wait {pool['max_wait_seconds'] * 1000:.1f}ms, "
+                f"{pool['timeouts']} timeouts"
+            )
+
+if __name__ == "__main__":
+    main()
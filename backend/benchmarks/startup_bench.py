@@ -0,0 +1,107 @@
+"""
+Cold-start benchmark for the API.
+
+Measures, each in a fresh interpreter:
+  - import time of `main` (what every worker pays before serving anything)
+  - time to first request: from spawning uvicorn until GET / answers 200
+
+Usage:
+    python benchmarks/startup_bench.py --runs 5
+    python benchmarks/startup_bench.py --auto-migrate       # include schema migration on start-up
+    python benchmarks/startup_bench.py --top-imports 15     # slowest modules by cumulative import time
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+
+def _env(database_url: str, auto_migrate: bool) -> dict:
+    env = dict(os.environ)
+    env.update({
+        "DATABASE_URL": database_url,
+        "AUTO_MIGRATE": "true" if auto_migrate else "false",
+        "LOG_LEVEL": "WARNING",
+    })
+    return env
+
+def measure_import(env: dict) -> float:
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def measure_first_request(env: dict, timeout: float = 30.0) -> float:
+    port = _free_port()
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.005)
+        raise RuntimeError(f"Server did not answer within {timeout:.0f}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+def top_imports(env: dict, count: int):
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), name.strip()))
+    # Top-level packages only; nested entries are already included in their parents
+    top_level = sorted((row for row in rows if "." not in row[1]), reverse=True)[:count]
+    print("\nSlowest top-level imports:")
+    for cumulative, name in top_level:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure API import time and time to first request")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--url", default=None, help="DATABASE_URL to start against (default: throwaway SQLite file)")
+    parser.add_argument("--auto-migrate", action="store_true", help="Run schema migration on start-up")
+    parser.add_argument("--top-imports", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = _env(args.url or f"sqlite:///{os.path.join(tmp, 'startup.db')}", args.auto_migrate)
+        env["SHARED_CACHE_PATH"] = os.path.join(tmp, "shared_cache.db")
+
+        imports = [measure_import(env) for _ in range(args.runs)]
+        first_requests = [measure_first_request(env) for _ in range(args.runs)]
+
+        print(f"import main:          median {statistics.median(imports) * 1000:7.1f} ms  (min {min(imports) * 1000:.1f}, max {max(imports) * 1000:.1f})")
+        print(f"time to first request: median {statistics.median(first_requests) * 1000:7.1f} ms  (min {min(first_requests) * 1000:.1f}, max {max(first_requests) * 1000:.1f})")
+
+        if args.top_imports:
+            top_imports(env, args.top_imports)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+"""
+Process-wide configuration, loaded once.
+
+Importing this module reads `.env` into the environment (the only
+load_dotenv call in the app). Modules keep reading their own settings with
+os.getenv at import time, after importing this module; settings used in more
+than one module live here.
+"""
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEEPSEEK_API_KEY = os.getenv("DEEPSEEK_API_KEY")
+DEEPSEEK_API_URL = os.getenv("DEEPSEEK_API_URL", "https://api.deepseek.com/chat/completions")
+# Per-call limit, so a stalled DeepSeek call fails even where no request deadline applies (batch, CLI)
+DEEPSEEK_TIMEOUT_SECONDS = float(os.getenv("DEEPSEEK_TIMEOUT_SECONDS", "60"))
+
+# Run schema migrations when the app starts instead of as a separate step
+AUTO_MIGRATE = os.getenv("AUTO_MIGRATE", "false").lower() in ("1", "true", "yes")
@@ -1,17 +1,177 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, exc, inspect, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+import logging
 import os
-from dotenv import load_dotenv
+import threading
+import time
 
 # Load environment variables
-load_dotenv()
+import config  # noqa: F401  Loads .env before the settings below are read
+
+logger = logging.getLogger(__name__)
+
+# How often a running API process picks up dictionaries trained by maintenance.py
+COMPRESSION_DICTIONARY_REFRESH_SECONDS = float(os.getenv("COMPRESSION_DICTIONARY_REFRESH_SECONDS", "300"))
 
 # Get database URL from environment or use default
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./quiz_app.db")
 
+# SQLite profile: "production" applies WAL + tuned pragmas, "default" leaves SQLite stock
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "production")
+
+# Pragmas applied to every new SQLite connection in the production profile
+SQLITE_PRAGMAS = {
+    "auto_vacuum": "INCREMENTAL",  # Only takes effect on a new database; lets retention reclaim space in steps
+    "journal_mode": "WAL",  # Readers no longer block the writer (and vice versa)
+    "synchronous": "NORMAL",  # Safe with WAL; fsync only at checkpoints
+    "cache_size": -int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536")),  # Negative value = KiB
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    "temp_store": "MEMORY",
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "wal_autocheckpoint": int(os.getenv("SQLITE_WAL_AUTOCHECKPOINT", "1000")),
+}
+
+# Persistent, database-level settings: setting them takes a lock, so they are
+# only written when the stored value differs (normally once, on a new file)
+PERSISTENT_PRAGMAS = ("auto_vacuum", "journal_mode")
+AUTO_VACUUM_MODES = {"0": "NONE", "1": "FULL", "2": "INCREMENTAL"}
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """Apply the production pragmas when the pool opens a new connection"""
+    cursor = dbapi_connection.cursor()
+    try:
+        # busy_timeout first, so the remaining pragmas wait for locks instead of failing
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_PRAGMAS['busy_timeout']}")
+        for name, value in SQLITE_PRAGMAS.items():
+            if name in PERSISTENT_PRAGMAS:
+                current = str(cursor.execute(f"PRAGMA {name}").fetchone()[0])
+                if AUTO_VACUUM_MODES.get(current, current).upper() == str(value).upper():
+                    continue
+            elif name == "busy_timeout":
+                continue
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+# Pool sizing per backend; DB_POOL_SIZE / DB_MAX_OVERFLOW override either one.
+# SQLite has a single writer, so a large pool only adds lock contention.
+BACKEND_POOL_DEFAULTS = {
+    "sqlite": {"pool_size": 5, "max_overflow": 10},
+    "postgresql": {"pool_size": 10, "max_overflow": 20},
+    "mysql": {"pool_size": 10, "max_overflow": 20},
+}
+
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "15000"))
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long checkouts wait for a free connection"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            with self._stats_lock:
+                self.checkouts += 1
+                self.total_wait += waited
+                self.max_wait = max(self.max_wait, waited)
+
+def _pool_settings(backend: str) -> dict:
+    defaults = BACKEND_POOL_DEFAULTS.get(backend, {"pool_size": 5, "max_overflow": 10})
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": int(os.getenv("DB_POOL_SIZE", defaults["pool_size"])),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", defaults["max_overflow"])),
+        "pool_timeout": DB_POOL_TIMEOUT,
+    }
+
+def _statement_timeout_args(backend: str, driver: str) -> dict:
+    """Driver connect_args that cap how long a single statement may run"""
+    if not DB_STATEMENT_TIMEOUT_MS:
+        return {}
+    if backend == "postgresql" and driver in ("psycopg2", "psycopg"):
+        return {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+    if backend == "mysql" and driver in ("pymysql", "mysqldb"):
+        return {"init_command": f"SET SESSION max_execution_time={DB_STATEMENT_TIMEOUT_MS}"}
+    return {}
+
+def _create_sqlite_engine(url, profile: str):
+    database = url.database
+    in_memory = not database or database == ":memory:"
+
+    if profile != "production" or in_memory:
+        return create_engine(url, connect_args={"check_same_thread": False})
+
+    # A file-backed database can be shared by a real pool of connections; the
+    # busy timeout makes concurrent writers queue up instead of failing fast.
+    sqlite_engine = create_engine(
+        url,
+        connect_args={
+            "check_same_thread": False,
+            "timeout": SQLITE_PRAGMAS["busy_timeout"] / 1000,
+        },
+        **_pool_settings("sqlite")
+    )
+    event.listen(sqlite_engine, "connect", _apply_sqlite_pragmas)
+    return sqlite_engine
+
+def create_db_engine(url: str = DATABASE_URL, profile: str = SQLITE_PROFILE):
+    """Create an engine for `url` with settings suited to its backend"""
+    parsed_url = make_url(url)
+    backend = parsed_url.get_backend_name()
+    if backend == "sqlite":
+        return _create_sqlite_engine(parsed_url, profile)
+
+    # Server databases: pre-ping drops connections the server closed while idle,
+    # recycle keeps them younger than typical server/proxy idle timeouts.
+    return create_engine(
+        parsed_url,
+        connect_args=_statement_timeout_args(backend, parsed_url.get_driver_name()),
+        pool_pre_ping=True,
+        pool_recycle=DB_POOL_RECYCLE,
+        **_pool_settings(backend)
+    )
+
+def get_pool_stats(bind=None) -> dict:
+    """Snapshot of connection pool usage for the debug and metrics endpoints"""
+    pool = (bind or engine).pool
+    stats = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+        })
+    if isinstance(pool, InstrumentedQueuePool):
+        stats.update({
+            "checkouts": pool.checkouts,
+            "timeouts": pool.timeouts,
+            "total_wait_seconds": round(pool.total_wait, 6),
+            "max_wait_seconds": round(pool.max_wait, 6),
+        })
+    return stats
+
 # Create SQLAlchemy engine
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+engine = create_db_engine(DATABASE_URL)
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -19,10 +179,37 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 # Create Base class
 Base = declarative_base()
 
+def _sync_schema(bind):
+    """Add nullable columns and indexes that create_all skips on existing tables"""
+    inspector = inspect(bind)
+    for table in Base.metadata.sorted_tables:
+        existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing_columns or column.primary_key or not column.nullable:
+                continue
+            column_type = column.type.compile(dialect=bind.dialect)
+            with bind.begin() as connection:
+                connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+        for index in table.indexes:
+            index.create(bind=bind, checkfirst=True)
+
 # Initialize database
 def init_db():
     import models.models  # Import models to register them
     Base.metadata.create_all(bind=engine)
+    _sync_schema(engine)
+    load_compression_dictionaries()
+
+def load_compression_dictionaries():
+    """Register stored compression dictionaries (start-up, periodic refresh, CLIs)"""
+    from models.compressed import load_dictionaries
+    try:
+        count = load_dictionaries(engine)
+    except Exception as e:
+        # Before the first migration the table does not exist yet; values are compressed without one
+        logger.warning(f"⚠️ Compression dictionaries not loaded: {e}")
+        return
+    logger.debug(f"Loaded {count} compression dictionaries")
 
 # Dependency to get DB session
 def get_db():
@@ -30,4 +217,4 @@ def get_db():
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
@@ -0,0 +1,29 @@
+import argparse
+import sys
+from datetime import datetime
+from services.exporter import stream_export, EXPORT_FORMATS
+
+def main():
+    """
+    Export quiz and script history:
+        python export_history.py --format csv --since 2024-01-01 -o history.csv
+    """
+    parser = argparse.ArgumentParser(description="Export quiz and script history")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="ndjson")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="Inclusive start (ISO date/time)")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="Exclusive end (ISO date/time)")
+    parser.add_argument("--influencer", help="Only results matched to this influencer")
+    parser.add_argument("-o", "--output", help="Output file (defaults to stdout)")
+    args = parser.parse_args()
+
+    chunks = stream_export(args.format, since=args.since, until=args.until, influencer=args.influencer)
+    output = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        for chunk in chunks:
+            output.write(chunk)
+    finally:
+        if args.output:
+            output.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,13 @@
-from database import Base, engine
-from models.models import User, QuizResult, CompanyData, VideoIdea, Script, ScriptResult
+from database import init_db as sync_schema
 
 def init_db():
     """
-    Initialize the database by creating all tables.
+    Create missing tables, columns and indexes. Run this as a deploy step
+    before starting the API (or set AUTO_MIGRATE=true to run it on start-up).
     """
     print("Creating database tables...")
-    Base.metadata.create_all(bind=engine)
+    sync_schema()
     print("Database initialized successfully!")
 
 if __name__ == "__main__":
-    init_db() 
\ No newline at end of file
+    init_db()
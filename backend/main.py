@@ -1,50 +1,67 @@
-from fastapi import FastAPI, HTTPException, Request
+import config  # Loads .env once, before any module reads its settings
+from fastapi import FastAPI, HTTPException, Request, Header
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, HttpUrl
 from typing import List, Optional, Dict, Any
-import os
 import asyncio
-from dotenv import load_dotenv
-from services.scraper import scrape_company_data, normalize_url
-from services.script_generator import (
-    generate_video_ideas, 
-    generate_script,
-    generate_scripts_parallel,
-    generate_all_content  # Add this import
+from contextlib import asynccontextmanager
+from services.scraper import normalize_url
+from services.question_bank import questions_response
+from services import shared_cache
+from services.pipeline import company_cache_key, get_company_summary, run_submission
+from services import speculation, negative_cache
+from services.script_store import script_prefetch_supervisor
+from services.idempotency import (
+    load_response, save_response, request_fingerprint, IdempotencyKeyMismatch, MAX_KEY_LENGTH
+)
+from routers import results_router, export_router, stats_router, batch_router
+from database import (
+    init_db, engine, SessionLocal, get_pool_stats,
+    load_compression_dictionaries, COMPRESSION_DICTIONARY_REFRESH_SECONDS
 )
-from services.influencer_matcher import match_influencer
-from database import init_db
+from fastapi.responses import PlainTextResponse, ORJSONResponse
 import logging
-import time
-from contextlib import asynccontextmanager
-from utils.timing import Timer
+from utils.metrics import CallbackCounter, Gauge, render_metrics
+from utils.tracing import Span, TRACE_HEADER, parse_traceparent, shutdown_tracing
+from utils.http_compression import CompressionMiddleware
+from utils.admission import admit_pipeline
+from utils import deadline as request_deadline
+from utils.task_supervisor import prefetch_supervisor
+from utils.logging_config import configure_logging
 
-# Configure logging with more detail
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Queue-backed logging; levels and sampling come from LOG_* environment variables
+configure_logging()
 logger = logging.getLogger(__name__)
 
-# Add this after the logging configuration
-@asynccontextmanager
-async def time_endpoint(name: str):
-    """Async context manager for timing endpoint execution"""
-    start = time.time()
-    try:
-        yield
-    finally:
-        duration = time.time() - start
-        logger.info(f"⏱️ {name} took {duration:.2f} seconds")
+async def _refresh_compression_dictionaries():
+    """Pick up dictionaries trained since start-up, outside any request's flush"""
+    while True:
+        await asyncio.sleep(COMPRESSION_DICTIONARY_REFRESH_SECONDS)
+        await asyncio.to_thread(load_compression_dictionaries)
 
-# Load environment variables
-load_dotenv()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema changes are an explicit step (python init_db.py) unless AUTO_MIGRATE is set
+    if config.AUTO_MIGRATE:
+        await asyncio.to_thread(init_db)
+    else:
+        await asyncio.to_thread(load_compression_dictionaries)
+    refresher = asyncio.create_task(_refresh_compression_dictionaries())
+    yield
+    refresher.cancel()
+    # Let background work finish (or cancel it) before tearing anything down
+    await asyncio.gather(
+        prefetch_supervisor.shutdown(),
+        speculation.speculation_supervisor.shutdown(),
+        script_prefetch_supervisor.shutdown(),
+        negative_cache.probe_supervisor.shutdown()
+    )
+    # Export buffered spans and close pooled connections before the worker exits
+    await asyncio.to_thread(shutdown_tracing)
+    engine.dispose()
 
 # Initialize FastAPI app
-app = FastAPI(title="Viral Tech Video Script Generator API")
-
-# Initialize database
-init_db()
+app = FastAPI(title="Viral Tech Video Script Generator API", lifespan=lifespan)
 
 # Configure CORS - allow all origins during development
 app.add_middleware(
@@ -53,15 +70,39 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[TRACE_HEADER, "Retry-After", "Idempotent-Replayed"],
 )
 
-# Debug middleware
+# gzip/brotli for large JSON bodies (thresholds in utils/http_compression.py)
+app.add_middleware(CompressionMiddleware)
+
+app.include_router(results_router.router, prefix="/api")
+app.include_router(export_router.router, prefix="/api")
+app.include_router(stats_router.router, prefix="/api")
+app.include_router(batch_router.router, prefix="/api")
+
+# Every request runs inside a root span; the trace id is returned so a slow
+# submission can be looked up in the exported traces
+@app.middleware("http")
+async def tracing_middleware(request: Request, call_next):
+    trace_id, parent_id = parse_traceparent(request.headers.get("traceparent"))
+    async with Span(
+        f"{request.method} {request.url.path}",
+        trace_id=trace_id,
+        parent_id=parent_id,
+        **{"http.method": request.method, "http.route": request.url.path}
+    ) as request_span:
+        response = await call_next(request)
+        request_span.set_attribute("http.status_code", response.status_code)
+    response.headers[TRACE_HEADER] = request_span.trace_id
+    return response
+
+# Request logging middleware (DEBUG only; uvicorn already writes access logs)
 @app.middleware("http")
 async def debug_middleware(request: Request, call_next):
-    print(f"Incoming request: {request.method} {request.url}")
-    print(f"Headers: {request.headers}")
     response = await call_next(request)
-    print(f"Response status: {response.status_code}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"{request.method} {request.url.path} -> {response.status_code}")
     return response
 
 # Health check endpoint
@@ -72,7 +113,18 @@ async def root():
 # Debug endpoint
 @app.get("/debug")
 async def debug():
-    return {"status": "ok", "message": "Debug endpoint reached"}
+    return {"status": "ok", "message": "Debug endpoint reached", "db_pool": get_pool_stats()}
+
+# Connection pool metrics, read from the pool counters at scrape time
+Gauge("quiz_db_pool_checked_out", "Connections currently checked out", lambda: get_pool_stats()["checked_out"])
+Gauge("quiz_db_pool_overflow", "Connections open beyond pool_size", lambda: get_pool_stats()["overflow"])
+CallbackCounter("quiz_db_pool_checkouts_total", "Connection checkouts since start", lambda: get_pool_stats()["checkouts"])
+CallbackCounter("quiz_db_pool_wait_seconds_total", "Total time spent waiting for a connection", lambda: get_pool_stats()["total_wait_seconds"])
+
+# Prometheus scrape endpoint
+@app.get("/metrics")
+async def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
 
 # Models
 class CompanyInfo(BaseModel):
@@ -93,8 +145,13 @@ class QuizResult(BaseModel):
     user_info: UserInfo
     answers: List[QuizAnswer]
 
-# Cache for company data
-company_data_cache = {}
+# How long a finished response stays in the shared cache for duplicates still in flight
+IDEMPOTENCY_INFLIGHT_SECONDS = 300
+# A failed response only needs to outlive the poll of duplicates waiting on other workers
+IDEMPOTENCY_FAILURE_SECONDS = 5
+# Suggested back-off for a duplicate that ran out of deadline while the first run was going
+IDEMPOTENCY_RETRY_AFTER_SECONDS = 5
+IDEMPOTENT_REPLAY_HEADER = "Idempotent-Replayed"
 
 @app.post("/api/pre-fetch-company")
 async def pre_fetch_company(company_info: CompanyInfo):
@@ -102,145 +159,166 @@ async def pre_fetch_company(company_info: CompanyInfo):
     try:
         # Normalize URL
         normalized_url = normalize_url(company_info.website_url)
-        cache_key = f"{company_info.name}:{normalized_url}"
+        cache_key = company_cache_key(normalized_url)
 
-        # Check cache first
-        if cache_key in company_data_cache:
+        # Check the cache shared by all workers first
+        if await asyncio.to_thread(shared_cache.get, cache_key) is not None:
             return {"status": "cached", "message": "Company data already fetched"}
 
-        # Start fetching in background
-        company_data_cache[cache_key] = asyncio.create_task(
-            scrape_company_data(company_info.name, normalized_url)
-        )
+        if await asyncio.to_thread(shared_cache.is_claimed, cache_key):
+            return {"status": "fetching", "message": "Company data is already being fetched"}
 
-        return {"status": "fetching", "message": "Started fetching company data"}
+        # Fetch in the background; the submit picks the result up from the shared cache
+        outcome = prefetch_supervisor.submit(
+            cache_key, lambda: get_company_summary(company_info.name, normalized_url)
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    if outcome == "rejected":
+        # Best effort only: the submit will scrape if the pre-fetch never ran
+        raise HTTPException(
+            status_code=503,
+            detail="Too many pre-fetches in progress, please retry",
+            headers={"Retry-After": str(max(1, int(prefetch_supervisor.timeout)))}
+        )
+    if outcome == "duplicate":
+        return {"status": "fetching", "message": "Company data is already being fetched"}
+    if outcome == "queued":
+        return {"status": "fetching", "message": "Queued fetching company data"}
+    return {"status": "fetching", "message": "Started fetching company data"}
+
+class SpeculationRequest(BaseModel):
+    speculation_id: str
+    user_info: Dict[str, Any]
+    answers: List[Dict[str, Any]] = []
+    script_mode: Optional[str] = None  # Same as the submit's, so its content can be adopted
+
+@app.post("/api/speculate")
+async def speculate(request: SpeculationRequest):
+    """
+    Start generating from the answers given so far. Pass the same
+    speculation_id in the final submit-quiz body to adopt the result.
+    """
+    if not 0 < len(request.speculation_id) <= speculation.MAX_SPECULATION_ID_LENGTH:
+        raise HTTPException(status_code=400, detail=f"speculation_id must be 1-{speculation.MAX_SPECULATION_ID_LENGTH} characters")
+    status = await speculation.speculate(request.speculation_id, request.user_info, request.answers, request.script_mode)
+    return {"status": status}
+
 # Routes
 @app.get("/api/quiz-questions")
-async def get_quiz_questions():
+async def get_quiz_questions(request: Request):
+    return questions_response(request.headers.get("if-none-match"), request.headers.get("accept-encoding"))
+
+def _load_idempotent_response(key: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+    db = SessionLocal()
     try:
-        return {
-            "questions": [
-                {
-                    "id": 1,
-                    "text": "What's your industry?",
-                    "options": [
-                        {"value": "A", "text": "Tech"},
-                        {"value": "B", "text": "SaaS"},
-                        {"value": "C", "text": "E-commerce"},
-                        {"value": "D", "text": "Finance"},
-                        {"value": "E", "text": "Healthcare"},
-                        {"value": "F", "text": "Education"},
-                        {"value": "G", "text": "Other"}
-                    ]
-                },
-                {
-                    "id": 2,
-                    "text": "How would you describe your communication style?",
-                    "options": [
-                        {"value": "A", "text": "Direct and bold"},
-                        {"value": "B", "text": "Analytical and methodical"},
-                        {"value": "C", "text": "Storytelling and relatable"},
-                        {"value": "D", "text": "Humorous and entertaining"},
-                        {"value": "E", "text": "Casual and conversational"}
-                    ]
-                },
-                {
-                    "id": 3,
-                    "text": "What's your approach to content creation?",
-                    "options": [
-                        {"value": "A", "text": "High-energy and attention-grabbing"},
-                        {"value": "B", "text": "Educational and informative"},
-                        {"value": "C", "text": "Thought-provoking and insightful"},
-                        {"value": "D", "text": "Authentic and personal"},
-                        {"value": "E", "text": "Quick and to-the-point"}
-                    ]
-                },
-                {
-                    "id": 4,
-                    "text": "What do you value most in content?",
-                    "options": [
-                        {"value": "A", "text": "Entertainment value"},
-                        {"value": "B", "text": "Practical usefulness"},
-                        {"value": "C", "text": "Emotional connection"},
-                        {"value": "D", "text": "Unique perspective"},
-                        {"value": "E", "text": "Clear communication"}
-                    ]
-                },
-                {
-                    "id": 5,
-                    "text": "How would you handle talking about technical details?",
-                    "options": [
-                        {"value": "A", "text": "Simplify with analogies and examples"},
-                        {"value": "B", "text": "Deep dive into the specifics"},
-                        {"value": "C", "text": "Focus on benefits and outcomes"},
-                        {"value": "D", "text": "Use humor to make it digestible"},
-                        {"value": "E", "text": "Compare with familiar concepts"}
-                    ]
-                }
-            ]
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        return load_response(db, key, fingerprint)
+    finally:
+        db.close()
 
-# Replace the old time_endpoint with Timer usage
-@app.post("/api/submit-quiz")
-async def submit_quiz(quiz_data: dict):
+def _store_idempotent_response(key: str, fingerprint: str, response: Dict[str, Any]):
+    db = SessionLocal()
     try:
-        # Validate required fields
-        if not quiz_data.get("user_info"):
-            raise ValueError("Missing user_info in request")
-            
-        user_info = quiz_data["user_info"]
-        required_fields = ["company_name", "website_url"]
-        missing_fields = [field for field in required_fields if not user_info.get(field)]
-        
-        if missing_fields:
-            raise ValueError(f"Missing required fields: {', '.join(missing_fields)}")
-        
-        start_time = time.time()
-        
-        # Step 1: Get company data
-        async with Timer("Company data scraping") as scraping_timer:
-            company_data = await scrape_company_data(
-                quiz_data["user_info"]["company_name"],
-                quiz_data["user_info"]["website_url"]
-            )
-        
-        # Step 2: Generate all content in parallel
-        async with Timer("Content generation") as generation_timer:
-            influencer_style = "Motivational, no-nonsense, action-oriented"
-            
-            # Create one API call that generates both ideas and scripts
-            content = await generate_all_content(
-                influencer_style=influencer_style,
-                industry="Technology",
-                company_data=company_data,
-                num_ideas=5
-            )
-        
-        total_time = time.time() - start_time
-        logger.info(f"✅ Total processing time: {total_time:.2f} seconds")
-        
-        return {
-            "success": True,
-            "influencer": "Gary",  # Change from "Gary Vee" to "Gary" to match frontend
-            "influencer_style": influencer_style,
-            "company_summary": company_data,
-            "ideas": content["ideas"],
-            "scripts": content["scripts"],
-            "timing": {
-                "scraping": round(scraping_timer.duration, 2),
-                "content_generation": round(generation_timer.duration, 2),
-                "total": round(total_time, 2)
-            }
-        }
-        
+        save_response(db, key, fingerprint, response)
     except Exception as e:
-        logger.error(f"❌ Error in submit_quiz: {str(e)}", exc_info=True)
-        return {"success": False, "error": str(e)}
+        db.rollback()
+        logger.error(f"❌ Failed to store idempotent response: {str(e)}", exc_info=True)
+    finally:
+        db.close()
+
+def _idempotent_ttl(entry: Dict[str, Any]) -> float:
+    # The shared cache only bridges in-flight duplicates; the DB keeps the durable copy.
+    # Failures are only kept until waiting duplicates have seen them, so a later retry runs again.
+    return IDEMPOTENCY_INFLIGHT_SECONDS if entry["response"].get("success") else IDEMPOTENCY_FAILURE_SECONDS
+
+async def _submit(quiz_data: dict) -> Dict[str, Any]:
+    """Store adopted speculative content, or run the full pipeline in the admission lane"""
+    speculation_id = quiz_data.get("speculation_id")
+    if speculation_id:
+        try:
+            # Leave the fallback pipeline at least a degraded run's worth of the deadline
+            budget = request_deadline.current().remaining() - request_deadline.MIN_REQUEST_DEADLINE_SECONDS
+            prepared = await asyncio.wait_for(speculation.adopt(speculation_id, quiz_data), max(budget, 0))
+        except asyncio.TimeoutError:
+            prepared = None
+        if prepared is not None:
+            # Only the DB write is left, so this does not take a pipeline slot
+            return await run_submission(quiz_data, prepared=prepared)
+    async with admit_pipeline():
+        return await run_submission(quiz_data)
+
+# Runs in the pipeline admission lane; sheds load with 503 + Retry-After (utils/admission.py)
+@app.post("/api/submit-quiz", response_class=ORJSONResponse)
+async def submit_quiz(
+    quiz_data: dict,
+    idempotency_key: Optional[str] = Header(None),
+    x_request_deadline: Optional[str] = Header(None)
+):
+    """
+    With an Idempotency-Key header, retries of the same submission run the
+    pipeline once: concurrent duplicates wait for the first run and later
+    ones are replayed from the stored response.
+
+    The response arrives within the request deadline (X-Request-Deadline
+    header or `deadline_seconds` field, in seconds; REQUEST_DEADLINE_SECONDS
+    by default), degraded if need be; `timing.degradations` says how.
+    """
+    try:
+        seconds = request_deadline.resolve_seconds(x_request_deadline, quiz_data.get("deadline_seconds"))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    with request_deadline.deadline_scope(seconds):
+        return await _submit_once(quiz_data, idempotency_key)
+
+async def _submit_once(quiz_data: dict, idempotency_key: Optional[str]) -> ORJSONResponse:
+    # Responses are returned as objects so FastAPI skips its generic encoder pass
+    if not idempotency_key:
+        return ORJSONResponse(await _submit(quiz_data))
+
+    if len(idempotency_key) > MAX_KEY_LENGTH:
+        raise HTTPException(status_code=400, detail=f"Idempotency-Key longer than {MAX_KEY_LENGTH} characters")
+
+    fingerprint = request_fingerprint(quiz_data)
+    try:
+        stored = await asyncio.to_thread(_load_idempotent_response, idempotency_key, fingerprint)
+    except IdempotencyKeyMismatch as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if stored is not None:
+        logger.info(f"♻️ Replaying stored response for idempotency key {idempotency_key}")
+        return ORJSONResponse(stored, headers={IDEMPOTENT_REPLAY_HEADER: "true"})
+
+    async def run():
+        # The first run may have finished on another worker since the lookup above
+        stored = await asyncio.to_thread(_load_idempotent_response, idempotency_key, fingerprint)
+        if stored is not None:
+            return {"fingerprint": fingerprint, "response": stored}
+        response = await _submit(quiz_data)
+        if response.get("success"):
+            await asyncio.to_thread(_store_idempotent_response, idempotency_key, fingerprint, response)
+        return {"fingerprint": fingerprint, "response": response}
+
+    # Keyed on the Idempotency-Key alone, so a concurrent request with another body joins and is refused.
+    # Duplicates wait on the first run's lease for at most their own deadline, and never run it again.
+    try:
+        entry = await shared_cache.get_or_compute(
+            f"idempotency:{idempotency_key}",
+            run,
+            ttl_seconds=_idempotent_ttl,
+            wait_seconds=request_deadline.current().remaining()
+        )
+    except IdempotencyKeyMismatch as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=409,
+            detail="A request with this Idempotency-Key is still in progress, retry later",
+            headers={"Retry-After": str(IDEMPOTENCY_RETRY_AFTER_SECONDS)}
+        )
+    if entry["fingerprint"] != fingerprint:
+        raise HTTPException(status_code=422, detail="Idempotency-Key was already used with a different request")
+    return ORJSONResponse(entry["response"])
 
 if __name__ == "__main__":
     import uvicorn
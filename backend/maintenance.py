@@ -0,0 +1,69 @@
+import argparse
+from database import SessionLocal, init_db
+from services.retention import (
+    RETENTION_DAYS,
+    VACUUM_PAGES_PER_BATCH,
+    train_script_dictionary,
+    archive_old_results,
+    enable_incremental_vacuum
+)
+from services.idempotency import IDEMPOTENCY_TTL_HOURS, purge_expired
+
+def main():
+    """
+    Storage maintenance commands:
+        python maintenance.py train-dictionary
+        python maintenance.py archive --days 90
+        python maintenance.py enable-incremental-vacuum
+        python maintenance.py purge-idempotency --hours 24
+    """
+    parser = argparse.ArgumentParser(description="Storage maintenance")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    train = subparsers.add_parser("train-dictionary", help="Train a compression dictionary on stored scripts")
+    train.add_argument("--samples", type=int, default=2000)
+    train.add_argument("--size", type=int, default=16 * 1024, help="Dictionary size in bytes")
+
+    archive = subparsers.add_parser("archive", help="Move old results into archived_results")
+    archive.add_argument("--days", type=int, default=RETENTION_DAYS)
+    archive.add_argument("--batch-size", type=int, default=100)
+    archive.add_argument("--max-batches", type=int, default=None)
+    archive.add_argument("--vacuum-pages", type=int, default=VACUUM_PAGES_PER_BATCH)
+
+    subparsers.add_parser(
+        "enable-incremental-vacuum",
+        help="One-off full VACUUM switching an existing SQLite file to incremental vacuum"
+    )
+
+    purge = subparsers.add_parser("purge-idempotency", help="Delete stored idempotent responses past retention")
+    purge.add_argument("--hours", type=float, default=IDEMPOTENCY_TTL_HOURS)
+
+    args = parser.parse_args()
+    init_db()
+    db = SessionLocal()
+    try:
+        if args.command == "train-dictionary":
+            dictionary = train_script_dictionary(db, args.samples, args.size)
+            if dictionary:
+                print(f"Trained dictionary {dictionary.id} from {dictionary.sample_count} scripts")
+            else:
+                print("Not enough scripts to train a dictionary")
+        elif args.command == "archive":
+            counts = archive_old_results(
+                db,
+                older_than_days=args.days,
+                batch_size=args.batch_size,
+                max_batches=args.max_batches,
+                vacuum_pages=args.vacuum_pages
+            )
+            print(f"Archived {counts['archived']} results in {counts['batches']} batches, removed {counts['users_removed']} users")
+        elif args.command == "enable-incremental-vacuum":
+            enable_incremental_vacuum(db)
+            print("Incremental vacuum enabled")
+        elif args.command == "purge-idempotency":
+            print(f"Purged {purge_expired(db, ttl_hours=args.hours)} idempotency records")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Transparent compression for large text/JSON columns.
+
+Values are stored as bytes with a small header:
+    b"QZ" + codec (1 byte) + dictionary id (4 bytes, 0 = none) + payload
+
+zstandard is used when installed, otherwise zlib with a preset dictionary.
+Rows written before compression existed come back from SQLite as plain
+strings and are passed through unchanged, so no data migration is needed.
+"""
+import json
+import logging
+import os
+import struct
+import threading
+import zlib
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+from sqlalchemy import LargeBinary, text
+from sqlalchemy.types import TypeDecorator
+
+try:
+    import zstandard
+except ImportError:  # Optional dependency
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"QZ"
+HEADER = struct.Struct(">2scI")
+CODEC_RAW = b"r"
+CODEC_ZLIB = b"z"
+CODEC_ZSTD = b"s"
+
+# Values smaller than this are not worth compressing
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "256"))
+COMPRESSION_LEVEL = int(os.getenv("COMPRESSION_LEVEL", "6"))
+# zlib only looks back 32 KiB, so a larger preset dictionary is wasted
+ZLIB_MAX_DICT_BYTES = 32 * 1024
+
+_dictionaries: Dict[int, Tuple[bytes, bytes]] = {}  # id -> (codec, data)
+_active_dictionary_id = 0
+_lock = threading.Lock()
+
+def default_codec() -> bytes:
+    return CODEC_ZSTD if zstandard is not None else CODEC_ZLIB
+
+def register_dictionary(dictionary_id: int, codec: bytes, data: bytes, activate: bool = True):
+    """Make a trained dictionary available for compression/decompression"""
+    global _active_dictionary_id
+    with _lock:
+        _dictionaries[dictionary_id] = (codec, data)
+        if activate and codec == default_codec() and dictionary_id > _active_dictionary_id:
+            _active_dictionary_id = dictionary_id
+
+def load_dictionaries(bind) -> int:
+    """
+    Register every stored dictionary; returns how many. Runs its own query,
+    so call it outside a flush: at start-up, from the refresh loop or a CLI.
+    """
+    with bind.connect() as connection:
+        rows = connection.execute(
+            text("SELECT id, codec, data FROM compression_dictionaries ORDER BY id")
+        ).fetchall()
+    for dictionary_id, codec, data in rows:
+        register_dictionary(dictionary_id, codec.encode(), bytes(data))
+    return len(rows)
+
+def _load_for_read(dictionary_id: int):
+    # A row written by a worker that refreshed sooner than this one
+    from database import engine  # Imported lazily to avoid a cycle with models
+    try:
+        load_dictionaries(engine)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not load compression dictionary {dictionary_id}: {e}")
+
+def compress(data: bytes) -> bytes:
+    """Compress bytes with the active dictionary, if any"""
+    if len(data) < COMPRESSION_MIN_BYTES:
+        return HEADER.pack(MAGIC, CODEC_RAW, 0) + data
+
+    # Only dictionaries already registered are used; loading here would query mid-flush
+    codec = default_codec()
+    dictionary_id = _active_dictionary_id
+    dictionary = _dictionaries[dictionary_id][1] if dictionary_id else None
+
+    if codec == CODEC_ZSTD:
+        zstd_dict = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+        payload = zstandard.ZstdCompressor(level=COMPRESSION_LEVEL, dict_data=zstd_dict).compress(data)
+    elif dictionary:
+        compressor = zlib.compressobj(COMPRESSION_LEVEL, zlib.DEFLATED, 15, 9, zlib.Z_DEFAULT_STRATEGY, dictionary)
+        payload = compressor.compress(data) + compressor.flush()
+    else:
+        payload = zlib.compress(data, COMPRESSION_LEVEL)
+
+    # Keep incompressible values raw rather than paying to decompress them
+    if len(payload) >= len(data):
+        return HEADER.pack(MAGIC, CODEC_RAW, 0) + data
+    return HEADER.pack(MAGIC, codec, dictionary_id) + payload
+
+def decompress(value: bytes) -> bytes:
+    """Reverse compress()"""
+    magic, codec, dictionary_id = HEADER.unpack_from(value)
+    if magic != MAGIC:
+        raise ValueError("Not a compressed value")
+    payload = value[HEADER.size:]
+
+    if codec == CODEC_RAW:
+        return payload
+
+    dictionary = None
+    if dictionary_id:
+        if dictionary_id not in _dictionaries:
+            _load_for_read(dictionary_id)
+        if dictionary_id not in _dictionaries:
+            raise ValueError(f"Unknown compression dictionary {dictionary_id}")
+        dictionary = _dictionaries[dictionary_id][1]
+
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read this value")
+        zstd_dict = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+        return zstandard.ZstdDecompressor(dict_data=zstd_dict).decompress(payload)
+
+    decompressor = zlib.decompressobj(15, dictionary) if dictionary else zlib.decompressobj()
+    return decompressor.decompress(payload) + decompressor.flush()
+
+def is_compressed(value: Any) -> bool:
+    return isinstance(value, (bytes, bytearray, memoryview)) and bytes(value[:2]) == MAGIC
+
+def train_dictionary(samples: List[str], size: int = 16 * 1024) -> Tuple[bytes, bytes]:
+    """
+    Build a dictionary from sample values
+    Returns tuple of (codec, dictionary_bytes)
+    """
+    encoded = [sample.encode("utf-8") for sample in samples if sample]
+    if zstandard is not None:
+        return CODEC_ZSTD, zstandard.train_dictionary(size, encoded).as_bytes()
+
+    # zlib has no trainer: use the most common lines, most frequent last since
+    # deflate finds matches closest to the end of the dictionary cheapest.
+    line_counts = Counter(
+        line for sample in encoded for line in sample.splitlines(keepends=True) if len(line) > 8
+    )
+    dictionary = b""
+    for line, count in line_counts.most_common():
+        if count < 2 or len(dictionary) + len(line) > min(size, ZLIB_MAX_DICT_BYTES):
+            break
+        dictionary = line + dictionary
+    return CODEC_ZLIB, dictionary
+
+class _Blob(LargeBinary):
+    """LargeBinary that tolerates legacy plain-text values in SQLite"""
+    cache_ok = True
+
+    def result_processor(self, dialect, coltype):
+        def process(value):
+            if value is None or isinstance(value, str):
+                return value
+            return bytes(value)
+        return process
+
+class CompressedText(TypeDecorator):
+    """Text column stored compressed"""
+    impl = _Blob
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return compress(value.encode("utf-8"))
+
+    def process_result_value(self, value, dialect):
+        if value is None or isinstance(value, str):
+            return value
+        if not is_compressed(value):
+            return bytes(value).decode("utf-8")
+        return decompress(bytes(value)).decode("utf-8")
+
+class CompressedJSON(TypeDecorator):
+    """JSON column stored compressed"""
+    impl = _Blob
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return compress(json.dumps(value, ensure_ascii=False).encode("utf-8"))
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, str):
+            return json.loads(value)
+        if not is_compressed(value):
+            return json.loads(bytes(value))
+        return json.loads(decompress(bytes(value)))
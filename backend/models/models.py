@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, JSON, ARRAY
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, JSON, ARRAY, Index, Boolean, LargeBinary, Date, Float, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from datetime import datetime
@@ -6,6 +6,7 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from database import Base
+from models.compressed import CompressedText, CompressedJSON
 
 class User(Base):
     __tablename__ = "users"
@@ -15,9 +16,11 @@ class User(Base):
     company_name = Column(String, index=True)
     website_url = Column(String)
     role = Column(String, nullable=True)
+    company_id = Column(Integer, ForeignKey("companies.id"), nullable=True, index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     quiz_results = relationship("QuizResult", back_populates="user")
+    company = relationship("Company", back_populates="users")
     company_data = relationship("CompanyData", back_populates="user")
     script_results = relationship("ScriptResult", back_populates="user")
 
@@ -25,18 +28,35 @@ class QuizResult(Base):
     __tablename__ = "quiz_results"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
-    answers = Column(JSON)  # Store the full answers array
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    answers = Column(CompressedJSON)  # Store the full answers array
     matched_influencer = Column(String)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     user = relationship("User", back_populates="quiz_results")
 
+class Company(Base):
+    """One row per company domain, shared by every user from that company"""
+    __tablename__ = "companies"
+
+    id = Column(Integer, primary_key=True, index=True)
+    domain = Column(String, unique=True, index=True)  # Canonical host, e.g. "acme.com"
+    canonical_url = Column(String)
+    name = Column(String)
+    summary = Column(JSON)
+    content_hash = Column(String(64), index=True)  # sha256 of the summary
+    is_placeholder = Column(Boolean, default=False)  # Fallback text from a failed scrape
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    users = relationship("User", back_populates="company")
+
 class CompanyData(Base):
+    """Legacy per-user summaries; new submissions reference Company instead"""
     __tablename__ = "company_data"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
     summary = Column(JSON)  # Store the summary as a JSON array of strings
     created_at = Column(DateTime, default=datetime.utcnow)
     
@@ -46,9 +66,10 @@ class VideoIdea(Base):
     __tablename__ = "video_ideas"
 
     id = Column(Integer, primary_key=True, index=True)
-    script_result_id = Column(Integer, ForeignKey("script_results.id"))
+    script_result_id = Column(Integer, ForeignKey("script_results.id"), index=True)
     title = Column(String)
     description = Column(String)
+    appeal = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     script_result = relationship("ScriptResult", back_populates="video_ideas")
@@ -58,22 +79,114 @@ class Script(Base):
     __tablename__ = "scripts"
 
     id = Column(Integer, primary_key=True, index=True)
-    video_idea_id = Column(Integer, ForeignKey("video_ideas.id"))
-    content = Column(Text)
-    delivery_notes = Column(Text)
-    editing_notes = Column(Text)
+    video_idea_id = Column(Integer, ForeignKey("video_ideas.id"), index=True)
+    content = Column(CompressedText)
+    delivery_notes = Column(CompressedText)
+    editing_notes = Column(CompressedText)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     video_idea = relationship("VideoIdea", back_populates="scripts")
 
 class ScriptResult(Base):
     __tablename__ = "script_results"
+    __table_args__ = (
+        # Backs keyset pagination on (created_at, id) for the results listing
+        Index("ix_script_results_created_at_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     influencer = Column(String)
     influencer_style = Column(String)
+    industry = Column(String, nullable=True)
+    timing = Column(JSON, nullable=True)  # Stage durations in seconds, e.g. {"scraping": 1.2}
     created_at = Column(DateTime, default=datetime.utcnow)
     
     user = relationship("User", back_populates="script_results")
-    video_ideas = relationship("VideoIdea", back_populates="script_result") 
\ No newline at end of file
+    # Stored order; idea_index in the results API counts positions in this list
+    video_ideas = relationship("VideoIdea", back_populates="script_result", order_by="VideoIdea.id")
+
+class CompressionDictionary(Base):
+    """Compression dictionaries trained on our own scripts (see models/compressed.py)"""
+    __tablename__ = "compression_dictionaries"
+
+    id = Column(Integer, primary_key=True, index=True)
+    codec = Column(String(1))
+    data = Column(LargeBinary)
+    sample_count = Column(Integer)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class ArchivedResult(Base):
+    """Compacted copy of a result moved out of the live tables by the retention policy"""
+    __tablename__ = "archived_results"
+
+    id = Column(Integer, primary_key=True, index=True)
+    original_id = Column(Integer, index=True)  # ScriptResult.id before archiving
+    result_created_at = Column(DateTime, index=True)
+    payload = Column(CompressedJSON)  # Serialized result tree
+    archived_at = Column(DateTime, default=datetime.utcnow)
+
+class StatsDailyCount(Base):
+    """Submissions per day, influencer and industry (maintained by services/stats.py)"""
+    __tablename__ = "stats_daily_counts"
+    __table_args__ = (UniqueConstraint("day", "influencer", "industry", name="uq_stats_daily_counts"),)
+
+    id = Column(Integer, primary_key=True)
+    day = Column(Date, index=True)
+    influencer = Column(String)
+    industry = Column(String)
+    submissions = Column(Integer, default=0)
+
+class StatsLatencyBucket(Base):
+    """Latency histogram bucket counts per day and pipeline stage"""
+    __tablename__ = "stats_latency_buckets"
+    __table_args__ = (UniqueConstraint("day", "stage", "le", name="uq_stats_latency_buckets"),)
+
+    id = Column(Integer, primary_key=True)
+    day = Column(Date, index=True)
+    stage = Column(String)
+    le = Column(String)  # Bucket upper bound in seconds, "+Inf" for the last one
+    count = Column(Integer, default=0)
+
+class StatsLatencyTotal(Base):
+    """Sample count and summed seconds per day and stage, for averages"""
+    __tablename__ = "stats_latency_totals"
+    __table_args__ = (UniqueConstraint("day", "stage", name="uq_stats_latency_totals"),)
+
+    id = Column(Integer, primary_key=True)
+    day = Column(Date, index=True)
+    stage = Column(String)
+    count = Column(Integer, default=0)
+    total_seconds = Column(Float, default=0.0)
+
+class IdempotencyKey(Base):
+    """Stored submit-quiz response per client Idempotency-Key (see services/idempotency.py)"""
+    __tablename__ = "idempotency_keys"
+
+    id = Column(Integer, primary_key=True)
+    key = Column(String(255), unique=True, index=True)
+    request_hash = Column(String(64))  # sha256 of the request body the key was first used with
+    result_id = Column(Integer, ForeignKey("script_results.id"), nullable=True)
+    response = Column(CompressedJSON)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+class BatchRun(Base):
+    """A batch submission; entries finished so far are kept so a dropped stream can resume"""
+    __tablename__ = "batch_runs"
+
+    id = Column(String(36), primary_key=True)  # uuid4, returned to the client as batch_id
+    request_hash = Column(String(64))  # sha256 of the entries list
+    total = Column(Integer)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    completed_at = Column(DateTime, nullable=True)
+
+class BatchEntry(Base):
+    __tablename__ = "batch_entries"
+    __table_args__ = (UniqueConstraint("batch_id", "position", name="uq_batch_entries_position"),)
+
+    id = Column(Integer, primary_key=True)
+    batch_id = Column(String(36), ForeignKey("batch_runs.id"), index=True)
+    position = Column(Integer)  # Index of the entry in the submitted list
+    result_id = Column(Integer, ForeignKey("script_results.id"), nullable=True)
+    response = Column(CompressedJSON)
+    created_at = Column(DateTime, default=datetime.utcnow)
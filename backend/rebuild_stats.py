@@ -0,0 +1,18 @@
+from database import SessionLocal, init_db
+from services.stats import rebuild_stats
+
+def main():
+    """
+    Recompute the stats rollup tables from the raw results
+    """
+    init_db()
+    db = SessionLocal()
+    try:
+        print("Rebuilding stats...")
+        processed = rebuild_stats(db)
+        print(f"Rebuilt stats from {processed} results")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
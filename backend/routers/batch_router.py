@@ -0,0 +1,37 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from typing import Any, AsyncIterator, Dict, List, Optional
+import orjson
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.batch import start_batch, BatchMismatch, BatchInProgress
+
+router = APIRouter()
+
+class BatchSubmission(BaseModel):
+    entries: List[Dict[str, Any]]  # Same shape as a submit-quiz body
+    batch_id: Optional[str] = None  # Pass the batch_id from an interrupted run to resume it
+
+async def _ndjson(events: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    async for event in events:
+        yield orjson.dumps(event) + b"\n"
+
+@router.post("/submit-quiz/batch")
+async def submit_batch(batch: BatchSubmission):
+    """
+    Run many submissions through one shared pipeline, streaming one NDJSON
+    line per entry as it completes. Resubmitting with the same batch_id
+    replays finished entries and runs the rest.
+    """
+    try:
+        events = await start_batch(batch.entries, batch.batch_id)
+    except BatchMismatch as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except BatchInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return StreamingResponse(_ndjson(events), media_type="application/x-ndjson")
@@ -0,0 +1,32 @@
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from datetime import datetime
+from typing import Optional
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.exporter import stream_export, CONTENT_TYPES
+
+router = APIRouter()
+
+@router.get("/export")
+def export_history(
+    format: str = Query("ndjson", regex="^(ndjson|csv|parquet)$"),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    influencer: Optional[str] = None
+):
+    """
+    Stream quiz results, matched influencers and generated scripts (one row per script)
+    """
+    try:
+        chunks = stream_export(format, since=since, until=until, influencer=influencer)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    filename = f"quiz_history_{datetime.utcnow():%Y%m%d%H%M%S}.{format}"
+    return StreamingResponse(
+        chunks,
+        media_type=CONTENT_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -0,0 +1,70 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.orm import Session
+from typing import Literal, Optional
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database import get_db
+from services.result_store import load_result, list_results, serialize_result
+from services.script_store import get_or_generate_script, regenerate
+
+router = APIRouter()
+
+@router.get("/results", response_class=ORJSONResponse)
+def get_results(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    List stored results, newest first. Pass `next_cursor` back as `cursor` for the next page.
+    """
+    try:
+        results, next_cursor = list_results(db, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return ORJSONResponse({
+        "results": [serialize_result(result) for result in results],
+        "next_cursor": next_cursor
+    })
+
+@router.get("/results/{result_id}", response_class=ORJSONResponse)
+def get_result(result_id: int, db: Session = Depends(get_db)):
+    """
+    Get a stored result with its ideas and scripts
+    """
+    result = load_result(db, result_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Result not found")
+    return ORJSONResponse(serialize_result(result))
+
+@router.get("/results/{result_id}/scripts/{idea_index}", response_class=ORJSONResponse)
+async def get_script(result_id: int, idea_index: int):
+    """
+    Script for one idea (0-based, in the order of `ideas`). Results stored in
+    lazy script mode get it written on first request and memoized.
+    """
+    try:
+        script = await get_or_generate_script(result_id, idea_index)
+    except RuntimeError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    if script is None:
+        raise HTTPException(status_code=404, detail="Idea not found")
+    return ORJSONResponse({"result_id": result_id, "idea_index": idea_index, **script})
+
+@router.post("/results/{result_id}/ideas/{idea_index}/regenerate", response_class=ORJSONResponse)
+async def regenerate_idea(result_id: int, idea_index: int, target: Literal["idea", "script"] = "script"):
+    """
+    Replace one disliked script (`target=script`) or the whole idea
+    (`target=idea`) without rerunning the pipeline. Only that idea changes;
+    the company summary and the other ideas are reused as context.
+    """
+    try:
+        updated = await regenerate(result_id, idea_index, target)
+    except RuntimeError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    if updated is None:
+        raise HTTPException(status_code=404, detail="Idea not found")
+    return ORJSONResponse({"result_id": result_id, "idea_index": idea_index, "target": target, **updated})
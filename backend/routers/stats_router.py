@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database import get_db
+from services.stats import get_stats
+
+router = APIRouter()
+
+@router.get("/stats")
+def stats(days: int = Query(7, ge=1, le=366), db: Session = Depends(get_db)):
+    """
+    Match distribution and pipeline latency for the last `days` days, served from rollup tables
+    """
+    return get_stats(db, days=days)
@@ -0,0 +1,202 @@
+"""
+Batch submissions: many (user_info, answers) entries through one shared pipeline.
+
+Within a batch each company (by canonical domain) is summarised once, and
+entries in flight, scrapes and DeepSeek generations each have their own
+cap, so a 500-entry batch neither floods the target sites nor the DeepSeek
+API. Each entry also takes a slot in the same pipeline admission lane as
+submit-quiz (utils/admission.py), so batches count against the global load
+limit; an entry shed there fails and runs again when the batch is resumed.
+
+Every successful entry is stored with its batch; submitting again with the
+same batch_id replays those and runs only what is left, so a dropped
+connection loses at most the entries that were still running.
+
+Environment:
+    BATCH_MAX_ENTRIES              largest batch accepted (default 500)
+    BATCH_CONCURRENCY              entries in flight per batch (default 8)
+    BATCH_SCRAPE_CONCURRENCY       company summaries fetched at once per batch (default 4)
+    BATCH_GENERATION_CONCURRENCY   DeepSeek generations at once per batch (default 4)
+"""
+import asyncio
+import logging
+import os
+import uuid
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from sqlalchemy.exc import IntegrityError
+from database import SessionLocal
+from models.models import BatchRun, BatchEntry
+from services import shared_cache
+from services.idempotency import request_fingerprint
+from services.pipeline import company_cache_key, get_company_summary, run_submission
+from utils.admission import Overloaded, pipeline_admission
+from utils.metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+BATCH_MAX_ENTRIES = int(os.getenv("BATCH_MAX_ENTRIES", "500"))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+BATCH_SCRAPE_CONCURRENCY = int(os.getenv("BATCH_SCRAPE_CONCURRENCY", "4"))
+BATCH_GENERATION_CONCURRENCY = int(os.getenv("BATCH_GENERATION_CONCURRENCY", "4"))
+MAX_BATCH_ID_LENGTH = 36
+
+BATCH_ENTRIES = Counter(
+    "quiz_batch_entries_total",
+    "Batch entries by outcome (succeeded, failed, replayed)",
+    labelnames=("outcome",)
+)
+
+class BatchMismatch(ValueError):
+    """The batch_id was already used with different entries"""
+
+class BatchInProgress(Exception):
+    """Another request is currently running this batch"""
+
+def _open_batch(batch_id: str, entries: List[Dict[str, Any]]) -> Dict[int, Dict[str, Any]]:
+    """Create the batch record, or load the entries already finished for it"""
+    fingerprint = request_fingerprint({"entries": entries})
+    db = SessionLocal()
+    try:
+        run = db.query(BatchRun).filter(BatchRun.id == batch_id).one_or_none()
+        if run is None:
+            db.add(BatchRun(id=batch_id, request_hash=fingerprint, total=len(entries)))
+            try:
+                db.commit()
+            except IntegrityError:
+                # Created concurrently by a retry; it holds the lease, so the claim will fail
+                db.rollback()
+            return {}
+        if run.request_hash != fingerprint:
+            raise BatchMismatch("batch_id was already used with different entries")
+        stored = db.query(BatchEntry.position, BatchEntry.response).filter(BatchEntry.batch_id == batch_id).all()
+        return {position: response for position, response in stored}
+    finally:
+        db.close()
+
+def _save_entry(batch_id: str, position: int, response: Dict[str, Any]):
+    db = SessionLocal()
+    try:
+        db.add(BatchEntry(batch_id=batch_id, position=position, result_id=response.get("result_id"), response=response))
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        logger.warning(f"⚠️ Batch {batch_id} entry {position} was already stored")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"❌ Failed to store batch {batch_id} entry {position}: {str(e)}", exc_info=True)
+    finally:
+        db.close()
+
+def _mark_completed(batch_id: str):
+    db = SessionLocal()
+    try:
+        db.query(BatchRun).filter(BatchRun.id == batch_id).update({"completed_at": datetime.utcnow()})
+        db.commit()
+    finally:
+        db.close()
+
+async def start_batch(entries: List[Dict[str, Any]], batch_id: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Validate and claim the batch, then return the event stream: a "batch"
+    header, one "entry" per submission (stored ones first, then the rest in
+    completion order) and a final "done" summary.
+    """
+    if not entries:
+        raise ValueError("Batch has no entries")
+    if len(entries) > BATCH_MAX_ENTRIES:
+        raise ValueError(f"Batch has {len(entries)} entries, the limit is {BATCH_MAX_ENTRIES}")
+    if batch_id is not None and not 0 < len(batch_id) <= MAX_BATCH_ID_LENGTH:
+        raise ValueError(f"batch_id must be 1-{MAX_BATCH_ID_LENGTH} characters")
+
+    batch_id = batch_id or str(uuid.uuid4())
+    completed = await asyncio.to_thread(_open_batch, batch_id, entries)
+
+    # Run the stream up to its header here, so BatchInProgress is raised before the response starts.
+    # The lease is taken inside the generator, which releases it however the stream ends.
+    events = _run_batch(batch_id, entries, completed)
+    header = await events.__anext__()
+    return _resume_stream(header, events)
+
+async def _resume_stream(header: Dict[str, Any], events: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+    try:
+        yield header
+        async for event in events:
+            yield event
+    finally:
+        # Runs the batch's cleanup, which never suspends, so a disconnect cannot interrupt it
+        await events.aclose()
+
+async def _run_batch(
+    batch_id: str,
+    entries: List[Dict[str, Any]],
+    completed: Dict[int, Dict[str, Any]]
+) -> AsyncIterator[Dict[str, Any]]:
+    lease_key, owner = f"batch:{batch_id}", shared_cache.new_owner()
+    if not await asyncio.to_thread(shared_cache.claim, lease_key, owner):
+        raise BatchInProgress(f"Batch {batch_id} is already running")
+
+    keeper = asyncio.create_task(shared_cache.keep_lease(lease_key, owner))
+    entry_slots = asyncio.Semaphore(BATCH_CONCURRENCY)
+    scrape_slots = asyncio.Semaphore(BATCH_SCRAPE_CONCURRENCY)
+    generation_slots = asyncio.Semaphore(BATCH_GENERATION_CONCURRENCY)
+    summaries: Dict[str, asyncio.Task] = {}
+
+    async def fetch_summary(company_name: str, website_url: str) -> List[str]:
+        async with scrape_slots:
+            return await get_company_summary(company_name, website_url)
+
+    def load_summary(company_name: str, website_url: str):
+        # Entries for the same company share one fetch
+        key = company_cache_key(website_url)
+        task = summaries.get(key)
+        if task is None:
+            task = summaries[key] = asyncio.create_task(fetch_summary(company_name, website_url))
+        return asyncio.shield(task)
+
+    async def run_entry(position: int, quiz_data: dict) -> Tuple[int, Dict[str, Any]]:
+        async with entry_slots:
+            try:
+                async with pipeline_admission.slot():
+                    response = await run_submission(quiz_data, load_summary, generation_slots)
+            except Overloaded as e:
+                response = {"success": False, "error": f"Server is busy ({e.reason}), resume the batch later"}
+        if response.get("success"):
+            await asyncio.to_thread(_save_entry, batch_id, position, response)
+        return position, response
+
+    pending: List[asyncio.Task] = []
+    try:
+        yield {"type": "batch", "batch_id": batch_id, "total": len(entries), "completed": len(completed)}
+
+        pending = [
+            asyncio.create_task(run_entry(position, quiz_data))
+            for position, quiz_data in enumerate(entries) if position not in completed
+        ]
+        logger.info(f"🔄 Batch {batch_id}: {len(pending)} entries to run, {len(completed)} already done")
+        for position in sorted(completed):
+            BATCH_ENTRIES.inc(outcome="replayed")
+            yield {"type": "entry", "index": position, "replayed": True, **completed[position]}
+
+        succeeded, failed = len(completed), 0
+        for next_done in asyncio.as_completed(pending):
+            position, response = await next_done
+            if response.get("success"):
+                succeeded += 1
+                BATCH_ENTRIES.inc(outcome="succeeded")
+            else:
+                failed += 1
+                BATCH_ENTRIES.inc(outcome="failed")
+            yield {"type": "entry", "index": position, **response}
+
+        if not failed:
+            await asyncio.to_thread(_mark_completed, batch_id)
+        logger.info(f"✅ Batch {batch_id}: {succeeded} succeeded, {failed} failed")
+        yield {"type": "done", "batch_id": batch_id, "succeeded": succeeded, "failed": failed}
+    finally:
+        # Client gone or batch finished: stop remaining work; stored entries resume later
+        for task in pending + list(summaries.values()):
+            task.cancel()
+        keeper.cancel()
+        # Synchronous on purpose: awaiting here would be cancelled again on disconnect
+        shared_cache.release(lease_key, owner)
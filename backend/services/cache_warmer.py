@@ -0,0 +1,182 @@
+"""
+Offline warming of the company summary cache.
+
+Scrapes and summarises a list of known companies ahead of a campaign, so
+their first visitors get a stored summary instead of a cold scrape. Each
+summary goes into the companies table (what every worker checks before
+scraping) and into the shared cache.
+
+Progress is appended to a JSON-lines checkpoint file as each company
+finishes; a rerun with the same checkpoint skips the ones already done.
+"""
+import asyncio
+import csv
+import json
+import logging
+import os
+import statistics
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+from database import SessionLocal
+from services import shared_cache
+from services.company_store import canonical_domain, get_fresh_summary, upsert_company
+from services.pipeline import company_cache_key, summary_ttl
+from services.scraper import scrape_company_data, is_placeholder_summary
+
+logger = logging.getLogger(__name__)
+
+NAME_COLUMNS = ("name", "company_name", "company")
+URL_COLUMNS = ("url", "website_url", "website", "domain")
+
+def load_targets(path: str) -> List[Tuple[str, str]]:
+    """
+    (company name, website URL) pairs from a CSV file, one company per row.
+    A header naming the columns (name/company_name, url/website_url) is
+    optional; without one the first two columns are used.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = [row for row in csv.reader(f) if row and any(cell.strip() for cell in row)]
+    if not rows:
+        return []
+
+    header = [cell.strip().lower() for cell in rows[0]]
+    name_index, url_index = 0, 1
+    if any(column in header for column in URL_COLUMNS):
+        name_index = next((header.index(c) for c in NAME_COLUMNS if c in header), 0)
+        url_index = next(header.index(c) for c in URL_COLUMNS if c in header)
+        rows = rows[1:]
+
+    targets, seen = [], set()
+    for row in rows:
+        if len(row) <= max(name_index, url_index):
+            logger.warning(f"⚠️ Skipping malformed row: {row}")
+            continue
+        name, url = row[name_index].strip(), row[url_index].strip()
+        domain = canonical_domain(url)
+        if not domain or domain in seen:
+            continue
+        seen.add(domain)
+        targets.append((name or domain, url))
+    return targets
+
+def load_checkpoint(path: str) -> Set[str]:
+    """Domains the checkpoint records as successfully warmed"""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # A line cut short by an interruption
+            if entry.get("status") in ("warmed", "fresh"):
+                done.add(entry["domain"])
+    return done
+
+class _RateBudget:
+    """Spaces out starts so no more than `per_minute` begin in any minute"""
+
+    def __init__(self, per_minute: Optional[float]):
+        self.interval = 60.0 / per_minute if per_minute else 0.0
+        self._next_start = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            if self._next_start > now:
+                await asyncio.sleep(self._next_start - now)
+            self._next_start = max(now, self._next_start) + self.interval
+
+def _stored_summary(website_url: str) -> Optional[List[str]]:
+    db = SessionLocal()
+    try:
+        return get_fresh_summary(db, website_url)
+    finally:
+        db.close()
+
+def _store_summary(company_name: str, website_url: str, summary: List[str]):
+    db = SessionLocal()
+    try:
+        upsert_company(db, company_name, website_url, summary, is_placeholder=is_placeholder_summary(summary))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+async def _warm_one(company_name: str, website_url: str, force: bool) -> Dict[str, Any]:
+    domain = canonical_domain(website_url)
+    if not force:
+        stored = await asyncio.to_thread(_stored_summary, website_url)
+        if stored:
+            await asyncio.to_thread(shared_cache.put, company_cache_key(website_url), stored, summary_ttl(stored))
+            return {"domain": domain, "status": "fresh", "seconds": 0.0}
+
+    start = time.perf_counter()
+    summary = await scrape_company_data(company_name, website_url)
+    seconds = round(time.perf_counter() - start, 2)
+    if is_placeholder_summary(summary):
+        # The scraper falls back to a placeholder instead of raising
+        return {"domain": domain, "status": "failed", "seconds": seconds, "error": "scrape fell back to a placeholder summary"}
+
+    await asyncio.to_thread(_store_summary, company_name, website_url, summary)
+    await asyncio.to_thread(shared_cache.put, company_cache_key(website_url), summary, summary_ttl(summary))
+    return {"domain": domain, "status": "warmed", "seconds": seconds}
+
+async def warm_companies(
+    targets: List[Tuple[str, str]],
+    checkpoint_path: str,
+    concurrency: int = 4,
+    rate_per_minute: Optional[float] = None,
+    force: bool = False
+) -> Dict[str, Any]:
+    """Warm every target not already in the checkpoint; returns the run report"""
+    done = load_checkpoint(checkpoint_path)
+    pending = [(name, url) for name, url in targets if canonical_domain(url) not in done]
+    logger.info(f"🔄 Warming {len(pending)} companies ({len(targets) - len(pending)} already in checkpoint)")
+
+    slots = asyncio.Semaphore(concurrency)
+    budget = _RateBudget(rate_per_minute)
+    results: List[Dict[str, Any]] = []
+    started = time.perf_counter()
+
+    with open(checkpoint_path, "a", encoding="utf-8") as checkpoint:
+        async def run(company_name: str, website_url: str):
+            async with slots:
+                await budget.wait()
+                try:
+                    result = await _warm_one(company_name, website_url, force)
+                except Exception as e:
+                    # No scrape time: the warm never finished, so it stays out of the timing stats
+                    result = {"domain": canonical_domain(website_url), "status": "failed", "seconds": None, "error": str(e)}
+            results.append(result)
+            checkpoint.write(json.dumps(result) + "\n")
+            checkpoint.flush()
+            if result["status"] == "failed":
+                logger.warning(f"⚠️ {result['domain']}: {result['error']}")
+            else:
+                logger.info(f"✅ {result['domain']}: {result['status']} ({result['seconds']:.2f}s)")
+
+        await asyncio.gather(*(run(name, url) for name, url in pending))
+
+    scrape_seconds = sorted(r["seconds"] for r in results if r["status"] != "fresh" and r["seconds"] is not None)
+    report = {
+        "targets": len(targets),
+        "skipped_checkpoint": len(targets) - len(pending),
+        "warmed": sum(1 for r in results if r["status"] == "warmed"),
+        "already_fresh": sum(1 for r in results if r["status"] == "fresh"),
+        "failed": [r for r in results if r["status"] == "failed"],
+        "elapsed_seconds": round(time.perf_counter() - started, 2),
+    }
+    if scrape_seconds:
+        report["scrape_seconds"] = {
+            "median": round(statistics.median(scrape_seconds), 2),
+            "p95": scrape_seconds[min(len(scrape_seconds) - 1, int(len(scrape_seconds) * 0.95))],
+            "max": scrape_seconds[-1],
+        }
+    return report
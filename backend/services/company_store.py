@@ -0,0 +1,81 @@
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import List, Optional
+from urllib.parse import urlparse
+from sqlalchemy.orm import Session
+from models.models import Company
+
+logger = logging.getLogger(__name__)
+
+# How long a stored summary is reused before the site is scraped again
+COMPANY_SUMMARY_TTL_HOURS = float(os.getenv("COMPANY_SUMMARY_TTL_HOURS", "168"))
+
+def canonical_domain(url: str) -> str:
+    """Reduce a website URL to the host that identifies the company, e.g. "acme.com" """
+    url = (url or "").strip().lower()
+    if not url.startswith(("http://", "https://")):
+        url = f"https://{url}"
+
+    host = urlparse(url).hostname or ""
+    if host.startswith("www."):
+        host = host[4:]
+    return host.rstrip(".")
+
+def company_cache_key(website_url: str) -> str:
+    """Shared-cache key of a company's summary"""
+    return f"company:{canonical_domain(website_url)}"
+
+def summary_hash(summary: List[str]) -> str:
+    """Content hash used to detect unchanged summaries"""
+    return hashlib.sha256(json.dumps(summary, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+def get_company(db: Session, website_url: str) -> Optional[Company]:
+    """Look up the company row for a website by its canonical domain"""
+    domain = canonical_domain(website_url)
+    if not domain:
+        return None
+    return db.query(Company).filter(Company.domain == domain).one_or_none()
+
+def get_fresh_summary(db: Session, website_url: str, max_age_hours: float = COMPANY_SUMMARY_TTL_HOURS) -> Optional[List[str]]:
+    """Return a stored real (non-placeholder) summary if it is recent enough to reuse"""
+    company = get_company(db, website_url)
+    if company is None or company.is_placeholder or not company.summary:
+        return None
+
+    if company.updated_at and datetime.utcnow() - company.updated_at > timedelta(hours=max_age_hours):
+        return None
+    return company.summary
+
+def upsert_company(db: Session, company_name: str, website_url: str, summary: List[str], is_placeholder: bool = False) -> Optional[Company]:
+    """
+    Create or update the company row for a website. The caller commits.
+    A placeholder summary never replaces a real one.
+    """
+    # Imported here: the scraper depends on this module through the negative cache
+    from services.scraper import normalize_url
+
+    domain = canonical_domain(website_url)
+    if not domain:
+        return None
+
+    # The URL as it was scraped, keeping the submitted scheme, port and path
+    scraped_url = normalize_url(website_url)
+    company = db.query(Company).filter(Company.domain == domain).one_or_none()
+    if company is None:
+        company = Company(domain=domain, canonical_url=scraped_url, name=company_name)
+        db.add(company)
+    elif is_placeholder and not company.is_placeholder:
+        return company
+
+    content_hash = summary_hash(summary)
+    if company.content_hash != content_hash:
+        company.canonical_url = scraped_url
+        company.summary = summary
+        company.content_hash = content_hash
+        company.is_placeholder = is_placeholder
+        logger.info(f"Stored summary for {domain} ({content_hash[:12]})")
+    company.updated_at = datetime.utcnow()
+    return company
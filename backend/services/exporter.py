@@ -0,0 +1,177 @@
+import csv
+import io
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+from sqlalchemy import and_, or_
+from database import SessionLocal
+from models.models import User, QuizResult, Company, VideoIdea, Script, ScriptResult
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # Optional dependency, only needed for parquet exports
+    pyarrow = None
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ("ndjson", "csv", "parquet")
+
+# One row per generated script, flattened with its result, user and company
+EXPORT_COLUMNS = [
+    "result_id", "created_at", "user_name", "company_name", "website_url", "role",
+    "company_domain", "influencer", "influencer_style", "answers",
+    "idea_id", "idea_title", "idea_concept", "idea_appeal",
+    "script_content", "delivery_notes", "editing_notes",
+]
+
+CONTENT_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+def _result_keys(db, since, until, influencer, after, chunk_size):
+    """Next chunk of (created_at, id) result keys in export order"""
+    query = db.query(ScriptResult.created_at, ScriptResult.id)
+    if since:
+        query = query.filter(ScriptResult.created_at >= since)
+    if until:
+        query = query.filter(ScriptResult.created_at < until)
+    if influencer:
+        query = query.filter(ScriptResult.influencer == influencer)
+    if after:
+        query = query.filter(or_(
+            ScriptResult.created_at > after[0],
+            and_(ScriptResult.created_at == after[0], ScriptResult.id > after[1])
+        ))
+    return query.order_by(ScriptResult.created_at, ScriptResult.id).limit(chunk_size).all()
+
+def iter_export_rows(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    influencer: Optional[str] = None,
+    chunk_size: int = 500
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield flattened export rows in (created_at, id) order.
+    Each chunk is read in its own short transaction through a streaming
+    cursor, so memory stays flat and no read transaction is held open
+    across the whole export (which would stall WAL checkpoints and writers).
+    """
+    after = None
+    while True:
+        db = SessionLocal()
+        try:
+            keys = _result_keys(db, since, until, influencer, after, chunk_size)
+            if not keys:
+                return
+            after = (keys[-1][0], keys[-1][1])
+
+            rows = (
+                db.query(
+                    ScriptResult.id, ScriptResult.created_at, User.name, User.company_name,
+                    User.website_url, User.role, Company.domain, ScriptResult.influencer,
+                    ScriptResult.influencer_style, QuizResult.answers, VideoIdea.id,
+                    VideoIdea.title, VideoIdea.description, VideoIdea.appeal,
+                    Script.content, Script.delivery_notes, Script.editing_notes
+                )
+                .outerjoin(User, User.id == ScriptResult.user_id)
+                .outerjoin(Company, Company.id == User.company_id)
+                .outerjoin(QuizResult, QuizResult.user_id == User.id)
+                .outerjoin(VideoIdea, VideoIdea.script_result_id == ScriptResult.id)
+                .outerjoin(Script, Script.video_idea_id == VideoIdea.id)
+                .filter(ScriptResult.id.in_([key[1] for key in keys]))
+                .order_by(ScriptResult.created_at, ScriptResult.id, VideoIdea.id, Script.id)
+                .execution_options(stream_results=True)
+                .yield_per(chunk_size)
+            )
+            for row in rows:
+                record = dict(zip(EXPORT_COLUMNS, row))
+                record["created_at"] = record["created_at"].isoformat() if record["created_at"] else None
+                yield record
+        finally:
+            db.close()
+
+def _ndjson(rows: Iterator[Dict[str, Any]]) -> Iterator[bytes]:
+    for row in rows:
+        yield (json.dumps(row, ensure_ascii=False) + "\n").encode("utf-8")
+
+def _csv(rows: Iterator[Dict[str, Any]], batch_rows: int = 200) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    pending = 0
+    for row in rows:
+        row["answers"] = json.dumps(row["answers"]) if row["answers"] is not None else ""
+        writer.writerow(row)
+        pending += 1
+        if pending >= batch_rows:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue().encode("utf-8")
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands written bytes back to the generator"""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+def _parquet(rows: Iterator[Dict[str, Any]], row_group_rows: int = 1000) -> Iterator[bytes]:
+    schema = pyarrow.schema([
+        (column, pyarrow.int64() if column in ("result_id", "idea_id") else pyarrow.string())
+        for column in EXPORT_COLUMNS
+    ])
+    sink = _ChunkSink()
+    writer = pyarrow.parquet.ParquetWriter(sink, schema)
+
+    def write_group(batch):
+        writer.write_table(pyarrow.Table.from_pylist(batch, schema=schema))
+
+    batch = []
+    for row in rows:
+        row["answers"] = json.dumps(row["answers"]) if row["answers"] is not None else None
+        batch.append(row)
+        if len(batch) >= row_group_rows:
+            write_group(batch)
+            batch = []
+            yield sink.drain()
+    if batch:
+        write_group(batch)
+    writer.close()
+    yield sink.drain()
+
+def stream_export(
+    export_format: str,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    influencer: Optional[str] = None
+) -> Iterator[bytes]:
+    """Encode export rows as a stream of byte chunks in the requested format"""
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {export_format}")
+    if export_format == "parquet" and pyarrow is None:
+        raise ValueError("Parquet export requires pyarrow to be installed")
+
+    rows = iter_export_rows(since=since, until=until, influencer=influencer)
+    logger.info(f"Starting {export_format} export (since={since}, until={until}, influencer={influencer})")
+    if export_format == "ndjson":
+        return _ndjson(rows)
+    if export_format == "csv":
+        return _csv(rows)
+    return _parquet(rows)
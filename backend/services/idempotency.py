@@ -0,0 +1,75 @@
+"""
+Idempotency-Key support for submit-quiz.
+
+The first request with a key runs the pipeline; duplicates arriving while it
+runs (on any worker) wait for it through the shared cache, up to their own
+request deadline (409 after that, never a second run), and duplicates
+arriving later are answered from the response stored here, for
+IDEMPOTENCY_TTL_HOURS. Only successful responses are stored, so a retry
+after a failure runs the pipeline again.
+"""
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from models.models import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_TTL_HOURS = float(os.getenv("IDEMPOTENCY_TTL_HOURS", "24"))
+MAX_KEY_LENGTH = 255
+
+class IdempotencyKeyMismatch(ValueError):
+    """The key was already used with a different request body"""
+
+def request_fingerprint(body: Dict[str, Any]) -> str:
+    return hashlib.sha256(json.dumps(body, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+def load_response(db: Session, key: str, fingerprint: str, ttl_hours: float = IDEMPOTENCY_TTL_HOURS) -> Optional[Dict[str, Any]]:
+    """Stored response for `key` within the retention window, or None"""
+    record = db.query(IdempotencyKey).filter(IdempotencyKey.key == key).one_or_none()
+    if record is None or record.created_at < datetime.utcnow() - timedelta(hours=ttl_hours):
+        return None
+    if record.request_hash != fingerprint:
+        raise IdempotencyKeyMismatch("Idempotency-Key was already used with a different request")
+    return record.response
+
+def save_response(db: Session, key: str, fingerprint: str, response: Dict[str, Any]):
+    """Store the response for `key`; an expired record for the same key is replaced"""
+    db.query(IdempotencyKey).filter(
+        IdempotencyKey.key == key,
+        IdempotencyKey.created_at < datetime.utcnow() - timedelta(hours=IDEMPOTENCY_TTL_HOURS)
+    ).delete(synchronize_session=False)
+    db.add(IdempotencyKey(
+        key=key,
+        request_hash=fingerprint,
+        result_id=response.get("result_id"),
+        response=response
+    ))
+    try:
+        db.commit()
+    except IntegrityError:
+        # Another worker stored it first (its lease expired mid-run); keep theirs
+        db.rollback()
+        logger.warning(f"⚠️ Response for idempotency key {key} was already stored")
+
+def purge_expired(db: Session, ttl_hours: float = IDEMPOTENCY_TTL_HOURS, batch_size: int = 500) -> int:
+    """Delete records past the retention window in small batches"""
+    cutoff = datetime.utcnow() - timedelta(hours=ttl_hours)
+    removed = 0
+    while True:
+        ids = [
+            record_id for (record_id,) in
+            db.query(IdempotencyKey.id).filter(IdempotencyKey.created_at < cutoff).limit(batch_size).all()
+        ]
+        if not ids:
+            break
+        db.query(IdempotencyKey).filter(IdempotencyKey.id.in_(ids)).delete(synchronize_session=False)
+        db.commit()
+        removed += len(ids)
+    logger.info(f"Purged {removed} idempotency records older than {ttl_hours:g}h")
+    return removed
@@ -1,5 +1,6 @@
 from typing import Dict, List, Tuple, Any
 import logging
+from .question_bank import option_texts
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -36,6 +37,16 @@ INFLUENCERS = {
     }
 }
 
+# Options of the industry question (question 1)
+INDUSTRY_OPTIONS = option_texts(1)
+
+def industry_from_answers(quiz_answers: List[Dict[str, Any]], default: str = "Tech") -> str:
+    """Read the industry from the answer to question 1"""
+    for answer in quiz_answers:
+        if answer.get("question_id") == 1:
+            return INDUSTRY_OPTIONS.get(answer.get("answer"), default)
+    return default
+
 def get_influencer_info(influencer_name: str) -> Dict[str, Any]:
     """
     Get information about an influencer
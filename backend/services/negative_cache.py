@@ -0,0 +1,128 @@
+"""
+Negative cache for company sites that cannot be reached.
+
+When a site times out, refuses the connection or answers with a non-200
+status, the failure is recorded under its canonical host in the shared
+cache. Until the backoff window ends, scrapes of that host return the
+placeholder summary at once instead of waiting out the fetch timeout again.
+The window doubles with each consecutive failure, from
+NEGATIVE_CACHE_BASE_SECONDS up to NEGATIVE_CACHE_MAX_SECONDS.
+
+While a host is backed off, visitors trigger a background re-probe at most
+once every NEGATIVE_CACHE_PROBE_SECONDS (across all workers). A probe that
+gets a 200 clears the entry and the placeholder summary shared for the host,
+so the next visitor scrapes the recovered site; a failed probe extends the
+backoff.
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, Optional
+from services import shared_cache
+from services.company_store import canonical_domain, company_cache_key
+from utils.metrics import Counter
+from utils.task_supervisor import TaskSupervisor
+
+logger = logging.getLogger(__name__)
+
+NEGATIVE_CACHE_BASE_SECONDS = float(os.getenv("NEGATIVE_CACHE_BASE_SECONDS", "60"))
+NEGATIVE_CACHE_MAX_SECONDS = float(os.getenv("NEGATIVE_CACHE_MAX_SECONDS", "3600"))
+NEGATIVE_CACHE_PROBE_SECONDS = float(os.getenv("NEGATIVE_CACHE_PROBE_SECONDS", "30"))
+PROBE_TIMEOUT_SECONDS = 10
+
+NEGATIVE_CACHE = Counter(
+    "quiz_site_negative_cache_total",
+    "Unreachable-site cache events (recorded, hit, recovered, probe_failed)",
+    labelnames=("outcome",)
+)
+
+probe_supervisor = TaskSupervisor(
+    "site_probe",
+    concurrency=2,
+    queue_size=32,
+    timeout=PROBE_TIMEOUT_SECONDS + 5,
+    result_ttl=0
+)
+
+def _entry_key(domain: str) -> str:
+    return f"unreachable:{domain}"
+
+def _probe_key(domain: str) -> str:
+    return f"unreachable-probe:{domain}"
+
+def record_failure(website_url: str, failure: str) -> Optional[Dict[str, Any]]:
+    """Record a failed fetch ("timeout", "connection", "http_503", ...) and extend the backoff"""
+    domain = canonical_domain(website_url)
+    if not domain:
+        return None
+    previous = shared_cache.get(_entry_key(domain))
+    failures = (previous["failures"] if previous else 0) + 1
+    backoff = min(NEGATIVE_CACHE_BASE_SECONDS * 2 ** (failures - 1), NEGATIVE_CACHE_MAX_SECONDS)
+    now = time.time()
+    entry = {
+        "url": website_url,
+        "failure": failure,
+        "failures": failures,
+        "first_failed_at": previous["first_failed_at"] if previous else now,
+        "last_failed_at": now,
+        "retry_at": now + backoff
+    }
+    # Kept past the window so the failure count survives until the site has been fine for a while
+    shared_cache.put(_entry_key(domain), entry, backoff + NEGATIVE_CACHE_MAX_SECONDS)
+    NEGATIVE_CACHE.inc(outcome="recorded")
+    logger.warning(f"⚠️ {domain} unreachable ({failure}, {failures} in a row), backing off {backoff:.0f}s")
+    return entry
+
+def clear(website_url: str):
+    """Forget recorded failures for the site's host"""
+    domain = canonical_domain(website_url)
+    if domain:
+        shared_cache.delete(_entry_key(domain))
+
+def _backed_off(website_url: str) -> Optional[Dict[str, Any]]:
+    domain = canonical_domain(website_url)
+    entry = shared_cache.get(_entry_key(domain)) if domain else None
+    return entry if entry is not None and time.time() < entry["retry_at"] else None
+
+def _claim_probe(website_url: str) -> bool:
+    # Never released: the lease itself spaces probes out across workers
+    return shared_cache.claim(_probe_key(canonical_domain(website_url)), shared_cache.new_owner(), NEGATIVE_CACHE_PROBE_SECONDS)
+
+async def _probe(website_url: str):
+    import aiohttp
+    domain = canonical_domain(website_url)
+    failure = None
+    try:
+        async with aiohttp.ClientSession() as session:
+            async with session.get(website_url, timeout=PROBE_TIMEOUT_SECONDS, headers={"User-Agent": "Mozilla/5.0"}) as response:
+                if response.status != 200:
+                    failure = f"http_{response.status}"
+    except asyncio.TimeoutError:
+        failure = "timeout"
+    except aiohttp.ClientError:
+        failure = "connection"
+
+    if failure is None:
+        # The placeholder summary shared while the site was down would otherwise outlive the outage
+        await asyncio.to_thread(clear, website_url)
+        await asyncio.to_thread(shared_cache.delete, company_cache_key(website_url))
+        NEGATIVE_CACHE.inc(outcome="recovered")
+        logger.info(f"✅ {domain} is reachable again")
+    else:
+        NEGATIVE_CACHE.inc(outcome="probe_failed")
+        await asyncio.to_thread(record_failure, website_url, failure)
+
+async def check(website_url: str) -> Optional[Dict[str, Any]]:
+    """
+    The recorded failure when the site's host is inside its backoff window
+    (the caller should fall back at once), else None. A backed-off host is
+    re-probed in the background.
+    """
+    entry = await asyncio.to_thread(_backed_off, website_url)
+    if entry is None:
+        return None
+    NEGATIVE_CACHE.inc(outcome="hit")
+    if await asyncio.to_thread(_claim_probe, website_url):
+        probe_supervisor.submit(canonical_domain(website_url), lambda: _probe(entry["url"]))
+    return entry
@@ -0,0 +1,293 @@
+"""
+The submission pipeline: company summary -> content generation -> storage.
+
+Shared by submit-quiz and the batch endpoint. Callers that run many
+submissions at once pass their own summary loader (to share scrapes between
+entries) and a generation slot (to cap concurrent DeepSeek calls).
+
+Under a request deadline (utils/deadline.py) each stage is bounded by the
+remaining budget: a summary that cannot be scraped in time falls back to a
+cached or placeholder one, and generation defers scripts or writes fewer
+ideas when the full set would not fit.
+"""
+import asyncio
+import logging
+import time
+from contextlib import nullcontext
+from typing import Any, AsyncContextManager, Awaitable, Callable, Dict, List, Optional, Tuple
+from database import SessionLocal
+from services.scraper import scrape_company_data, is_placeholder_summary, PLACEHOLDER_MARKER
+from services.script_generator import generate_all_content, generate_video_ideas
+from services.script_store import SCRIPT_MODE, prefetch_first_script
+from services.influencer_matcher import industry_from_answers
+from services.question_bank import invalid_answers, QUESTION_BANK_VERSION
+from services.result_store import save_submission
+from services.company_store import get_fresh_summary, company_cache_key, COMPANY_SUMMARY_TTL_HOURS
+from services import shared_cache
+from utils.timing import Timer
+from utils.metrics import STAGE_SECONDS, STAGE_ERRORS
+from utils.deadline import Deadline, current as current_deadline, wait_shielded
+
+logger = logging.getLogger(__name__)
+
+# Placeholder summaries (failed scrapes) are shared briefly so workers retry soon
+PLACEHOLDER_CACHE_SECONDS = 300
+
+# Ideas generated per submission
+NUM_IDEAS = 5
+
+# Generation seconds per idea by script mode; starting guesses, refined from observed runs
+_seconds_per_idea = {"eager": 8.0, "lazy": 2.0}
+EWMA_ALPHA = 0.2
+# Budget kept back for the DB write after generation
+STORAGE_RESERVE_SECONDS = 1.0
+
+SummaryLoader = Callable[[str, str], Awaitable[List[str]]]
+
+def content_profile(answers: List[Dict[str, Any]]) -> Tuple[str, str, str]:
+    """(influencer, influencer style, industry) the content is generated for"""
+    # One fixed profile for now; the answers are stored but do not steer generation
+    return "Gary", "Motivational, no-nonsense, action-oriented", "Technology"
+
+async def generate_content(
+    influencer_style: str,
+    industry: str,
+    company_data: List[str],
+    script_mode: str = "eager",
+    num_ideas: int = NUM_IDEAS
+) -> Dict[str, List]:
+    if script_mode == "lazy":
+        # Ideas only; scripts are written per idea when requested (services/script_store.py)
+        ideas = await generate_video_ideas(influencer_style, industry, company_data, num_ideas=num_ideas)
+        return {"ideas": ideas, "scripts": []}
+    # Create one API call that generates both ideas and scripts
+    return await generate_all_content(
+        influencer_style=influencer_style,
+        industry=industry,
+        company_data=company_data,
+        num_ideas=num_ideas
+    )
+
+def resolve_script_mode(requested: Optional[str]) -> str:
+    """The client's script_mode if it asked for one, else SCRIPT_MODE"""
+    return "lazy" if (requested or SCRIPT_MODE) == "lazy" else "eager"
+
+def ideas_without_scripts(content: Dict[str, List]) -> bool:
+    return bool(content["ideas"]) and not content["scripts"]
+
+def load_stored_summary(website_url: str) -> Optional[List[str]]:
+    """Look up a reusable summary for this company's domain"""
+    db = SessionLocal()
+    try:
+        return get_fresh_summary(db, website_url)
+    finally:
+        db.close()
+
+def summary_ttl(summary: List[str]) -> float:
+    return PLACEHOLDER_CACHE_SECONDS if is_placeholder_summary(summary) else COMPANY_SUMMARY_TTL_HOURS * 3600
+
+async def get_company_summary(company_name: str, website_url: str) -> List[str]:
+    """Company summary from the shared cache, the DB, or one scrape across all workers"""
+    async def compute():
+        stored = await asyncio.to_thread(load_stored_summary, website_url)
+        if stored:
+            logger.info(f"♻️ Reusing stored summary for {website_url}")
+            return stored
+        return await scrape_company_data(company_name, website_url)
+
+    return await shared_cache.get_or_compute(company_cache_key(website_url), compute, ttl_seconds=summary_ttl)
+
+def cached_summary(website_url: str) -> Optional[List[str]]:
+    """A summary already at hand (shared cache or DB), without scraping"""
+    return shared_cache.get(company_cache_key(website_url)) or load_stored_summary(website_url)
+
+def _generation_reserve() -> float:
+    # Enough for the full set of ideas with scripts deferred, plus the DB write
+    return NUM_IDEAS * _seconds_per_idea["lazy"] + STORAGE_RESERVE_SECONDS
+
+async def summary_within_deadline(summary_loader: SummaryLoader, company_name: str, website_url: str, deadline: Deadline) -> List[str]:
+    """Company summary if it arrives in time to leave room for generation, else a cached or placeholder one"""
+    budget = deadline.remaining() - _generation_reserve()
+    if budget > 0:
+        try:
+            return await wait_shielded(summary_loader(company_name, website_url), budget)
+        except asyncio.TimeoutError:
+            pass  # The scrape carries on in the background and is cached for the next visitor
+
+    stored = await asyncio.to_thread(cached_summary, website_url)
+    if stored:
+        deadline.degrade("cached_summary")
+        return stored
+    deadline.degrade("placeholder_summary")
+    return [
+        f"{company_name} is a technology company",
+        "Website took too long to respond",
+        PLACEHOLDER_MARKER
+    ]
+
+def plan_generation(script_mode: str, seconds: float) -> Tuple[str, int]:
+    """Script mode and idea count expected to fit in `seconds`: defer scripts first, then cut ideas"""
+    fits = 0
+    for mode in ((script_mode, "lazy") if script_mode == "eager" else ("lazy",)):
+        fits = int(seconds // _seconds_per_idea[mode])
+        if fits >= NUM_IDEAS:
+            return mode, NUM_IDEAS
+    return "lazy", max(1, fits)
+
+async def generate_within_deadline(influencer_style: str, industry: str, company_data: List[str], script_mode: str, deadline: Deadline) -> Dict[str, List]:
+    """Content sized to the remaining budget; no content at all if even that overruns"""
+    budget = deadline.remaining() - STORAGE_RESERVE_SECONDS
+    mode, num_ideas = plan_generation(script_mode, budget)
+    if mode != script_mode:
+        deadline.degrade("scripts_deferred")
+    if num_ideas < NUM_IDEAS:
+        deadline.degrade("fewer_ideas")
+
+    start = time.perf_counter()
+    try:
+        content = await asyncio.wait_for(
+            generate_content(influencer_style, industry, company_data, mode, num_ideas), max(budget, 0)
+        )
+    except asyncio.TimeoutError:
+        deadline.degrade("generation_timeout")
+        return {"ideas": [], "scripts": []}
+
+    if content["ideas"]:
+        per_idea = (time.perf_counter() - start) / len(content["ideas"])
+        _seconds_per_idea[mode] += EWMA_ALPHA * (per_idea - _seconds_per_idea[mode])
+    return content
+
+def store_result(quiz_data: dict, influencer: str, influencer_style: str, company_data: List[str], content: Dict[str, List], timing: Dict[str, float]) -> Optional[int]:
+    """Persist a finished submission so it can be read back from /api/results"""
+    db = SessionLocal()
+    try:
+        result = save_submission(
+            db,
+            user_info=quiz_data["user_info"],
+            answers=quiz_data.get("answers", []),
+            influencer=influencer,
+            influencer_style=influencer_style,
+            company_summary=company_data,
+            ideas=content["ideas"],
+            scripts=content["scripts"],
+            summary_is_placeholder=is_placeholder_summary(company_data),
+            industry=industry_from_answers(quiz_data.get("answers", [])),
+            timing=timing
+        )
+        return result.id
+    except Exception as e:
+        db.rollback()
+        logger.error(f"❌ Failed to store result: {str(e)}", exc_info=True)
+        return None
+    finally:
+        db.close()
+
+async def run_submission(
+    quiz_data: dict,
+    summary_loader: SummaryLoader = get_company_summary,
+    generation_slot: Optional[AsyncContextManager] = None,
+    prepared: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Scrape, generate and store one submission; returns the response body.
+    `prepared` carries a company summary and content generated ahead of time
+    (see services/speculation.py), leaving only the storage step.
+    """
+    try:
+        # Validate required fields
+        if not quiz_data.get("user_info"):
+            raise ValueError("Missing user_info in request")
+
+        user_info = quiz_data["user_info"]
+        required_fields = ["company_name", "website_url"]
+        missing_fields = [field for field in required_fields if not user_info.get(field)]
+
+        if missing_fields:
+            raise ValueError(f"Missing required fields: {', '.join(missing_fields)}")
+
+        # Answers must refer to the question bank the matcher scores against
+        client_version = quiz_data.get("question_bank_version")
+        if client_version and client_version != QUESTION_BANK_VERSION:
+            logger.warning(f"⚠️ Answers given against question bank v{client_version}, serving v{QUESTION_BANK_VERSION}")
+        unknown_answers = invalid_answers(quiz_data.get("answers", []))
+        if unknown_answers:
+            logger.warning(f"⚠️ Ignoring answers not in question bank: {unknown_answers}")
+            quiz_data["answers"] = [a for a in quiz_data.get("answers", []) if a not in unknown_answers]
+
+        start_time = time.perf_counter()
+
+        influencer, influencer_style, industry = content_profile(quiz_data.get("answers", []))
+        script_mode = resolve_script_mode(quiz_data.get("script_mode"))
+        deadline = current_deadline()
+
+        # Step 1: Get company data, waiting on a pre-fetch (from any worker) if one is running
+        async with Timer("Company data scraping", stage="scrape") as scraping_timer:
+            if prepared is not None:
+                company_data = prepared["company_summary"]
+            elif deadline is not None:
+                company_data = await summary_within_deadline(
+                    summary_loader, user_info["company_name"], user_info["website_url"], deadline
+                )
+            else:
+                company_data = await summary_loader(user_info["company_name"], user_info["website_url"])
+
+        # Step 2: Generate all content in parallel
+        async with Timer("Content generation", stage="content_generation") as generation_timer:
+            if prepared is not None:
+                content = prepared["content"]
+            else:
+                async with generation_slot or nullcontext():
+                    if deadline is not None:
+                        content = await generate_within_deadline(influencer_style, industry, company_data, script_mode, deadline)
+                    else:
+                        content = await generate_content(influencer_style, industry, company_data, script_mode)
+
+        if not content["ideas"]:
+            # Nothing worth storing or replaying; the client retries instead
+            if deadline is not None and "generation_timeout" in deadline.degradations:
+                raise RuntimeError("Content generation did not finish within the request deadline")
+            raise RuntimeError("Content generation failed, please retry")
+
+        # Step 3: Store the result (and its stats rollups) off the event loop
+        timing = {
+            "scraping": scraping_timer.duration,
+            "content_generation": generation_timer.duration,
+            "total": time.perf_counter() - start_time
+        }
+        async with Timer("Result storage", stage="db_write"):
+            result_id = await asyncio.to_thread(
+                store_result, quiz_data, influencer, influencer_style, company_data, content, timing
+            )
+
+        if result_id is not None and ideas_without_scripts(content):
+            prefetch_first_script(result_id)
+
+        total_time = time.perf_counter() - start_time
+        STAGE_SECONDS.observe(total_time, stage="end_to_end")
+        logger.info(f"✅ Total processing time: {total_time:.2f} seconds")
+
+        return {
+            "success": True,
+            "result_id": result_id,
+            "question_bank_version": QUESTION_BANK_VERSION,
+            "influencer": influencer,  # "Gary" rather than "Gary Vee" to match the frontend
+            "influencer_style": influencer_style,
+            "company_summary": company_data,
+            "ideas": content["ideas"],
+            "scripts": content["scripts"],
+            "script_mode": "lazy" if ideas_without_scripts(content) else "eager",
+            "timing": {
+                "scraping": round(scraping_timer.duration, 2),
+                "content_generation": round(generation_timer.duration, 2),
+                "total": round(total_time, 2),
+                "speculative": prepared is not None,
+                "deadline": round(deadline.seconds, 2) if deadline is not None else None,
+                "degraded": bool(deadline and deadline.degradations),
+                "degradations": list(deadline.degradations) if deadline is not None else []
+            }
+        }
+
+    except Exception as e:
+        STAGE_ERRORS.inc(stage="end_to_end")
+        logger.error(f"❌ Error in submit_quiz: {str(e)}", exc_info=True)
+        return {"success": False, "error": str(e)}
@@ -0,0 +1,136 @@
+"""
+The single source of quiz questions.
+
+The bank is serialized (and gzip/brotli compressed) once at import time;
+the questions endpoint serves the same bytes on every request with a
+content-hash ETag, so repeat fetches are answered with 304 Not Modified. Bump QUESTION_BANK_VERSION
+whenever questions or option values change, so clients and the matcher
+can tell which bank an answer set was given against.
+"""
+import hashlib
+import json
+from typing import Any, Dict, List, Optional
+from fastapi import Response
+from utils.http_compression import SUPPORTED_ENCODINGS, choose_encoding, compress
+
+QUESTION_BANK_VERSION = "1"
+
+# Browsers may reuse the bank for 5 minutes, then revalidate with If-None-Match
+CACHE_CONTROL = "public, max-age=300, stale-while-revalidate=86400"
+
+QUESTIONS: List[Dict[str, Any]] = [
+    {
+        "id": 1,
+        "text": "What's your industry?",
+        "options": [
+            {"value": "A", "text": "Tech"},
+            {"value": "B", "text": "SaaS"},
+            {"value": "C", "text": "E-commerce"},
+            {"value": "D", "text": "Finance"},
+            {"value": "E", "text": "Healthcare"},
+            {"value": "F", "text": "Education"},
+            {"value": "G", "text": "Other"}
+        ]
+    },
+    {
+        "id": 2,
+        "text": "How would you describe your communication style?",
+        "options": [
+            {"value": "A", "text": "Direct and bold"},
+            {"value": "B", "text": "Analytical and methodical"},
+            {"value": "C", "text": "Storytelling and relatable"},
+            {"value": "D", "text": "Humorous and entertaining"},
+            {"value": "E", "text": "Casual and conversational"}
+        ]
+    },
+    {
+        "id": 3,
+        "text": "What's your approach to content creation?",
+        "options": [
+            {"value": "A", "text": "High-energy and attention-grabbing"},
+            {"value": "B", "text": "Educational and informative"},
+            {"value": "C", "text": "Thought-provoking and insightful"},
+            {"value": "D", "text": "Authentic and personal"},
+            {"value": "E", "text": "Quick and to-the-point"}
+        ]
+    },
+    {
+        "id": 4,
+        "text": "What do you value most in content?",
+        "options": [
+            {"value": "A", "text": "Entertainment value"},
+            {"value": "B", "text": "Practical usefulness"},
+            {"value": "C", "text": "Emotional connection"},
+            {"value": "D", "text": "Unique perspective"},
+            {"value": "E", "text": "Clear communication"}
+        ]
+    },
+    {
+        "id": 5,
+        "text": "How would you handle talking about technical details?",
+        "options": [
+            {"value": "A", "text": "Simplify with analogies and examples"},
+            {"value": "B", "text": "Deep dive into the specifics"},
+            {"value": "C", "text": "Focus on benefits and outcomes"},
+            {"value": "D", "text": "Use humor to make it digestible"},
+            {"value": "E", "text": "Compare with familiar concepts"}
+        ]
+    }
+]
+
+QUESTIONS_BY_ID = {question["id"]: question for question in QUESTIONS}
+
+# Pre-serialized payload and its strong ETag, computed once per process
+QUESTIONS_PAYLOAD = json.dumps(
+    {"version": QUESTION_BANK_VERSION, "questions": QUESTIONS},
+    ensure_ascii=False,
+    separators=(",", ":")
+).encode("utf-8")
+QUESTIONS_ETAG = f'"{hashlib.sha256(QUESTIONS_PAYLOAD).hexdigest()[:32]}"'
+
+# Pre-compressed variants at maximum level; each encoding gets its own strong ETag
+QUESTIONS_ENCODED = {encoding: compress(QUESTIONS_PAYLOAD, encoding, static=True) for encoding in SUPPORTED_ENCODINGS}
+QUESTIONS_ETAGS = {None: QUESTIONS_ETAG}
+QUESTIONS_ETAGS.update({encoding: f'{QUESTIONS_ETAG[:-1]}-{encoding}"' for encoding in SUPPORTED_ENCODINGS})
+
+def get_question(question_id: int) -> Optional[Dict[str, Any]]:
+    return QUESTIONS_BY_ID.get(question_id)
+
+def option_texts(question_id: int) -> Dict[str, str]:
+    """Map option value -> text for one question"""
+    question = QUESTIONS_BY_ID[question_id]
+    return {option["value"]: option["text"] for option in question["options"]}
+
+def invalid_answers(answers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Answers that reference a question or option not in this bank"""
+    invalid = []
+    for answer in answers:
+        question = QUESTIONS_BY_ID.get(answer.get("question_id"))
+        if question is None or answer.get("answer") not in {o["value"] for o in question["options"]}:
+            invalid.append(answer)
+    return invalid
+
+def _etag_matches(if_none_match: Optional[str]) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, as required for If-None-Match; any encoding of this bank matches
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return any(etag in candidates for etag in QUESTIONS_ETAGS.values())
+
+def questions_response(if_none_match: Optional[str] = None, accept_encoding: Optional[str] = None) -> Response:
+    """Serve the pre-serialized (and pre-compressed) bank, or 304 when the client already has it"""
+    encoding = choose_encoding(accept_encoding)
+    headers = {
+        "ETag": QUESTIONS_ETAGS[encoding],
+        "Cache-Control": CACHE_CONTROL,
+        "Vary": "Accept-Encoding",
+        "X-Question-Bank-Version": QUESTION_BANK_VERSION
+    }
+    if _etag_matches(if_none_match):
+        return Response(status_code=304, headers=headers)
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+        return Response(content=QUESTIONS_ENCODED[encoding], media_type="application/json", headers=headers)
+    return Response(content=QUESTIONS_PAYLOAD, media_type="application/json", headers=headers)
@@ -0,0 +1,191 @@
+import base64
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import and_, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, selectinload
+from models.models import User, QuizResult, VideoIdea, Script, ScriptResult
+from services.company_store import upsert_company
+from services.stats import record_submission
+from utils.tracing import traced, set_attribute
+
+logger = logging.getLogger(__name__)
+
+# Loads the whole User -> ScriptResult -> VideoIdea -> Script tree in one
+# SELECT per relationship level, regardless of how many results are returned.
+RESULT_TREE_OPTIONS = (
+    selectinload(ScriptResult.user).selectinload(User.quiz_results),
+    selectinload(ScriptResult.user).selectinload(User.company),
+    selectinload(ScriptResult.user).selectinload(User.company_data),
+    selectinload(ScriptResult.video_ideas).selectinload(VideoIdea.scripts),
+)
+
+@traced("save_submission")
+def save_submission(
+    db: Session,
+    user_info: Dict[str, Any],
+    answers: List[Dict[str, Any]],
+    influencer: str,
+    influencer_style: str,
+    company_summary: List[str],
+    ideas: List[Dict[str, str]],
+    scripts: List[Dict[str, str]],
+    summary_is_placeholder: bool = False,
+    industry: Optional[str] = None,
+    timing: Optional[Dict[str, float]] = None
+) -> ScriptResult:
+    """Persist a full submission tree and its stats rollups in a single transaction"""
+    args = (
+        db, user_info, answers, influencer, influencer_style, company_summary,
+        ideas, scripts, summary_is_placeholder, industry, timing
+    )
+    try:
+        return _save_submission(*args)
+    except IntegrityError:
+        # Another submission created the same company or rollup row first; retry against it
+        db.rollback()
+        set_attribute("db.retried", True)
+        return _save_submission(*args)
+
+def _save_submission(db, user_info, answers, influencer, influencer_style, company_summary,
+                     ideas, scripts, summary_is_placeholder, industry, timing):
+    user = User(
+        name=user_info.get("name"),
+        company_name=user_info.get("company_name"),
+        website_url=user_info.get("website_url"),
+        role=user_info.get("role")
+    )
+    user.quiz_results.append(QuizResult(answers=answers, matched_influencer=influencer))
+    user.company = upsert_company(
+        db,
+        user_info.get("company_name"),
+        user_info.get("website_url"),
+        company_summary,
+        is_placeholder=summary_is_placeholder
+    )
+
+    result = ScriptResult(
+        influencer=influencer,
+        influencer_style=influencer_style,
+        industry=industry,
+        timing=timing
+    )
+    user.script_results.append(result)
+
+    scripts_by_title = {script.get("title"): script for script in scripts}
+    for idea in ideas:
+        db_idea = VideoIdea(
+            title=idea.get("title"),
+            description=idea.get("concept") or idea.get("description"),
+            appeal=idea.get("appeal")
+        )
+        script = scripts_by_title.get(idea.get("title"))
+        if script:
+            db_idea.scripts.append(Script(
+                content=script.get("content"),
+                delivery_notes=script.get("delivery_notes"),
+                editing_notes=script.get("editing_notes")
+            ))
+        result.video_ideas.append(db_idea)
+
+    db.add(user)
+    db.flush()
+    record_submission(db, result.created_at, influencer, industry or "Tech", timing)
+    db.commit()
+    set_attribute("result_id", result.id)
+    logger.info(f"Stored result {result.id} with {len(ideas)} ideas")
+    return result
+
+def load_result(db: Session, result_id: int) -> Optional[ScriptResult]:
+    """Load one result with its full tree eagerly loaded"""
+    return (
+        db.query(ScriptResult)
+        .options(*RESULT_TREE_OPTIONS)
+        .filter(ScriptResult.id == result_id)
+        .one_or_none()
+    )
+
+def encode_cursor(result: ScriptResult) -> str:
+    """Encode the (created_at, id) keyset position of a result"""
+    raw = f"{result.created_at.isoformat()}|{result.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor produced by encode_cursor"""
+    try:
+        created_at, result_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(result_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+def list_results(db: Session, limit: int = 20, cursor: Optional[str] = None) -> Tuple[List[ScriptResult], Optional[str]]:
+    """
+    List results newest first using keyset pagination on (created_at, id)
+    Returns tuple of (results, next_cursor)
+    """
+    query = db.query(ScriptResult).options(*RESULT_TREE_OPTIONS)
+
+    if cursor:
+        created_at, result_id = decode_cursor(cursor)
+        query = query.filter(or_(
+            ScriptResult.created_at < created_at,
+            and_(ScriptResult.created_at == created_at, ScriptResult.id < result_id)
+        ))
+
+    # Fetch one extra row to know whether another page exists
+    rows = (
+        query.order_by(ScriptResult.created_at.desc(), ScriptResult.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+    page = rows[:limit]
+    next_cursor = encode_cursor(page[-1]) if len(rows) > limit else None
+    return page, next_cursor
+
+def serialize_result(result: ScriptResult) -> Dict[str, Any]:
+    """Shape a stored result like the submit-quiz response"""
+    user = result.user
+    company_summary = []
+    if user and user.company:
+        company_summary = user.company.summary
+    elif user and user.company_data:
+        company_summary = user.company_data[-1].summary  # Rows stored before companies existed
+    answers = user.quiz_results[-1].answers if user and user.quiz_results else []
+
+    ideas = []
+    scripts = []
+    for idea in result.video_ideas:
+        ideas.append({
+            "id": idea.id,
+            "title": idea.title,
+            "concept": idea.description,
+            "appeal": idea.appeal
+        })
+        for script in idea.scripts:
+            scripts.append({
+                "title": idea.title,
+                "content": script.content,
+                "delivery_notes": script.delivery_notes,
+                "editing_notes": script.editing_notes
+            })
+
+    return {
+        "success": True,
+        "result_id": result.id,
+        "created_at": result.created_at.isoformat() if result.created_at else None,
+        "user_info": {
+            "name": user.name,
+            "company_name": user.company_name,
+            "website_url": user.website_url,
+            "role": user.role
+        } if user else None,
+        "answers": answers,
+        "influencer": result.influencer,
+        "influencer_style": result.influencer_style,
+        "industry": result.industry,
+        "timing": result.timing,
+        "company_summary": company_summary,
+        "ideas": ideas,
+        "scripts": scripts
+    }
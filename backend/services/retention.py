@@ -0,0 +1,126 @@
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from models.models import (
+    Script, ScriptResult, CompressionDictionary, ArchivedResult, IdempotencyKey, BatchEntry
+)
+from models.compressed import train_dictionary, register_dictionary
+from services.result_store import RESULT_TREE_OPTIONS, serialize_result
+
+logger = logging.getLogger(__name__)
+
+RETENTION_DAYS = int(os.getenv("RETENTION_DAYS", "90"))
+# Pages freed per incremental_vacuum step; small steps keep the write lock short
+VACUUM_PAGES_PER_BATCH = int(os.getenv("VACUUM_PAGES_PER_BATCH", "500"))
+
+def train_script_dictionary(db: Session, sample_size: int = 2000, dictionary_size: int = 16 * 1024) -> Optional[CompressionDictionary]:
+    """Train a compression dictionary on recent scripts and make it the active one"""
+    samples = [
+        content for (content,) in
+        db.query(Script.content).order_by(Script.id.desc()).limit(sample_size).all()
+        if content
+    ]
+    if len(samples) < 10:
+        logger.warning(f"Only {len(samples)} scripts stored; not enough to train a dictionary")
+        return None
+
+    codec, data = train_dictionary(samples, dictionary_size)
+    dictionary = CompressionDictionary(codec=codec.decode(), data=data, sample_count=len(samples))
+    db.add(dictionary)
+    db.commit()
+    register_dictionary(dictionary.id, codec, data)
+    logger.info(f"Trained dictionary {dictionary.id} ({len(data)} bytes) from {len(samples)} scripts")
+    return dictionary
+
+def _reclaim_space(db: Session, pages: int):
+    """Return freed pages to the filesystem a few at a time (SQLite auto_vacuum=INCREMENTAL)"""
+    if db.bind.dialect.name != "sqlite" or pages <= 0:
+        return
+    db.execute(text(f"PRAGMA incremental_vacuum({int(pages)})"))
+
+def archive_old_results(
+    db: Session,
+    older_than_days: int = RETENTION_DAYS,
+    batch_size: int = 100,
+    max_batches: Optional[int] = None,
+    vacuum_pages: int = VACUUM_PAGES_PER_BATCH
+) -> Dict[str, int]:
+    """
+    Move results older than the cutoff into archived_results in small batches.
+    Each batch is its own short transaction followed by an incremental vacuum
+    step, so live writers are never blocked for long.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    counts = {"archived": 0, "users_removed": 0, "batches": 0}
+
+    while max_batches is None or counts["batches"] < max_batches:
+        results = (
+            db.query(ScriptResult)
+            .options(*RESULT_TREE_OPTIONS)
+            .filter(ScriptResult.created_at < cutoff)
+            .order_by(ScriptResult.created_at, ScriptResult.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not results:
+            break
+
+        # Rows that reference the results go first, or the deletes break their foreign keys.
+        # A stored idempotent response would replay a result that is gone; batch entries keep
+        # their response so a resumed batch still gets it, only without the link.
+        result_ids = [result.id for result in results]
+        db.query(IdempotencyKey).filter(IdempotencyKey.result_id.in_(result_ids)).delete(synchronize_session=False)
+        db.query(BatchEntry).filter(BatchEntry.result_id.in_(result_ids)).update({"result_id": None}, synchronize_session=False)
+
+        users = {}
+        for result in results:
+            db.add(ArchivedResult(
+                original_id=result.id,
+                result_created_at=result.created_at,
+                payload=serialize_result(result)
+            ))
+            for idea in result.video_ideas:
+                for script in idea.scripts:
+                    db.delete(script)
+                db.delete(idea)
+            if result.user:
+                users[result.user.id] = result.user
+            db.delete(result)
+        db.flush()
+
+        # Users with no remaining results go too; their data lives on in the archive
+        for user in users.values():
+            if db.query(ScriptResult.id).filter(ScriptResult.user_id == user.id).first():
+                continue
+            for quiz_result in user.quiz_results:
+                db.delete(quiz_result)
+            for company_data in user.company_data:
+                db.delete(company_data)
+            db.delete(user)
+            counts["users_removed"] += 1
+
+        db.commit()
+        _reclaim_space(db, vacuum_pages)
+        db.commit()
+
+        counts["archived"] += len(results)
+        counts["batches"] += 1
+        logger.info(f"Archived batch {counts['batches']}: {len(results)} results")
+
+    return counts
+
+def enable_incremental_vacuum(db: Session):
+    """One-off switch of an existing SQLite file to auto_vacuum=INCREMENTAL (runs a full VACUUM)"""
+    if db.bind.dialect.name != "sqlite":
+        return
+    db.commit()
+    connection = db.bind.raw_connection()  # VACUUM can't run inside a transaction
+    try:
+        cursor = connection.cursor()
+        cursor.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        cursor.execute("VACUUM")
+    finally:
+        connection.close()
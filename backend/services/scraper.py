@@ -1,23 +1,41 @@
 import os
+import json
 import logging
-import aiohttp
 import asyncio
-from typing import Dict, List, Optional
-from dotenv import load_dotenv
+from typing import Any, Dict, List, Optional
 from urllib.parse import urlparse, urljoin
 import re
-from bs4 import BeautifulSoup
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+from services import negative_cache
+from utils.logging_config import get_payload_logger, truncate
+from utils.metrics import Counter, DEEPSEEK_REQUESTS
+from utils.timing import Timer
+from utils.tracing import traced, set_attribute
+from config import DEEPSEEK_API_KEY, DEEPSEEK_API_URL, DEEPSEEK_TIMEOUT_SECONDS
+
 logger = logging.getLogger(__name__)
+payload_logger = get_payload_logger(__name__)
+
+# Last line of every placeholder summary returned when scraping fails
+PLACEHOLDER_MARKER = "Using basic company information"
+
+# Completeness (0-1) of a site's structured metadata at which the summary is
+# built from it without DeepSeek, or with a short metadata-only prompt
+METADATA_SUMMARY_THRESHOLD = float(os.getenv("METADATA_SUMMARY_THRESHOLD", "0.7"))
+METADATA_SHORT_PROMPT_THRESHOLD = float(os.getenv("METADATA_SHORT_PROMPT_THRESHOLD", "0.4"))
+
+SUMMARY_SOURCES = Counter(
+    "quiz_company_summary_source_total",
+    "Company summaries by how they were built (metadata, short_prompt, full_prompt)",
+    labelnames=("source",)
+)
 
-# Load environment variables
-load_dotenv()
+ORGANIZATION_TYPES = {"Organization", "Corporation", "LocalBusiness", "OnlineBusiness", "NGO", "EducationalOrganization"}
+OFFERING_TYPES = {"Product", "SoftwareApplication", "WebApplication", "MobileApplication", "Service"}
 
-# Configure DeepSeek API
-DEEPSEEK_API_KEY = os.getenv("DEEPSEEK_API_KEY")
-DEEPSEEK_API_URL = "https://api.deepseek.com/chat/completions"
+def is_placeholder_summary(summary: List[str]) -> bool:
+    """Check whether a summary is fallback text rather than real company data"""
+    return not summary or summary[-1] == PLACEHOLDER_MARKER
 
 def normalize_url(url: str) -> str:
     """Normalize URL by adding scheme if missing"""
@@ -52,9 +70,132 @@ def normalize_url(url: str) -> str:
         logger.error(f"Error normalizing URL {url}: {str(e)}")
         return f"https://{url}"  # Return best effort URL instead of raising error
 
+def _clean(value: Any) -> str:
+    """Collapse whitespace in a metadata value; anything that is not text becomes empty"""
+    return " ".join(value.split()) if isinstance(value, str) else ""
+
+def _json_ld_items(soup) -> List[Dict[str, Any]]:
+    """Every JSON-LD object on the page, with @graph containers flattened"""
+    items = []
+    for tag in soup.find_all("script", type="application/ld+json"):
+        try:
+            data = json.loads(tag.string or "")
+        except ValueError:
+            continue  # Hand-written JSON-LD is often invalid; skip it rather than fail
+        pending = data if isinstance(data, list) else [data]
+        while pending:
+            item = pending.pop(0)
+            if not isinstance(item, dict):
+                continue
+            if isinstance(item.get("@graph"), list):
+                pending.extend(item["@graph"])
+            items.append(item)
+    return items
+
+def _types(item: Dict[str, Any]) -> set:
+    value = item.get("@type")
+    # Only plain type names count; some sites put objects in @type
+    return {t for t in (value if isinstance(value, list) else [value]) if isinstance(t, str)}
+
+def extract_metadata(soup) -> Dict[str, Any]:
+    """
+    Structured descriptions the site publishes about itself: JSON-LD
+    Organization/Product, OpenGraph, the meta description and the title.
+    """
+    def meta(**attrs) -> str:
+        tag = soup.find("meta", attrs=attrs)
+        return _clean(tag.get("content")) if tag else ""
+
+    metadata = {
+        "name": meta(property="og:site_name"),
+        "descriptions": [],
+        "offerings": [],
+        "slogan": "",
+        "audience": "",
+        "founded": "",
+        "title": _clean(soup.title.string) if soup.title else "",
+    }
+
+    for item in _json_ld_items(soup):
+        types = _types(item)
+        if types & ORGANIZATION_TYPES:
+            metadata["name"] = metadata["name"] or _clean(item.get("name"))
+            metadata["descriptions"].append(_clean(item.get("description")))
+            metadata["slogan"] = metadata["slogan"] or _clean(item.get("slogan"))
+            metadata["founded"] = metadata["founded"] or _clean(item.get("foundingDate"))
+            area = item.get("areaServed")
+            if isinstance(area, dict):
+                area = area.get("name")
+            metadata["audience"] = metadata["audience"] or _clean(area)
+        elif types & OFFERING_TYPES and _clean(item.get("name")):
+            metadata["offerings"].append({
+                "name": _clean(item.get("name")),
+                "description": _clean(item.get("description"))
+            })
+
+    metadata["descriptions"] += [meta(property="og:description"), meta(name="description")]
+
+    # Near-identical descriptions (OG copied from meta, say) count once
+    unique = []
+    for description in metadata["descriptions"]:
+        if description and not any(description.lower() in kept.lower() or kept.lower() in description.lower() for kept in unique):
+            unique.append(description)
+    metadata["descriptions"] = unique
+    return metadata
+
+def metadata_completeness(metadata: Dict[str, Any]) -> float:
+    """
+    How well the metadata alone covers what a summary needs (0-1): what the
+    company does, what it sells, and who for or what sets it apart.
+    """
+    descriptions = metadata["descriptions"]
+    score = 0.0
+    if descriptions and len(descriptions[0]) >= 60:
+        score += 0.4
+    elif descriptions:
+        score += 0.2
+    if len(descriptions) > 1:
+        score += 0.1
+    if metadata["offerings"]:
+        score += 0.25
+    if metadata["slogan"]:
+        score += 0.1
+    if metadata["audience"]:
+        score += 0.1
+    if metadata["founded"]:
+        score += 0.05
+    return round(min(score, 1.0), 2)
+
+def _metadata_facts(company_name: str, metadata: Dict[str, Any]) -> List[str]:
+    """One statement per metadata fact, in the order a summary would use them"""
+    name = metadata["name"] or company_name
+    facts = [f"{name}: {description}" if i == 0 else description for i, description in enumerate(metadata["descriptions"])]
+    offerings = metadata["offerings"][:3]
+    if offerings:
+        names = [offering["name"] for offering in offerings]
+        listed = names[0] if len(names) == 1 else f"{', '.join(names[:-1])} and {names[-1]}"
+        facts.append(f"{name} offers {listed}")
+        facts += [f"{o['name']}: {o['description']}" for o in offerings if o["description"]]
+    if metadata["audience"]:
+        facts.append(f"{name} serves customers in {metadata['audience']}")
+    if metadata["slogan"]:
+        facts.append(f"Tagline: {metadata['slogan']}")
+    if metadata["founded"]:
+        facts.append(f"{name} was founded in {metadata['founded']}")
+    title = metadata["title"]
+    if title and not any(title.lower() in fact.lower() for fact in facts):
+        facts.append(f"Website title: {title}")
+    return facts
+
+def summary_from_metadata(company_name: str, metadata: Dict[str, Any]) -> List[str]:
+    """Company summary built directly from structured metadata, no LLM call"""
+    return _metadata_facts(company_name, metadata)[:7]
+
+@traced("scrape_company_data")
 async def scrape_company_data(company_name: str, website_url: str) -> List[str]:
     """Scrape company data from website and generate summary"""
     logger.info(f"Starting scrape for company: {company_name}, URL: {website_url}")
+    set_attribute("company.name", company_name)
     
     try:
         # Check DeepSeek API key
@@ -65,7 +206,23 @@ async def scrape_company_data(company_name: str, website_url: str) -> List[str]:
         # Normalize URL
         normalized_url = normalize_url(website_url)
         logger.info(f"Normalized URL: {normalized_url}")
+        set_attribute("http.url", normalized_url)
+
+        # A site that failed recently gets the fallback at once instead of another timeout
+        unreachable = await negative_cache.check(normalized_url)
+        if unreachable is not None:
+            logger.info(f"♻️ Skipping fetch of {normalized_url}: {unreachable['failure']} until backoff ends")
+            set_attribute("negative_cache.hit", True)
+            return [
+                f"{company_name} is a technology company",
+                "Website could not be accessed",
+                PLACEHOLDER_MARKER
+            ]
         
+        # aiohttp and bs4 are imported on first use to keep worker start-up fast
+        import aiohttp
+        from bs4 import BeautifulSoup
+
         async with aiohttp.ClientSession() as session:
             try:
                 # Add headers to mimic browser
@@ -74,119 +231,169 @@ async def scrape_company_data(company_name: str, website_url: str) -> List[str]:
                     'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
                 }
                 
-                logger.info(f"Attempting to fetch website content...")
-                async with session.get(normalized_url, timeout=10, headers=headers) as response:
-                    logger.info(f"Response status: {response.status}")
-                    
-                    if response.status != 200:
-                        logger.error(f"Failed to fetch website. Status: {response.status}")
-                        return [
-                            f"{company_name} is a technology company",
-                            "Website could not be accessed",
-                            "Using basic company information"
-                        ]
-                    
-                    html = await response.text()
-                    logger.info(f"Retrieved HTML content length: {len(html)}")
-                    
+                logger.debug("Attempting to fetch website content...")
+                try:
+                    async with Timer("Website fetch", stage="scrape_fetch", **{"http.url": normalized_url}) as fetch_timer:
+                        async with session.get(normalized_url, timeout=10, headers=headers) as response:
+                            logger.debug(f"Response status: {response.status}")
+                            status = response.status
+                            html = await response.text() if status == 200 else None
+                        fetch_timer.span.set_attribute("http.status_code", status)
+                        fetch_timer.span.set_attribute("http.response_chars", len(html) if html else 0)
+                except asyncio.TimeoutError:
+                    await asyncio.to_thread(negative_cache.record_failure, normalized_url, "timeout")
+                    raise
+                except aiohttp.ClientError:
+                    await asyncio.to_thread(negative_cache.record_failure, normalized_url, "connection")
+                    raise
+
+                if status != 200:
+                    logger.error(f"Failed to fetch website. Status: {status}")
+                    await asyncio.to_thread(negative_cache.record_failure, normalized_url, f"http_{status}")
+                    return [
+                        f"{company_name} is a technology company",
+                        "Website could not be accessed",
+                        PLACEHOLDER_MARKER
+                    ]
+
+                logger.info(f"Retrieved HTML content length: {len(html)}")
+                await asyncio.to_thread(negative_cache.clear, normalized_url)
+
+                with Timer("HTML parsing", stage="html_parse"):
                     soup = BeautifulSoup(html, 'html.parser')
-                    
+
+                    # Structured metadata first: when it is complete enough no LLM call is needed
+                    metadata = extract_metadata(soup)
+                    completeness = metadata_completeness(metadata)
+                    set_attribute("metadata.completeness", completeness)
+
                     # Extract text content
                     text_content = []
                     for tag in soup.find_all(['p', 'h1', 'h2', 'h3', 'li']):
                         if tag.string:
                             text_content.append(tag.string.strip())
-                    
+
                     # Clean and join text
                     text = ' '.join(text_content)
                     text = ' '.join(text.split())  # Remove extra whitespace
-                    
-                    if not text:
-                        logger.warning("No text content found on website")
+                    set_attribute("text_chars", len(text))
+
+                if completeness >= METADATA_SUMMARY_THRESHOLD:
+                    summary_points = summary_from_metadata(company_name, metadata)
+                    SUMMARY_SOURCES.inc(source="metadata")
+                    set_attribute("summary.source", "metadata")
+                    logger.info(f"✅ Built summary from site metadata (completeness {completeness:.2f}), skipping DeepSeek")
+                    payload_logger.info(f"Company analysis for {company_name}: {truncate(summary_points)}")
+                    return summary_points
+
+                short_prompt = completeness >= METADATA_SHORT_PROMPT_THRESHOLD
+                if not text and not short_prompt:
+                    logger.warning("No text content found on website")
+                    return [
+                        f"{company_name} is a technology company",
+                        "Website content could not be parsed",
+                        PLACEHOLDER_MARKER
+                    ]
+
+                logger.info(f"Successfully extracted {len(text)} characters of content")
+
+                # Generate summary using DeepSeek API
+                if short_prompt:
+                    # The metadata covers most of it; only fill in the gaps from a little page text
+                    facts = "\n".join(_metadata_facts(company_name, metadata))
+                    prompt = f"""
+                Rewrite these facts about {company_name} as 5 clear, concise statements, one per line
+                (business, products, customers, value proposition, approach). Use the page excerpt only to fill gaps.
+
+                Facts:
+                {facts}
+
+                Page excerpt:
+                {text[:400]}
+                """
+                else:
+                    prompt = f"""
+                Analyze this company information and create 5 key points about {company_name}:
+                
+                {text[:2000]}  # Limit text length
+                
+                Format the response as a list of 5 clear, concise statements about the company.
+                Each statement should be on a new line and focus on different aspects:
+                1. Core business/mission
+                2. Products/services
+                3. Target market/customers
+                4. Unique value proposition
+                5. Company culture/approach
+                """
+                summary_source = "short_prompt" if short_prompt else "full_prompt"
+                SUMMARY_SOURCES.inc(source=summary_source)
+                set_attribute("summary.source", summary_source)
+                
+                headers = {
+                    "Authorization": f"Bearer {DEEPSEEK_API_KEY}",
+                    "Content-Type": "application/json"
+                }
+                
+                payload = {
+                    "model": "deepseek-chat",
+                    "messages": [
+                        {
+                            "role": "user",
+                            "content": prompt
+                        }
+                    ],
+                    "temperature": 0.7,
+                    "max_tokens": 300 if short_prompt else 500
+                }
+                
+                logger.info("Calling DeepSeek API for company analysis")
+                async with Timer("DeepSeek summary call", stage="deepseek_summary"), \
+                        session.post(
+                            DEEPSEEK_API_URL,
+                            json=payload,
+                            headers=headers,
+                            timeout=aiohttp.ClientTimeout(total=DEEPSEEK_TIMEOUT_SECONDS)
+                        ) as api_response:
+                    DEEPSEEK_REQUESTS.inc(call="summary", status=api_response.status)
+                    set_attribute("http.status_code", api_response.status)
+                    if api_response.status != 200:
+                        error_text = await api_response.text()
+                        logger.error(f"API request failed with status {api_response.status}: {truncate(error_text)}")
                         return [
                             f"{company_name} is a technology company",
-                            "Website content could not be parsed",
-                            "Using basic company information"
+                            "Could not generate detailed summary",
+                            PLACEHOLDER_MARKER
                         ]
                     
-                    logger.info(f"Successfully extracted {len(text)} characters of content")
-                    
-                    # Generate summary using DeepSeek API
-                    prompt = f"""
-                    Analyze this company information and create 5 key points about {company_name}:
-                    
-                    {text[:2000]}  # Limit text length
-                    
-                    Format the response as a list of 5 clear, concise statements about the company.
-                    Each statement should be on a new line and focus on different aspects:
-                    1. Core business/mission
-                    2. Products/services
-                    3. Target market/customers
-                    4. Unique value proposition
-                    5. Company culture/approach
-                    """
+                    data = await api_response.json()
+                    logger.info("Received response from DeepSeek API")
+                    set_attribute("llm.usage", data.get("usage"))
+                    summary = data["choices"][0]["message"]["content"]
                     
-                    headers = {
-                        "Authorization": f"Bearer {DEEPSEEK_API_KEY}",
-                        "Content-Type": "application/json"
-                    }
+                    # Split into list and clean up
+                    summary_points = [point.strip() for point in summary.split('\n') if point.strip()]
+                    logger.info(f"Generated {len(summary_points)} summary points")
+                    payload_logger.info(f"Company analysis for {company_name}: {truncate(summary_points)}")
                     
-                    payload = {
-                        "model": "deepseek-chat",
-                        "messages": [
-                            {
-                                "role": "user",
-                                "content": prompt
-                            }
-                        ],
-                        "temperature": 0.7,
-                        "max_tokens": 500
-                    }
-                    
-                    logger.info("Calling DeepSeek API for company analysis")
-                    async with session.post(DEEPSEEK_API_URL, json=payload, headers=headers) as api_response:
-                        if api_response.status != 200:
-                            error_text = await api_response.text()
-                            logger.error(f"API request failed with status {api_response.status}: {error_text}")
-                            return [
-                                f"{company_name} is a technology company",
-                                "Could not generate detailed summary",
-                                "Using basic company information"
-                            ]
-                        
-                        data = await api_response.json()
-                        logger.info("Received response from DeepSeek API")
-                        summary = data["choices"][0]["message"]["content"]
-                        
-                        # Split into list and clean up
-                        summary_points = [point.strip() for point in summary.split('\n') if point.strip()]
-                        logger.debug(f"Raw summary points before cleaning: {summary_points}")
-                        
-                        logger.info(f"Generated {len(summary_points)} summary points")
-                        logger.info("=== Company Analysis Results ===")
-                        for i, point in enumerate(summary_points, 1):
-                            logger.info(f"{i}. {point}")
-                        logger.info("============================")
-                        
-                        return summary_points if summary_points else [
-                            f"{company_name} is a technology company",
-                            "Detailed information not available",
-                            "Using basic company information"
-                        ]
-            
+                    return summary_points if summary_points else [
+                        f"{company_name} is a technology company",
+                        "Detailed information not available",
+                        PLACEHOLDER_MARKER
+                    ]
+        
             except asyncio.TimeoutError:
                 logger.error("Timeout while fetching website")
                 return [
                     f"{company_name} is a technology company",
                     "Website took too long to respond",
-                    "Using basic company information"
+                    PLACEHOLDER_MARKER
                 ]
             except Exception as e:
                 logger.error(f"Error fetching website: {str(e)}")
                 return [
                     f"{company_name} is a technology company",
                     f"Error: {str(e)}",
-                    "Using basic company information"
+                    PLACEHOLDER_MARKER
                 ]
     
     except Exception as e:
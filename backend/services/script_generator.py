@@ -1,25 +1,21 @@
-import os
 import logging
-import aiohttp
 import json
 import time
 import asyncio
 from datetime import datetime
-from typing import List, Dict, Any
-from dotenv import load_dotenv
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Tuple
 from .influencer_matcher import get_influencer_info
-from utils.timing import Timer  # Replace the Timer import
+from utils.timing import Timer
+from utils.metrics import DEEPSEEK_REQUESTS
+from utils.tracing import traced, set_attribute
+from utils.logging_config import get_payload_logger, truncate
+from config import DEEPSEEK_API_KEY, DEEPSEEK_API_URL, DEEPSEEK_TIMEOUT_SECONDS
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
-
-# Load environment variables
-load_dotenv()
+if TYPE_CHECKING:
+    import aiohttp
 
-# Configure DeepSeek API
-DEEPSEEK_API_KEY = os.getenv("DEEPSEEK_API_KEY")
-DEEPSEEK_API_URL = "https://api.deepseek.com/chat/completions"
+logger = logging.getLogger(__name__)
+payload_logger = get_payload_logger(__name__)
 
 async def generate_video_ideas(influencer_style: str, industry: str, company_data: List[str], num_ideas: int = 5) -> List[Dict[str, str]]:
     """Generate video ideas using AI model"""
@@ -46,33 +42,41 @@ async def generate_video_ideas(influencer_style: str, industry: str, company_dat
             Generate exactly {num_ideas} ideas.
             """
             
+            import aiohttp  # Imported on first use to keep worker start-up fast
             async with aiohttp.ClientSession() as session:
-                response = await session.post(
-                    DEEPSEEK_API_URL,
-                    headers={
-                        "Authorization": f"Bearer {DEEPSEEK_API_KEY}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": "deepseek-chat",
-                        "messages": [{"role": "user", "content": prompt}],
-                        "temperature": 0.8,
-                        "max_tokens": 1000
-                    }
-                )
+                async with Timer("DeepSeek ideas call", stage="deepseek_ideas") as call_timer:
+                    response = await session.post(
+                        DEEPSEEK_API_URL,
+                        timeout=aiohttp.ClientTimeout(total=DEEPSEEK_TIMEOUT_SECONDS),
+                        headers={
+                            "Authorization": f"Bearer {DEEPSEEK_API_KEY}",
+                            "Content-Type": "application/json"
+                        },
+                        json={
+                            "model": "deepseek-chat",
+                            "messages": [{"role": "user", "content": prompt}],
+                            "temperature": 0.8,
+                            "max_tokens": 1000
+                        }
+                    )
+                    DEEPSEEK_REQUESTS.inc(call="ideas", status=response.status)
+                    call_timer.span.set_attribute("http.status_code", response.status)
+                    data = await response.json() if response.status == 200 else None
+                    call_timer.span.set_attribute("llm.usage", (data or {}).get("usage"))
                 
-                if response.status != 200:
+                if data is None:
                     error_text = await response.text()
-                    logger.error(f"DeepSeek API error: {error_text}")
+                    logger.error(f"DeepSeek API error: {truncate(error_text)}")
                     return []
                 
-                data = await response.json()
-                logger.debug(f"Raw DeepSeek response: {data}")
+                payload_logger.info(f"Raw DeepSeek response: {truncate(data)}")
                 
-                ideas = parse_deepseek_response(data)
+                with Timer("Ideas parsing", stage="parse") as parse_timer:
+                    ideas = parse_deepseek_response(data)
+                    parse_timer.span.set_attribute("ideas", len(ideas))
                 logger.info(f"Generated {len(ideas)} video ideas")
                 for i, idea in enumerate(ideas, 1):
-                    logger.info(f"Idea {i}: {idea['title']}")
+                    logger.debug(f"Idea {i}: {idea['title']}")
                 
                 return ideas
                 
@@ -80,6 +84,7 @@ async def generate_video_ideas(influencer_style: str, industry: str, company_dat
         logger.error(f"Error generating video ideas: {e}", exc_info=True)
         return []
 
+@traced("generate_script")
 async def generate_script(video_idea: Dict[str, str], influencer_style: str, company_data: List[str]) -> str:
     """Generate a video script based on the selected video idea"""
     logger.info(f"Generating script for video: {video_idea.get('title', 'Unknown')}")
@@ -107,32 +112,36 @@ Format the script with these sections:
 
 Keep the tone motivational and action-oriented."""
         
+        import aiohttp
         async with aiohttp.ClientSession() as session:
-            response = await session.post(
-                DEEPSEEK_API_URL,
-                headers={
-                    "Authorization": f"Bearer {DEEPSEEK_API_KEY}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": "deepseek-chat",
-                    "messages": [{"role": "user", "content": prompt}],
-                    "temperature": 0.8,
-                    "max_tokens": 1000
-                }
-            )
+            async with Timer("DeepSeek script call", stage="deepseek_script") as call_timer:
+                response = await session.post(
+                    DEEPSEEK_API_URL,
+                    timeout=aiohttp.ClientTimeout(total=DEEPSEEK_TIMEOUT_SECONDS),
+                    headers={
+                        "Authorization": f"Bearer {DEEPSEEK_API_KEY}",
+                        "Content-Type": "application/json"
+                    },
+                    json={
+                        "model": "deepseek-chat",
+                        "messages": [{"role": "user", "content": prompt}],
+                        "temperature": 0.8,
+                        "max_tokens": 1000
+                    }
+                )
+                DEEPSEEK_REQUESTS.inc(call="script", status=response.status)
+                call_timer.span.set_attribute("http.status_code", response.status)
+                data = await response.json() if response.status == 200 else None
+                call_timer.span.set_attribute("llm.usage", (data or {}).get("usage"))
             
-            if response.status != 200:
+            if data is None:
                 error_text = await response.text()
-                logger.error(f"DeepSeek API error: {error_text}")
+                logger.error(f"DeepSeek API error: {truncate(error_text)}")
                 return ""
             
-            data = await response.json()
             script_content = data["choices"][0]["message"]["content"]
             
-            logger.info("=== Generated Script ===")
-            logger.info(script_content)
-            logger.info("======================")
+            payload_logger.info(f"Generated script: {truncate(script_content)}")
             
             return script_content
             
@@ -146,6 +155,7 @@ async def generate_scripts_parallel(ideas: List[Dict[str, str]], influencer_styl
     
     try:
         tasks = []
+        import aiohttp
         async with aiohttp.ClientSession() as session:
             for idea in ideas:
                 task = asyncio.create_task(
@@ -161,8 +171,9 @@ async def generate_scripts_parallel(ideas: List[Dict[str, str]], influencer_styl
         logger.error(f"Error in parallel script generation: {e}", exc_info=True)
         return []
 
+@traced("generate_single_script")
 async def generate_single_script(
-    session: aiohttp.ClientSession,
+    session: "aiohttp.ClientSession",
     video_idea: Dict[str, str],
     influencer_style: str,
     company_data: List[str]
@@ -188,8 +199,10 @@ Format the script with these sections:
 
 Keep the tone motivational and action-oriented."""
 
-        async with session.post(
+        import aiohttp  # Already loaded by the caller that opened `session`
+        async with Timer(f"DeepSeek script call ({video_idea.get('title')})", stage="deepseek_script"), session.post(
             DEEPSEEK_API_URL,
+            timeout=aiohttp.ClientTimeout(total=DEEPSEEK_TIMEOUT_SECONDS),
             headers={
                 "Authorization": f"Bearer {DEEPSEEK_API_KEY}",
                 "Content-Type": "application/json"
@@ -201,12 +214,15 @@ Keep the tone motivational and action-oriented."""
                 "max_tokens": 1000
             }
         ) as response:
+            DEEPSEEK_REQUESTS.inc(call="script", status=response.status)
+            set_attribute("http.status_code", response.status)
             if response.status != 200:
                 error_text = await response.text()
-                logger.error(f"API error for {video_idea.get('title')}: {error_text}")
+                logger.error(f"API error for {video_idea.get('title')}: {truncate(error_text)}")
                 return {}
             
             data = await response.json()
+            set_attribute("llm.usage", data.get("usage"))
             content = data["choices"][0]["message"]["content"]
             
             logger.info(f"Generated script for: {video_idea.get('title')}")
@@ -260,9 +276,102 @@ SCRIPT:
 
 Generate exactly {num_ideas} complete sets."""
 
+            import aiohttp
             async with aiohttp.ClientSession() as session:
+                async with Timer("DeepSeek content call", stage="deepseek_all_content") as call_timer:
+                    response = await session.post(
+                        DEEPSEEK_API_URL,
+                        timeout=aiohttp.ClientTimeout(total=DEEPSEEK_TIMEOUT_SECONDS),
+                        headers={
+                            "Authorization": f"Bearer {DEEPSEEK_API_KEY}",
+                            "Content-Type": "application/json"
+                        },
+                        json={
+                            "model": "deepseek-chat",
+                            "messages": [{"role": "user", "content": prompt}],
+                            "temperature": 0.8,
+                            "max_tokens": 3000
+                        }
+                    )
+                    DEEPSEEK_REQUESTS.inc(call="all_content", status=response.status)
+                    call_timer.span.set_attribute("http.status_code", response.status)
+                    data = await response.json() if response.status == 200 else None
+                    call_timer.span.set_attribute("llm.usage", (data or {}).get("usage"))
+
+                if data is None:
+                    error_text = await response.text()
+                    logger.error(f"API error: {truncate(error_text)}")
+                    return {"ideas": [], "scripts": []}
+
+                content = data["choices"][0]["message"]["content"]
+
+                with Timer("Content parsing", stage="parse") as parse_timer:
+                    ideas, scripts = parse_content_sets(content)
+                    parse_timer.span.set_attribute("ideas", len(ideas))
+
+                logger.info(f"Generated {len(ideas)} content sets")
+                for i, idea in enumerate(ideas, 1):
+                    logger.debug(f"Content Set {i}: {idea['title']}")
+                    payload_logger.info(f"Script {i}: {truncate(scripts[i-1]['content'])}")
+
+                return {"ideas": ideas, "scripts": scripts}
+
+    except Exception as e:
+        logger.error(f"Error in generate_all_content: {str(e)}", exc_info=True)
+        return {"ideas": [], "scripts": []}
+
+async def generate_replacement_idea(
+    influencer_style: str,
+    industry: str,
+    company_data: List[str],
+    other_titles: List[str],
+    rejected_title: str,
+    with_script: bool = True
+) -> Tuple[Dict[str, str], Optional[Dict[str, str]]]:
+    """
+    Generate one idea (and, with `with_script`, its script) to replace a
+    rejected one, different from the ideas the user is keeping.
+    Returns ({}, None) when the call or parsing fails.
+    """
+    company_info = "\n".join(company_data)
+    keep = "\n".join(f"- {title}" for title in other_titles) or "- (none)"
+    script_format = """
+
+SCRIPT:
+**Hook:** Opening hook
+**Main Points:**
+- Point 1
+- Point 2
+- Point 3
+**Call to Action:** CTA here
+**Signature Move:** Unique element""" if with_script else ""
+
+    prompt = f"""Generate 1 new video content idea{" with a script" if with_script else ""} for a {industry} company.
+Style: {influencer_style}
+
+Company Information:
+{company_info}
+
+The user rejected this idea: {rejected_title}
+It must also differ from the ideas they are keeping:
+{keep}
+
+Use this exact format:
+
+[SET START]
+IDEA:
+**Title:** *"Title here"*
+**Concept:** Brief concept
+**Appeal:** Target appeal{script_format}
+[SET END]"""
+
+    try:
+        import aiohttp
+        async with aiohttp.ClientSession() as session:
+            async with Timer("DeepSeek regenerate call", stage="deepseek_regenerate") as call_timer:
                 response = await session.post(
                     DEEPSEEK_API_URL,
+                    timeout=aiohttp.ClientTimeout(total=DEEPSEEK_TIMEOUT_SECONDS),
                     headers={
                         "Authorization": f"Bearer {DEEPSEEK_API_KEY}",
                         "Content-Type": "application/json"
@@ -270,65 +379,70 @@ Generate exactly {num_ideas} complete sets."""
                     json={
                         "model": "deepseek-chat",
                         "messages": [{"role": "user", "content": prompt}],
-                        "temperature": 0.8,
-                        "max_tokens": 3000
+                        "temperature": 0.9,
+                        "max_tokens": 800 if with_script else 200
                     }
                 )
+                DEEPSEEK_REQUESTS.inc(call="regenerate", status=response.status)
+                call_timer.span.set_attribute("http.status_code", response.status)
+                data = await response.json() if response.status == 200 else None
+                call_timer.span.set_attribute("llm.usage", (data or {}).get("usage"))
 
-                if response.status != 200:
-                    error_text = await response.text()
-                    logger.error(f"API error: {error_text}")
-                    return {"ideas": [], "scripts": []}
+            if data is None:
+                error_text = await response.text()
+                logger.error(f"API error: {truncate(error_text)}")
+                return {}, None
 
-                data = await response.json()
-                content = data["choices"][0]["message"]["content"]
-                
-                # Parse content using set markers
-                sets = content.split("[SET START]")
-                ideas = []
-                scripts = []
-
-                for set_content in sets:
-                    if not set_content.strip():
-                        continue
-
-                    # Split into idea and script sections
-                    parts = set_content.split("SCRIPT:")
-                    if len(parts) != 2:
-                        continue
-
-                    idea_text, script_text = parts
-
-                    # Parse idea
-                    idea = {}
-                    for line in idea_text.split("\n"):
-                        line = line.strip()
-                        if line.startswith("**Title:**"):
-                            idea["title"] = line.replace("**Title:**", "").replace("*", "").strip()
-                        elif line.startswith("**Concept:**"):
-                            idea["concept"] = line.replace("**Concept:**", "").strip()
-                        elif line.startswith("**Appeal:**"):
-                            idea["appeal"] = line.replace("**Appeal:**", "").strip()
-
-                    if idea and all(k in idea for k in ["title", "concept", "appeal"]):
-                        ideas.append(idea)
-                        # Parse script
-                        script = {
-                            "title": idea["title"],
-                            "content": script_text.strip().replace("[SET END]", "")
-                        }
-                        scripts.append(script)
+        content = data["choices"][0]["message"]["content"]
+        if with_script:
+            ideas, scripts = parse_content_sets(content)
+            return (ideas[0], scripts[0]) if ideas else ({}, None)
+        idea = parse_idea_section(content)
+        return (idea, None) if all(k in idea for k in ["title", "concept", "appeal"]) else ({}, None)
 
-                logger.info(f"Generated {len(ideas)} content sets")
-                for i, idea in enumerate(ideas, 1):
-                    logger.info(f"Content Set {i}: {idea['title']}")
-                    logger.debug(f"Script {i}: {scripts[i-1]['content'][:100]}...")
+    except Exception as e:
+        logger.error(f"Error in generate_replacement_idea: {str(e)}", exc_info=True)
+        return {}, None
+
+def parse_content_sets(content: str) -> Tuple[List[Dict[str, str]], List[Dict[str, str]]]:
+    """Split a combined ideas+scripts response into matching idea and script lists"""
+    # Parse content using set markers
+    sets = content.split("[SET START]")
+    ideas = []
+    scripts = []
+
+    for set_content in sets:
+        if not set_content.strip():
+            continue
 
-                return {"ideas": ideas, "scripts": scripts}
+        # Split into idea and script sections
+        parts = set_content.split("SCRIPT:")
+        if len(parts) != 2:
+            continue
 
-    except Exception as e:
-        logger.error(f"Error in generate_all_content: {str(e)}", exc_info=True)
-        return {"ideas": [], "scripts": []}
+        idea_text, script_text = parts
+
+        # Parse idea
+        idea = {}
+        for line in idea_text.split("\n"):
+            line = line.strip()
+            if line.startswith("**Title:**"):
+                idea["title"] = line.replace("**Title:**", "").replace("*", "").strip()
+            elif line.startswith("**Concept:**"):
+                idea["concept"] = line.replace("**Concept:**", "").strip()
+            elif line.startswith("**Appeal:**"):
+                idea["appeal"] = line.replace("**Appeal:**", "").strip()
+
+        if idea and all(k in idea for k in ["title", "concept", "appeal"]):
+            ideas.append(idea)
+            # Parse script
+            script = {
+                "title": idea["title"],
+                "content": script_text.strip().replace("[SET END]", "")
+            }
+            scripts.append(script)
+
+    return ideas, scripts
 
 def parse_idea_section(text: str) -> Dict[str, str]:
     """Parse the idea section of the response"""
@@ -426,7 +540,7 @@ def parse_deepseek_response(data: dict) -> List[Dict[str, str]]:
     """Parse the response from DeepSeek API into structured video ideas"""
     try:
         content = data["choices"][0]["message"]["content"]
-        logger.info(f"Raw DeepSeek response:\n{content}")
+        payload_logger.info(f"Raw DeepSeek response: {truncate(content)}")
         
         ideas = []
         current_idea = {}
@@ -453,13 +567,8 @@ def parse_deepseek_response(data: dict) -> List[Dict[str, str]]:
             if len(idea) == 3:  # Only add if we have all components
                 ideas.append(idea)
         
-        logger.info("=== Parsed Video Ideas ===")
-        for i, idea in enumerate(ideas, 1):
-            logger.info(f"Idea {i}:")
-            logger.info(f"  Title: {idea['title']}")
-            logger.info(f"  Concept: {idea['concept']}")
-            logger.info(f"  Appeal: {idea['appeal']}")
-        logger.info("========================")
+        logger.info(f"Parsed {len(ideas)} video ideas")
+        payload_logger.info(f"Parsed video ideas: {truncate(ideas)}")
         
         return ideas
         
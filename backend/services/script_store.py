@@ -0,0 +1,224 @@
+"""
+Per-idea script work on stored results: on-demand generation and regeneration.
+
+With SCRIPT_MODE=lazy a submission generates and stores only the ideas;
+each script is written the first time it is requested and memoized in the
+scripts table, so scripts nobody opens cost no tokens. Concurrent requests
+for the same idea (on any worker) share one generation through the shared
+cache. The first idea's script is prefetched in the background right after
+the submission is stored (SCRIPT_PREFETCH_FIRST).
+
+Regeneration replaces a single disliked idea or script in place with one
+small completion, using the stored company summary, influencer style and
+sibling ideas as context; only that idea's rows change.
+"""
+import asyncio
+import logging
+import os
+from typing import Any, Dict, Optional
+from sqlalchemy.orm import selectinload
+from database import SessionLocal
+from models.models import ScriptResult, User, VideoIdea, Script
+from services import shared_cache
+from services.script_generator import generate_script, generate_replacement_idea
+from utils.task_supervisor import TaskSupervisor
+
+logger = logging.getLogger(__name__)
+
+# "eager": every script in the submission's one DeepSeek call; "lazy": ideas first, scripts on request
+SCRIPT_MODE = os.getenv("SCRIPT_MODE", "eager").lower()
+SCRIPT_PREFETCH_FIRST = os.getenv("SCRIPT_PREFETCH_FIRST", "true").lower() == "true"
+# Only bridges concurrent requests; the scripts table is the durable memo
+SCRIPT_INFLIGHT_SECONDS = 60
+
+script_prefetch_supervisor = TaskSupervisor(
+    "script_prefetch",
+    concurrency=int(os.getenv("SCRIPT_PREFETCH_CONCURRENCY", "4")),
+    queue_size=int(os.getenv("SCRIPT_PREFETCH_QUEUE_SIZE", "64")),
+    timeout=90,
+    result_ttl=300
+)
+
+def _serialize_idea(idea: VideoIdea) -> Dict[str, Any]:
+    return {"id": idea.id, "title": idea.title, "concept": idea.description, "appeal": idea.appeal}
+
+def _serialize_script(idea: VideoIdea, script: Script) -> Dict[str, Any]:
+    return {
+        "title": idea.title,
+        "content": script.content,
+        "delivery_notes": script.delivery_notes,
+        "editing_notes": script.editing_notes
+    }
+
+def load_idea(result_id: int, idea_index: int) -> Optional[Dict[str, Any]]:
+    """Idea at `idea_index` (in stored order) with what is needed to write its script"""
+    db = SessionLocal()
+    try:
+        result = (
+            db.query(ScriptResult)
+            .options(
+                selectinload(ScriptResult.video_ideas).selectinload(VideoIdea.scripts),
+                selectinload(ScriptResult.user).selectinload(User.company),
+                selectinload(ScriptResult.user).selectinload(User.quiz_results),
+            )
+            .filter(ScriptResult.id == result_id)
+            .one_or_none()
+        )
+        if result is None:
+            return None
+        ideas = result.video_ideas
+        if not 0 <= idea_index < len(ideas):
+            return None
+        # Imported here: the pipeline imports this module for lazy script mode
+        from services.pipeline import content_profile
+
+        idea = ideas[idea_index]
+        user = result.user
+        company = user.company if user else None
+        answers = user.quiz_results[-1].answers if user and user.quiz_results else []
+        # The generation industry, not the stored answer-derived one (kept for stats)
+        _, _, industry = content_profile(answers or [])
+        return {
+            "idea_id": idea.id,
+            "idea": _serialize_idea(idea),
+            "script": _serialize_script(idea, idea.scripts[0]) if idea.scripts else None,
+            "sibling_titles": [other.title for other in ideas if other.id != idea.id],
+            "influencer_style": result.influencer_style,
+            "industry": industry,
+            "company_summary": company.summary if company and company.summary else []
+        }
+    finally:
+        db.close()
+
+def store_script(idea_id: int, written_for: Dict[str, Any], content: str) -> Optional[Dict[str, Any]]:
+    """
+    Memoize a generated script; if one was stored meanwhile, keep and return
+    that. Returns None without storing when the idea was regenerated after
+    the script was started (`written_for` is the idea it was written for).
+    """
+    db = SessionLocal()
+    try:
+        idea = db.query(VideoIdea).options(selectinload(VideoIdea.scripts)).filter(VideoIdea.id == idea_id).one()
+        if _serialize_idea(idea) != written_for:
+            logger.warning(f"⚠️ Idea {idea_id} was regenerated while its script was written; dropping the script")
+            return None
+        if not idea.scripts:
+            idea.scripts.append(Script(content=content))
+            db.commit()
+        return _serialize_script(idea, idea.scripts[0])
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+async def get_or_generate_script(result_id: int, idea_index: int) -> Optional[Dict[str, Any]]:
+    """
+    Script for one idea of a stored result, generating it on first request.
+    Returns None for an unknown result or idea; raises RuntimeError when
+    generation fails (nothing is stored, so the next request tries again).
+    """
+    loaded = await asyncio.to_thread(load_idea, result_id, idea_index)
+    if loaded is None:
+        return None
+    if loaded["script"] is not None:
+        return {**loaded["script"], "generated": False}
+
+    async def compute():
+        content = await generate_script(loaded["idea"], loaded["influencer_style"], loaded["company_summary"])
+        if not content:
+            return None
+        logger.info(f"✅ Generated script for result {result_id} idea {idea_index}")
+        return await asyncio.to_thread(store_script, loaded["idea_id"], loaded["idea"], content)
+
+    script = await shared_cache.get_or_compute(
+        f"script:{loaded['idea_id']}", compute, ttl_seconds=SCRIPT_INFLIGHT_SECONDS
+    )
+    if script is None:
+        raise RuntimeError("Script generation failed, please retry")
+    return {**script, "generated": True}
+
+def prefetch_first_script(result_id: int):
+    """Start writing the first idea's script before anyone asks for it"""
+    if SCRIPT_PREFETCH_FIRST:
+        script_prefetch_supervisor.submit(f"{result_id}:0", lambda: get_or_generate_script(result_id, 0))
+
+def replace_idea(idea_id: int, idea: Dict[str, str], script_content: Optional[str]) -> Dict[str, Any]:
+    """Overwrite an idea in place; its old script no longer fits, so it is replaced or dropped"""
+    db = SessionLocal()
+    try:
+        row = db.query(VideoIdea).options(selectinload(VideoIdea.scripts)).filter(VideoIdea.id == idea_id).one()
+        row.title = idea["title"]
+        row.description = idea["concept"]
+        row.appeal = idea["appeal"]
+        for old in row.scripts[1:] if script_content is not None else row.scripts:
+            db.delete(old)
+        if script_content is not None:
+            if row.scripts:
+                script = row.scripts[0]
+                script.content, script.delivery_notes, script.editing_notes = script_content, None, None
+            else:
+                row.scripts.append(Script(content=script_content))
+        db.commit()
+        script = _serialize_script(row, row.scripts[0]) if script_content is not None else None
+        return {"idea": _serialize_idea(row), "script": script}
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+def replace_script(idea_id: int, content: str) -> Dict[str, Any]:
+    """Overwrite (or create) the script of an idea in place"""
+    db = SessionLocal()
+    try:
+        row = db.query(VideoIdea).options(selectinload(VideoIdea.scripts)).filter(VideoIdea.id == idea_id).one()
+        if row.scripts:
+            script = row.scripts[0]
+            script.content, script.delivery_notes, script.editing_notes = content, None, None
+        else:
+            row.scripts.append(Script(content=content))
+        db.commit()
+        return {"idea": _serialize_idea(row), "script": _serialize_script(row, row.scripts[0])}
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+async def regenerate(result_id: int, idea_index: int, target: str) -> Optional[Dict[str, Any]]:
+    """
+    Replace the script (target "script") or the whole idea (target "idea")
+    at `idea_index`. Returns the updated idea and script, None for an unknown
+    result or idea; raises RuntimeError when generation fails (nothing changes).
+    """
+    loaded = await asyncio.to_thread(load_idea, result_id, idea_index)
+    if loaded is None:
+        return None
+
+    if target == "script":
+        content = await generate_script(loaded["idea"], loaded["influencer_style"], loaded["company_summary"])
+        if not content:
+            raise RuntimeError("Script generation failed, please retry")
+        updated = await asyncio.to_thread(replace_script, loaded["idea_id"], content)
+    else:
+        # A lazily generated result keeps its scripts unwritten until opened
+        with_script = loaded["script"] is not None
+        idea, script = await generate_replacement_idea(
+            loaded["influencer_style"],
+            loaded["industry"],
+            loaded["company_summary"],
+            loaded["sibling_titles"],
+            loaded["idea"]["title"],
+            with_script=with_script
+        )
+        if not idea or (with_script and not script):
+            raise RuntimeError("Idea generation failed, please retry")
+        updated = await asyncio.to_thread(
+            replace_idea, loaded["idea_id"], idea, script["content"] if script else None
+        )
+
+    # A script for the old idea may still sit in the in-flight cache
+    await asyncio.to_thread(shared_cache.delete, f"script:{loaded['idea_id']}")
+    logger.info(f"✅ Regenerated {target} for result {result_id} idea {idea_index}")
+    return updated
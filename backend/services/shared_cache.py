@@ -0,0 +1,194 @@
+"""
+Cache and in-flight work registry shared by every worker process on a host.
+
+Backed by a small SQLite file (separate from the application database) in
+WAL mode. Values are JSON with an expiry. Work is coordinated with leases:
+claiming a key is a single atomic upsert that only succeeds when nobody
+holds an unexpired lease, so exactly one worker computes a given key while
+the others poll for its result for as long as the owner keeps renewing its
+lease. A worker that dies mid-computation simply lets its lease expire and
+another worker takes over.
+
+Environment:
+    SHARED_CACHE_PATH            SQLite file (default shared_cache.db)
+    SHARED_CACHE_LEASE_SECONDS   lease length; renewed while the owner is still working
+"""
+import asyncio
+import json
+import logging
+import os
+import random
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+SHARED_CACHE_PATH = os.getenv("SHARED_CACHE_PATH", "shared_cache.db")
+SHARED_CACHE_LEASE_SECONDS = float(os.getenv("SHARED_CACHE_LEASE_SECONDS", "60"))
+POLL_INTERVAL_SECONDS = 0.25
+PURGE_PROBABILITY = 0.01
+
+_local = threading.local()
+_schema_ready = set()
+_schema_lock = threading.Lock()
+
+# Per-process dedupe: concurrent callers in one worker share one lease and one computation
+_inflight: Dict[str, asyncio.Future] = {}
+
+class _OwnerCancelled(Exception):
+    """The caller computing a key was cancelled; callers waiting on it start over"""
+
+def _connect() -> sqlite3.Connection:
+    """One connection per thread (sqlite3 connections are not shared across threads)"""
+    conn = getattr(_local, "conn", None)
+    if conn is None or getattr(_local, "path", None) != SHARED_CACHE_PATH:
+        conn = sqlite3.connect(SHARED_CACHE_PATH, timeout=5, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with _schema_lock:
+            if SHARED_CACHE_PATH not in _schema_ready:
+                conn.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)")
+                conn.execute("CREATE TABLE IF NOT EXISTS leases (key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)")
+                _schema_ready.add(SHARED_CACHE_PATH)
+        _local.conn, _local.path = conn, SHARED_CACHE_PATH
+    return conn
+
+def get(key: str) -> Optional[Any]:
+    """Cached value for `key`, or None when missing or expired"""
+    row = _connect().execute(
+        "SELECT value FROM cache WHERE key = ? AND expires_at > ?", (key, time.time())
+    ).fetchone()
+    return json.loads(row[0]) if row else None
+
+def put(key: str, value: Any, ttl_seconds: float):
+    conn = _connect()
+    conn.execute(
+        "INSERT INTO cache (key, value, expires_at) VALUES (?, ?, ?) "
+        "ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at",
+        (key, json.dumps(value, ensure_ascii=False), time.time() + ttl_seconds)
+    )
+    if random.random() < PURGE_PROBABILITY:
+        purge_expired()
+
+def delete(key: str):
+    _connect().execute("DELETE FROM cache WHERE key = ?", (key,))
+
+def claim(key: str, owner: str, lease_seconds: float = SHARED_CACHE_LEASE_SECONDS) -> bool:
+    """Atomically take the lease on `key` unless another owner holds an unexpired one"""
+    now = time.time()
+    cursor = _connect().execute(
+        "INSERT INTO leases (key, owner, expires_at) VALUES (?, ?, ?) "
+        "ON CONFLICT(key) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+        "WHERE leases.expires_at <= ? OR leases.owner = excluded.owner",
+        (key, owner, now + lease_seconds, now)
+    )
+    return cursor.rowcount == 1
+
+def renew(key: str, owner: str, lease_seconds: float = SHARED_CACHE_LEASE_SECONDS) -> bool:
+    cursor = _connect().execute(
+        "UPDATE leases SET expires_at = ? WHERE key = ? AND owner = ?",
+        (time.time() + lease_seconds, key, owner)
+    )
+    return cursor.rowcount == 1
+
+def release(key: str, owner: str):
+    _connect().execute("DELETE FROM leases WHERE key = ? AND owner = ?", (key, owner))
+
+def is_claimed(key: str) -> bool:
+    row = _connect().execute(
+        "SELECT 1 FROM leases WHERE key = ? AND expires_at > ?", (key, time.time())
+    ).fetchone()
+    return row is not None
+
+def purge_expired():
+    now = time.time()
+    conn = _connect()
+    conn.execute("DELETE FROM cache WHERE expires_at <= ?", (now,))
+    conn.execute("DELETE FROM leases WHERE expires_at <= ?", (now,))
+
+def new_owner() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+async def keep_lease(key: str, owner: str, lease_seconds: float = SHARED_CACHE_LEASE_SECONDS):
+    """Renew a held lease until cancelled"""
+    while True:
+        await asyncio.sleep(lease_seconds / 3)
+        await asyncio.to_thread(renew, key, owner, lease_seconds)
+
+async def _claim_and_compute(
+    key: str,
+    compute: Callable[[], Awaitable[Any]],
+    ttl_seconds: Union[float, Callable[[Any], float]],
+    lease_seconds: float,
+    give_up_at: Optional[float]
+) -> Any:
+    owner = new_owner()
+    while True:
+        value = await asyncio.to_thread(get, key)
+        if value is not None:
+            return value
+
+        # Only succeeds once the owner has released or stopped renewing (crashed)
+        if await asyncio.to_thread(claim, key, owner, lease_seconds):
+            break
+        if give_up_at is not None and time.monotonic() >= give_up_at:
+            raise asyncio.TimeoutError(f"{key} is still being computed by another worker")
+        await asyncio.sleep(POLL_INTERVAL_SECONDS)
+
+    keeper = asyncio.create_task(keep_lease(key, owner, lease_seconds))
+    try:
+        value = await compute()
+        if value is not None:
+            ttl = ttl_seconds(value) if callable(ttl_seconds) else ttl_seconds
+            await asyncio.to_thread(put, key, value, ttl)
+        return value
+    finally:
+        keeper.cancel()
+        await asyncio.to_thread(release, key, owner)
+
+async def get_or_compute(
+    key: str,
+    compute: Callable[[], Awaitable[Any]],
+    ttl_seconds: Union[float, Callable[[Any], float]],
+    lease_seconds: float = SHARED_CACHE_LEASE_SECONDS,
+    wait_seconds: Optional[float] = None
+) -> Any:
+    """
+    Return the cached value for `key`, computing it at most once across all
+    workers. `ttl_seconds` may be a function of the computed value.
+
+    A caller that finds another owner at work waits while that owner holds
+    its lease; with `wait_seconds` it raises asyncio.TimeoutError after that
+    long instead of computing the value a second time.
+    """
+    give_up_at = time.monotonic() + wait_seconds if wait_seconds is not None else None
+    while key in _inflight:
+        try:
+            if give_up_at is None:
+                return await asyncio.shield(_inflight[key])
+            return await asyncio.wait_for(asyncio.shield(_inflight[key]), max(give_up_at - time.monotonic(), 0))
+        except _OwnerCancelled:
+            continue  # Take over the computation, or join whoever already has
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+    try:
+        value = await _claim_and_compute(key, compute, ttl_seconds, lease_seconds, give_up_at)
+        future.set_result(value)
+        return value
+    except asyncio.CancelledError:
+        # Only this caller was cancelled; the shared future must not cancel the others
+        future.set_exception(_OwnerCancelled())
+        future.exception()
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        # Mark retrieved so an unawaited failure does not log "exception never retrieved"
+        future.exception()
+        raise
+    finally:
+        _inflight.pop(key, None)
@@ -0,0 +1,214 @@
+"""
+Speculative generation from partial quiz answers.
+
+While the quiz is still being answered, the frontend posts the answers so
+far to /api/speculate under a per-session speculation_id. As soon as they
+fix the generation inputs (influencer style, industry, company, script
+mode), the company summary and the ideas (and scripts, in eager mode) are
+generated in the background and parked in the shared cache. The final
+submit adopts them when its own inputs agree, waiting if the speculation
+is still running, so only the DB write is left after the last click. On
+disagreement the speculation is cancelled and the submit generates as
+usual.
+
+Today pipeline.content_profile() does not depend on the answers, so the
+inputs are fixed by the first call. If it ever scores answers (see
+influencer_matcher), speculation must wait until the unanswered questions
+can no longer change the profile.
+
+Speculative spend is capped per worker: SPECULATION_CONCURRENCY run at once,
+SPECULATION_QUEUE_SIZE wait, and at most SPECULATION_MAX_PER_MINUTE start
+per minute. Unadopted results expire after SPECULATION_TTL_SECONDS.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+from services import shared_cache
+from services.pipeline import (
+    content_profile, company_cache_key, generate_content, get_company_summary, resolve_script_mode
+)
+from utils.metrics import Counter, Gauge
+from utils.task_supervisor import TaskSupervisor
+
+logger = logging.getLogger(__name__)
+
+SPECULATION_CONCURRENCY = int(os.getenv("SPECULATION_CONCURRENCY", "4"))
+SPECULATION_QUEUE_SIZE = int(os.getenv("SPECULATION_QUEUE_SIZE", "8"))
+SPECULATION_MAX_PER_MINUTE = int(os.getenv("SPECULATION_MAX_PER_MINUTE", "30"))
+SPECULATION_TTL_SECONDS = float(os.getenv("SPECULATION_TTL_SECONDS", "600"))
+# Generation can take a minute or more; give up on a speculation after this
+SPECULATION_TIMEOUT_SECONDS = 120
+MAX_SPECULATION_ID_LENGTH = 64
+
+SPECULATIONS = Counter(
+    "quiz_speculations_total",
+    "Speculative generations by outcome (started, skipped, adopted, mismatched, missed)",
+    labelnames=("outcome",)
+)
+
+def _hit_ratio() -> float:
+    adopted = SPECULATIONS.value(outcome="adopted")
+    attempts = adopted + SPECULATIONS.value(outcome="mismatched") + SPECULATIONS.value(outcome="missed")
+    return adopted / attempts if attempts else 0.0
+
+Gauge("quiz_speculation_hit_ratio", "Share of submits with a speculation_id that adopted its content", _hit_ratio)
+
+speculation_supervisor = TaskSupervisor(
+    "speculation",
+    concurrency=SPECULATION_CONCURRENCY,
+    queue_size=SPECULATION_QUEUE_SIZE,
+    timeout=SPECULATION_TIMEOUT_SECONDS,
+    result_ttl=SPECULATION_TTL_SECONDS
+)
+
+# Start times of recent speculations in this worker, for the per-minute cap
+_recent_starts: Deque[float] = deque()
+# speculation_id -> supervisor key of its current speculation in this worker
+_active: Dict[str, str] = {}
+_last_prune = 0.0
+# How often abandoned sessions are dropped from _active
+PRUNE_INTERVAL_SECONDS = 60
+
+def _inputs_key(influencer_style: str, industry: str, website_url: str, script_mode: str) -> str:
+    raw = "\x1f".join((influencer_style, industry, company_cache_key(website_url), script_mode))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+def _result_key(speculation_id: str) -> str:
+    return f"speculation:{speculation_id}"
+
+def _inputs_marker_key(speculation_id: str) -> str:
+    return f"speculation-inputs:{speculation_id}"
+
+def _closed_key(speculation_id: str) -> str:
+    return f"speculation-closed:{speculation_id}"
+
+def _within_budget() -> bool:
+    now = time.monotonic()
+    while _recent_starts and now - _recent_starts[0] > 60:
+        _recent_starts.popleft()
+    return len(_recent_starts) < SPECULATION_MAX_PER_MINUTE
+
+def _prune_active():
+    """Forget sessions whose speculation the supervisor has evicted (quiz abandoned, never submitted)"""
+    global _last_prune
+    now = time.monotonic()
+    if now - _last_prune < PRUNE_INTERVAL_SECONDS:
+        return
+    _last_prune = now
+    for speculation_id, job_key in list(_active.items()):
+        if speculation_supervisor.status(job_key) is None:
+            del _active[speculation_id]
+
+def _cancel_local(speculation_id: str):
+    job_key = _active.pop(speculation_id, None)
+    if job_key is not None:
+        speculation_supervisor.cancel(job_key)
+
+async def _generate(
+    speculation_id: str,
+    inputs: str,
+    company_name: str,
+    website_url: str,
+    influencer_style: str,
+    industry: str,
+    script_mode: str
+):
+    async def compute():
+        company_data = await get_company_summary(company_name, website_url)
+        # The submit may have come and gone while the summary was fetched
+        if await asyncio.to_thread(shared_cache.get, _closed_key(speculation_id)):
+            return None
+        content = await generate_content(influencer_style, industry, company_data, script_mode)
+        return {"inputs": inputs, "company_summary": company_data, "content": content}
+
+    await shared_cache.get_or_compute(_result_key(speculation_id), compute, ttl_seconds=SPECULATION_TTL_SECONDS)
+
+async def speculate(
+    speculation_id: str,
+    user_info: Dict[str, Any],
+    answers: List[Dict[str, Any]],
+    script_mode: Optional[str] = None
+) -> str:
+    """
+    Start generating for a quiz still in progress, in the script mode the
+    submit will ask for (SCRIPT_MODE unless given). Returns "started",
+    "queued", "duplicate", "undecided" (inputs not fixed yet) or "skipped"
+    (over the speculative spend cap).
+    """
+    company_name, website_url = user_info.get("company_name"), user_info.get("website_url")
+    if not company_name or not website_url:
+        return "undecided"
+    _, influencer_style, industry = content_profile(answers)
+    script_mode = resolve_script_mode(script_mode)
+    inputs = _inputs_key(influencer_style, industry, website_url, script_mode)
+    job_key = f"{speculation_id}:{inputs}"
+
+    _prune_active()
+    previous = _active.get(speculation_id)
+    if previous == job_key and speculation_supervisor.status(job_key) is not None:
+        return "duplicate"
+    if previous is not None:
+        # The answers moved the inputs; the earlier speculation can no longer be adopted
+        _cancel_local(speculation_id)
+
+    if not _within_budget():
+        SPECULATIONS.inc(outcome="skipped")
+        return "skipped"
+
+    outcome = speculation_supervisor.submit(
+        job_key,
+        lambda: _generate(speculation_id, inputs, company_name, website_url, influencer_style, industry, script_mode)
+    )
+    if outcome == "rejected":
+        SPECULATIONS.inc(outcome="skipped")
+        return "skipped"
+    if outcome in ("started", "queued"):
+        _recent_starts.append(time.monotonic())
+        _active[speculation_id] = job_key
+        await asyncio.to_thread(shared_cache.put, _inputs_marker_key(speculation_id), inputs, SPECULATION_TTL_SECONDS)
+        SPECULATIONS.inc(outcome="started")
+    return outcome
+
+async def adopt(speculation_id: str, quiz_data: dict) -> Optional[Dict[str, Any]]:
+    """
+    Company summary and content speculated for this submission, or None when
+    there is none or it was made for different inputs. Waits for a
+    speculation that is still running (on any worker).
+    """
+    user_info = quiz_data.get("user_info") or {}
+    if not user_info.get("website_url"):
+        return None
+    _, influencer_style, industry = content_profile(quiz_data.get("answers", []))
+    script_mode = resolve_script_mode(quiz_data.get("script_mode"))
+    inputs = _inputs_key(influencer_style, industry, user_info["website_url"], script_mode)
+
+    prepared = None
+    try:
+        marker = await asyncio.to_thread(shared_cache.get, _inputs_marker_key(speculation_id))
+        if marker is None:
+            SPECULATIONS.inc(outcome="missed")
+        elif marker != inputs:
+            SPECULATIONS.inc(outcome="mismatched")
+        else:
+            async def nothing():
+                return None
+            # Joins the running speculation; returns None at once if nobody holds it
+            speculated = await shared_cache.get_or_compute(
+                _result_key(speculation_id), nothing, ttl_seconds=SPECULATION_TTL_SECONDS
+            )
+            if speculated and speculated.get("inputs") == inputs:
+                SPECULATIONS.inc(outcome="adopted")
+                logger.info(f"♻️ Adopting speculative content for {speculation_id}")
+                prepared = speculated
+            else:
+                SPECULATIONS.inc(outcome="missed")
+    finally:
+        # One submit per speculation: stop whatever is still queued or running for it
+        _cancel_local(speculation_id)
+        await asyncio.to_thread(shared_cache.put, _closed_key(speculation_id), True, SPECULATION_TTL_SECONDS)
+        await asyncio.to_thread(shared_cache.delete, _result_key(speculation_id))
+    return prepared
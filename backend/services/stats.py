@@ -0,0 +1,181 @@
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from models.models import (
+    ArchivedResult, QuizResult, ScriptResult, StatsDailyCount, StatsLatencyBucket, StatsLatencyTotal
+)
+from services.influencer_matcher import industry_from_answers
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = [0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 30, 45, 60, 90, 120]
+INF_BUCKET = "+Inf"
+
+def bucket_label(seconds: float) -> str:
+    """Label of the histogram bucket a duration falls into"""
+    for bound in LATENCY_BUCKETS:
+        if seconds <= bound:
+            return str(bound)
+    return INF_BUCKET
+
+def _increment(db: Session, model, keys: Dict[str, Any], values: Dict[str, float]):
+    """Add `values` to the rollup row identified by `keys`, creating it if needed"""
+    filters = [getattr(model, name) == value for name, value in keys.items()]
+    updated = db.execute(
+        update(model)
+        .where(*filters)
+        .values({name: getattr(model, name) + amount for name, amount in values.items()})
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not updated:
+        # A concurrent first insert for the same key would violate the unique
+        # constraint; the caller's transaction retry covers that rare case.
+        db.add(model(**keys, **values))
+        db.flush()
+
+def record_submission(
+    db: Session,
+    created_at: datetime,
+    influencer: str,
+    industry: str,
+    timing: Optional[Dict[str, float]]
+):
+    """Fold one submission into the rollups. Runs inside the caller's transaction."""
+    day = created_at.date()
+    _increment(
+        db, StatsDailyCount,
+        {"day": day, "influencer": influencer, "industry": industry},
+        {"submissions": 1}
+    )
+    for stage, seconds in (timing or {}).items():
+        if seconds is None:
+            continue
+        _increment(db, StatsLatencyBucket, {"day": day, "stage": stage, "le": bucket_label(seconds)}, {"count": 1})
+        _increment(db, StatsLatencyTotal, {"day": day, "stage": stage}, {"count": 1, "total_seconds": seconds})
+
+def _quantile(buckets: Dict[str, int], total: int, q: float) -> Optional[float]:
+    """Estimate a quantile from bucket counts (upper bound of the bucket that reaches it)"""
+    if not total:
+        return None
+    target = q * total
+    seen = 0
+    for bound in LATENCY_BUCKETS:
+        seen += buckets.get(str(bound), 0)
+        if seen >= target:
+            return float(bound)
+    return None  # Falls in the +Inf bucket
+
+def get_stats(db: Session, days: int = 7) -> Dict[str, Any]:
+    """Read the rollups for the last `days` days; cost depends on days, not on stored results"""
+    since = datetime.utcnow().date() - timedelta(days=days - 1)
+
+    daily = []
+    by_influencer = defaultdict(int)
+    by_industry = defaultdict(int)
+    for row in db.query(StatsDailyCount).filter(StatsDailyCount.day >= since).order_by(StatsDailyCount.day):
+        daily.append({
+            "day": row.day.isoformat(),
+            "influencer": row.influencer,
+            "industry": row.industry,
+            "submissions": row.submissions
+        })
+        by_influencer[row.influencer] += row.submissions
+        by_industry[row.industry] += row.submissions
+
+    totals = defaultdict(lambda: {"count": 0, "total_seconds": 0.0})
+    for row in db.query(StatsLatencyTotal).filter(StatsLatencyTotal.day >= since):
+        totals[row.stage]["count"] += row.count
+        totals[row.stage]["total_seconds"] += row.total_seconds
+
+    buckets = defaultdict(lambda: defaultdict(int))
+    for row in db.query(StatsLatencyBucket).filter(StatsLatencyBucket.day >= since):
+        buckets[row.stage][row.le] += row.count
+
+    latency = {}
+    for stage, total in totals.items():
+        count = total["count"]
+        latency[stage] = {
+            "count": count,
+            "avg_seconds": round(total["total_seconds"] / count, 3) if count else None,
+            "p50_seconds": _quantile(buckets[stage], count, 0.5),
+            "p95_seconds": _quantile(buckets[stage], count, 0.95),
+            "buckets": {le: buckets[stage].get(le, 0) for le in [str(b) for b in LATENCY_BUCKETS] + [INF_BUCKET]}
+        }
+
+    return {
+        "days": days,
+        "since": since.isoformat(),
+        "total_submissions": sum(by_influencer.values()),
+        "by_influencer": dict(by_influencer),
+        "by_industry": dict(by_industry),
+        "daily": daily,
+        "latency": latency
+    }
+
+def _latest_answers(db: Session, user_ids: List[int]) -> Dict[int, list]:
+    """Most recent quiz answers of each user, in one query"""
+    latest = {}
+    if user_ids:
+        for quiz_result in db.query(QuizResult).filter(QuizResult.user_id.in_(user_ids)).order_by(QuizResult.id):
+            latest[quiz_result.user_id] = quiz_result.answers or []
+    return latest
+
+def rebuild_stats(db: Session, batch_size: int = 500) -> int:
+    """
+    Recompute every rollup from script_results and archived_results (and quiz
+    answers for older rows), so results moved out by the retention job still count
+    """
+    db.query(StatsDailyCount).delete(synchronize_session=False)
+    db.query(StatsLatencyBucket).delete(synchronize_session=False)
+    db.query(StatsLatencyTotal).delete(synchronize_session=False)
+
+    processed = 0
+    last_id = 0
+    while True:
+        results: List[ScriptResult] = (
+            db.query(ScriptResult)
+            .filter(ScriptResult.id > last_id)
+            .order_by(ScriptResult.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not results:
+            break
+
+        answers = _latest_answers(db, list({r.user_id for r in results if r.industry is None and r.user_id}))
+        for result in results:
+            industry = result.industry
+            if industry is None:
+                industry = industry_from_answers(answers.get(result.user_id, []))
+            record_submission(db, result.created_at, result.influencer, industry, result.timing)
+        processed += len(results)
+        last_id = results[-1].id
+        db.expunge_all()
+
+    last_id = 0
+    while True:
+        archived: List[ArchivedResult] = (
+            db.query(ArchivedResult)
+            .filter(ArchivedResult.id > last_id)
+            .order_by(ArchivedResult.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not archived:
+            break
+
+        for row in archived:
+            payload = row.payload or {}
+            industry = payload.get("industry") or industry_from_answers(payload.get("answers") or [])
+            record_submission(db, row.result_created_at, payload.get("influencer"), industry, payload.get("timing"))
+        processed += len(archived)
+        last_id = archived[-1].id
+        db.expunge_all()
+
+    db.commit()
+    logger.info(f"Rebuilt stats from {processed} results")
+    return processed
@@ -13,5 +13,8 @@ pip install beautifulsoup4
 # Set Python path
 export PYTHONPATH=/Users/alexander/projects/quiz/backend
 
+# Apply schema changes (the API no longer does this on import)
+python init_db.py
+
 # Start the server
 python -m uvicorn main:app --host 0.0.0.0 --port 8002 --reload 
\ No newline at end of file
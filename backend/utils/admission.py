@@ -0,0 +1,177 @@
+"""
+Admission control for the generation pipeline.
+
+At most PIPELINE_CONCURRENCY pipelines (scrape + DeepSeek + DB write) run at
+once; up to PIPELINE_QUEUE_SIZE more wait in FIFO order. A request is
+rejected with 503 and Retry-After when the queue is full, or when the
+expected wait (from a moving average of pipeline duration) means it could
+not finish within PIPELINE_TIMEOUT_SECONDS anyway. Excess load is shed
+up front instead of every request timing out together. A request with its
+own deadline (utils/deadline.py) may wait until only enough of it is left
+for a degraded run (placeholder summary, scripts deferred).
+
+Cheap endpoints (questions, health, metrics, stored results) never take a
+pipeline slot, so they stay responsive while the pipeline lane is saturated.
+"""
+import asyncio
+import logging
+import math
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Optional
+from fastapi import HTTPException
+from utils.metrics import Counter, Gauge
+from utils import deadline as request_deadline
+
+logger = logging.getLogger(__name__)
+
+PIPELINE_CONCURRENCY = int(os.getenv("PIPELINE_CONCURRENCY", "16"))
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "32"))
+# How long a client waits for submit-quiz before giving up
+PIPELINE_TIMEOUT_SECONDS = float(os.getenv("PIPELINE_TIMEOUT_SECONDS", "90"))
+
+# Starting guess for the pipeline duration until real samples arrive
+INITIAL_SERVICE_SECONDS = 20.0
+# Least of a request deadline a degraded pipeline can still do something useful with
+MIN_DEGRADED_SECONDS = request_deadline.MIN_REQUEST_DEADLINE_SECONDS
+EWMA_ALPHA = 0.2
+
+ADMISSION_DECISIONS = Counter(
+    "quiz_admission_decisions_total",
+    "Admission decisions by lane and outcome",
+    labelnames=("lane", "outcome")
+)
+
+class Overloaded(Exception):
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+class AdmissionController:
+    """Concurrency limit with a bounded, deadline-aware FIFO wait queue"""
+
+    def __init__(self, name: str, limit: int, queue_size: int):
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.active = 0
+        self.service_seconds = INITIAL_SERVICE_SECONDS
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def expected_wait(self, position: int) -> float:
+        """Seconds until the request at queue `position` (0-based) gets a slot"""
+        return (position + 1) * self.service_seconds / self.limit
+
+    def retry_after(self) -> int:
+        return max(1, math.ceil(self.expected_wait(self.queued)))
+
+    def _reject(self, reason: str):
+        ADMISSION_DECISIONS.inc(lane=self.name, outcome=reason)
+        logger.warning(f"⚠️ Shedding {self.name} request ({reason}): {self.active} active, {self.queued} queued")
+        raise Overloaded(reason, self.retry_after())
+
+    async def acquire(self, deadline: Optional[float] = None):
+        """
+        Wait for a slot. `deadline` is the monotonic time by which the work must
+        have started to still finish in time; raises Overloaded otherwise.
+        """
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            ADMISSION_DECISIONS.inc(lane=self.name, outcome="admitted")
+            return
+
+        if len(self._waiters) >= self.queue_size:
+            self._reject("queue_full")
+        now = time.monotonic()
+        if deadline is not None and now + self.expected_wait(len(self._waiters)) > deadline:
+            self._reject("deadline")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            timeout = None if deadline is None else max(deadline - now, 0)
+            await asyncio.wait_for(asyncio.shield(waiter), timeout)
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot arrived just as the deadline passed; hand it on
+                self._release_slot()
+            else:
+                waiter.cancel()
+            self._remove(waiter)
+            self._reject("deadline")
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._release_slot()
+            else:
+                waiter.cancel()
+            self._remove(waiter)
+            raise
+        ADMISSION_DECISIONS.inc(lane=self.name, outcome="admitted")
+
+    def _remove(self, waiter: asyncio.Future):
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def _release_slot(self):
+        # Hand the slot straight to the oldest live waiter, keeping `active` unchanged
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def release(self, duration: Optional[float] = None):
+        if duration is not None:
+            self.service_seconds += EWMA_ALPHA * (duration - self.service_seconds)
+        self._release_slot()
+
+    @asynccontextmanager
+    async def slot(self, deadline: Optional[float] = None):
+        await self.acquire(deadline)
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - start)
+
+pipeline_admission = AdmissionController("pipeline", PIPELINE_CONCURRENCY, PIPELINE_QUEUE_SIZE)
+
+Gauge("quiz_pipeline_active", "Pipelines currently running", lambda: pipeline_admission.active)
+Gauge("quiz_pipeline_queued", "Pipelines waiting for a slot", lambda: pipeline_admission.queued)
+Gauge("quiz_pipeline_service_seconds", "Moving average of pipeline duration", lambda: pipeline_admission.service_seconds)
+
+@asynccontextmanager
+async def admit_pipeline():
+    """
+    Hold a pipeline slot for the block, raising 503 + Retry-After when shed.
+    The work must start early enough to finish within PIPELINE_TIMEOUT_SECONDS,
+    or, under a request deadline, early enough to finish degraded within it.
+    """
+    budget = request_deadline.current()
+    if budget is not None:
+        deadline = budget.expires_at - MIN_DEGRADED_SECONDS
+    else:
+        deadline = time.monotonic() + PIPELINE_TIMEOUT_SECONDS - pipeline_admission.service_seconds
+    try:
+        await pipeline_admission.acquire(deadline)
+    except Overloaded as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Server is busy ({e.reason}), please retry",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        pipeline_admission.release(time.monotonic() - start)
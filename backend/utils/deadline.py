@@ -0,0 +1,102 @@
+"""
+Per-request deadline budget.
+
+A submission gets one deadline for the whole request: the client's
+X-Request-Deadline header (seconds), a `deadline_seconds` body field, or
+REQUEST_DEADLINE_SECONDS, clamped to MAX_REQUEST_DEADLINE_SECONDS. It is
+carried in a context variable, so every stage (admission, company summary,
+generation) can ask how much time is left and take a cheaper path instead
+of overrunning. Each such degradation is recorded on the deadline and
+reported in the response's `timing`.
+
+Without a deadline in scope (batch runs, the CLI) stages behave as before.
+"""
+import asyncio
+import logging
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Iterator, List, Optional
+from utils.metrics import Counter
+from utils.tracing import set_attribute
+
+logger = logging.getLogger(__name__)
+
+DEADLINE_HEADER = "X-Request-Deadline"
+REQUEST_DEADLINE_SECONDS = float(os.getenv("REQUEST_DEADLINE_SECONDS", "60"))
+MAX_REQUEST_DEADLINE_SECONDS = float(os.getenv("MAX_REQUEST_DEADLINE_SECONDS", "90"))
+# Below this not even a placeholder summary and one idea can be produced
+MIN_REQUEST_DEADLINE_SECONDS = 5.0
+
+DEGRADATIONS = Counter(
+    "quiz_degradations_total",
+    "Submissions served a cheaper result to meet their deadline, by what was cut",
+    labelnames=("reason",)
+)
+
+class Deadline:
+    """Monotonic expiry of one request plus the degradations taken to meet it"""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+        self.degradations: List[str] = []
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def degrade(self, reason: str):
+        if reason in self.degradations:
+            return
+        self.degradations.append(reason)
+        DEGRADATIONS.inc(reason=reason)
+        set_attribute("deadline.degradations", ",".join(self.degradations))
+        logger.warning(f"⚠️ Degrading ({reason}) with {self.remaining():.1f}s of {self.seconds:.0f}s left")
+
+_current: ContextVar[Optional[Deadline]] = ContextVar("request_deadline", default=None)
+
+def current() -> Optional[Deadline]:
+    """Deadline of the request being handled, if it has one"""
+    return _current.get()
+
+def resolve_seconds(header_value: Optional[str] = None, body_value: Any = None) -> float:
+    """
+    Budget requested by the client (header first, then body), else the
+    default SLO. Raises ValueError for a value that is not a number.
+    """
+    requested = header_value if header_value not in (None, "") else body_value
+    if requested is None:
+        return REQUEST_DEADLINE_SECONDS
+    try:
+        seconds = float(requested)
+    except (TypeError, ValueError):
+        raise ValueError(f"{DEADLINE_HEADER} must be a number of seconds")
+    if seconds != seconds:  # NaN
+        raise ValueError(f"{DEADLINE_HEADER} must be a number of seconds")
+    return min(max(seconds, MIN_REQUEST_DEADLINE_SECONDS), MAX_REQUEST_DEADLINE_SECONDS)
+
+@contextmanager
+def deadline_scope(seconds: float) -> Iterator[Deadline]:
+    """Run the block (and tasks it starts) under a deadline `seconds` from now"""
+    deadline = Deadline(seconds)
+    token = _current.set(deadline)
+    set_attribute("deadline.seconds", seconds)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+def _consume_result(task: asyncio.Future):
+    if not task.cancelled():
+        task.exception()
+
+async def wait_shielded(awaitable: Awaitable, timeout: float) -> Any:
+    """
+    Wait up to `timeout` seconds, raising asyncio.TimeoutError after that.
+    The work itself is not cancelled: it finishes in the background, so
+    shared results (a scrape other requests wait on) are not wasted.
+    """
+    task = asyncio.ensure_future(awaitable)
+    task.add_done_callback(_consume_result)
+    return await asyncio.wait_for(asyncio.shield(task), max(timeout, 0))
@@ -0,0 +1,155 @@
+"""
+Negotiated gzip / brotli response compression.
+
+Bodies below HTTP_COMPRESSION_MIN_BYTES, non-text content types and responses
+that already carry a Content-Encoding (e.g. the pre-compressed question bank)
+pass through untouched. Streamed responses are compressed chunk by chunk.
+Brotli is used when the `brotli` package is installed and the client accepts it.
+
+Environment:
+    HTTP_COMPRESSION_MIN_BYTES   smallest body worth compressing (default 1024)
+    HTTP_GZIP_LEVEL              gzip level for dynamic responses (default 5)
+    HTTP_BROTLI_QUALITY          brotli quality for dynamic responses (default 4)
+"""
+import gzip
+import os
+import zlib
+from typing import Optional, Sequence
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # Optional; gzip is always available
+    brotli = None
+
+HTTP_COMPRESSION_MIN_BYTES = int(os.getenv("HTTP_COMPRESSION_MIN_BYTES", "1024"))
+HTTP_GZIP_LEVEL = int(os.getenv("HTTP_GZIP_LEVEL", "5"))
+HTTP_BROTLI_QUALITY = int(os.getenv("HTTP_BROTLI_QUALITY", "4"))
+
+SUPPORTED_ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/x-ndjson", "application/javascript")
+
+def choose_encoding(accept_encoding: Optional[str], available: Sequence[str] = SUPPORTED_ENCODINGS) -> Optional[str]:
+    """Best encoding from `available` (in server preference order) the client accepts"""
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    for encoding in available:
+        if accepted.get(encoding, accepted.get("*", 0)) > 0:
+            return encoding
+    return None
+
+def compress(data: bytes, encoding: str, static: bool = False) -> bytes:
+    """One-shot compression; `static` payloads are compressed once, so use the slowest setting"""
+    if encoding == "br":
+        return brotli.compress(data, quality=11 if static else HTTP_BROTLI_QUALITY)
+    # mtime=0 keeps the output (and so any ETag over it) stable across restarts
+    return gzip.compress(data, compresslevel=9 if static else HTTP_GZIP_LEVEL, mtime=0)
+
+class _StreamCompressor:
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=HTTP_BROTLI_QUALITY)
+            self._flush = self._compressor.flush
+            self._finish = self._compressor.finish
+            self._compress = self._compressor.process
+        else:
+            self._compressor = zlib.compressobj(HTTP_GZIP_LEVEL, zlib.DEFLATED, 31)
+            self._flush = lambda: self._compressor.flush(zlib.Z_SYNC_FLUSH)
+            self._finish = self._compressor.flush
+            self._compress = self._compressor.compress
+
+    def chunk(self, data: bytes, last: bool) -> bytes:
+        # Flush every chunk so streamed rows reach the client as they are produced
+        return self._compress(data) + (self._finish() if last else self._flush())
+
+def _is_compressible(headers: Headers) -> bool:
+    if "content-encoding" in headers:
+        return False
+    content_type = headers.get("content-type", "")
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+def _add_vary(headers: MutableHeaders):
+    vary = headers.get("vary")
+    if not vary:
+        headers["Vary"] = "Accept-Encoding"
+    elif "accept-encoding" not in vary.lower():
+        headers["Vary"] = f"{vary}, Accept-Encoding"
+
+class CompressionMiddleware:
+    """ASGI middleware compressing responses according to Accept-Encoding"""
+
+    def __init__(self, app, minimum_size: int = HTTP_COMPRESSION_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        compressor: Optional[_StreamCompressor] = None
+
+        async def compressing_send(message):
+            nonlocal start_message, compressor
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if start_message is not None:
+                start, start_message = start_message, None
+                headers = MutableHeaders(raw=start["headers"])
+                if not _is_compressible(headers):
+                    await send(start)
+                    await send(message)
+                    return
+                _add_vary(headers)
+                if not more_body:
+                    if len(body) < self.minimum_size:
+                        await send(start)
+                        await send(message)
+                        return
+                    body = compress(body, encoding)
+                    headers["Content-Encoding"] = encoding
+                    headers["Content-Length"] = str(len(body))
+                    await send(start)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                # Streamed body: compress incrementally, length is no longer known
+                compressor = _StreamCompressor(encoding)
+                headers["Content-Encoding"] = encoding
+                del headers["Content-Length"]
+                await send(start)
+
+            if compressor is not None:
+                await send({
+                    "type": "http.response.body",
+                    "body": compressor.chunk(body, last=not more_body),
+                    "more_body": more_body
+                })
+            else:
+                await send(message)
+
+        await self.app(scope, receive, compressing_send)
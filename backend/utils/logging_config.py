@@ -0,0 +1,131 @@
+"""
+Logging setup: records are handed to a bounded queue on the calling thread
+and written by a background listener thread, so request handlers never
+block on stream or file I/O.
+
+Environment:
+    LOG_LEVEL                  root level (default INFO)
+    LOG_LEVELS                 per-logger overrides, e.g. "services.scraper=WARNING,uvicorn.access=WARNING"
+    LOG_FORMAT                 "json" (default) or "text"
+    LOG_FILE                   optional file path (rotated at LOG_FILE_MAX_BYTES)
+    LOG_QUEUE_SIZE             records buffered before new ones are dropped
+    LOG_PAYLOAD_SAMPLE_RATE    fraction of payload logs (raw LLM output, scripts) kept
+    LOG_MAX_BODY_CHARS         size cap for logged payload bodies
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+PAYLOAD_LOGGER_PREFIX = "payload"
+LOG_MAX_BODY_CHARS = int(os.getenv("LOG_MAX_BODY_CHARS", "500"))
+LOG_PAYLOAD_SAMPLE_RATE = float(os.getenv("LOG_PAYLOAD_SAMPLE_RATE", "0.01"))
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+def truncate(value: Any, limit: int = LOG_MAX_BODY_CHARS) -> str:
+    """Cap a logged body, noting how much was cut"""
+    text = value if isinstance(value, str) else repr(value)
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}... [{len(text) - limit} more chars]"
+
+class SamplingFilter(logging.Filter):
+    """Keep roughly `rate` of the records; warnings and errors always pass"""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.WARNING or random.random() < self.rate
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full"""
+
+    dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            DroppingQueueHandler.dropped += 1
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+def get_payload_logger(name: str) -> logging.Logger:
+    """
+    Logger for verbose payloads (raw API responses, full scripts).
+    Sampled at LOG_PAYLOAD_SAMPLE_RATE; bodies should go through truncate().
+    """
+    payload_logger = logging.getLogger(f"{PAYLOAD_LOGGER_PREFIX}.{name}")
+    # Logger filters are not inherited by children, so each payload logger gets its own
+    if not any(isinstance(f, SamplingFilter) for f in payload_logger.filters):
+        payload_logger.addFilter(SamplingFilter(LOG_PAYLOAD_SAMPLE_RATE))
+    return payload_logger
+
+def _parse_levels(spec: str):
+    for item in spec.split(","):
+        if "=" in item:
+            name, level = item.split("=", 1)
+            yield name.strip(), level.strip().upper()
+
+def configure_logging():
+    """Install the queue-backed handlers once per process"""
+    global _listener
+    if _listener is not None:
+        return
+
+    if os.getenv("LOG_FORMAT", "json") == "json":
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    handlers = [logging.StreamHandler()]
+    log_file = os.getenv("LOG_FILE")
+    if log_file:
+        handlers.append(logging.handlers.RotatingFileHandler(
+            log_file,
+            maxBytes=int(os.getenv("LOG_FILE_MAX_BYTES", str(50 * 1024 * 1024))),
+            backupCount=int(os.getenv("LOG_FILE_BACKUPS", "5"))
+        ))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.Queue(maxsize=int(os.getenv("LOG_QUEUE_SIZE", "10000")))
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(DroppingQueueHandler(log_queue))
+    root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+    for name, level in _parse_levels(os.getenv("LOG_LEVELS", "")):
+        logging.getLogger(name).setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,202 @@
+"""
+Supervised background tasks.
+
+Fire-and-forget work (company pre-fetches, speculative generation) goes through
+a TaskSupervisor instead of a bare asyncio.create_task:
+
+- at most `concurrency` jobs run at once; up to `queue_size` more wait,
+  and anything beyond that is rejected instead of piling up scrapes
+- jobs are keyed, so submitting a key that is queued or running is a no-op
+- every job has a deadline counted from submission; a job still queued at
+  its deadline is dropped, a running one is cancelled
+- finished jobs are remembered for `result_ttl` seconds (so a repeated
+  submit right after a success is also a no-op) and then evicted
+- failures are logged and counted here, never left as "exception was never
+  retrieved" on an unawaited task
+- shutdown() stops intake, lets in-flight work drain for a grace period and
+  cancels whatever is left
+
+Environment:
+    PREFETCH_CONCURRENCY          pre-fetches running at once (default 4)
+    PREFETCH_QUEUE_SIZE           pre-fetches waiting for a slot (default 64)
+    PREFETCH_TIMEOUT_SECONDS      deadline per pre-fetch, queue time included (default 60)
+    PREFETCH_RESULT_TTL_SECONDS   how long a finished pre-fetch is remembered (default 300)
+    SHUTDOWN_GRACE_SECONDS        how long shutdown waits for in-flight work (default 10)
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+from utils.metrics import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+PREFETCH_CONCURRENCY = int(os.getenv("PREFETCH_CONCURRENCY", "4"))
+PREFETCH_QUEUE_SIZE = int(os.getenv("PREFETCH_QUEUE_SIZE", "64"))
+PREFETCH_TIMEOUT_SECONDS = float(os.getenv("PREFETCH_TIMEOUT_SECONDS", "60"))
+PREFETCH_RESULT_TTL_SECONDS = float(os.getenv("PREFETCH_RESULT_TTL_SECONDS", "300"))
+SHUTDOWN_GRACE_SECONDS = float(os.getenv("SHUTDOWN_GRACE_SECONDS", "10"))
+
+BACKGROUND_TASKS = Counter(
+    "quiz_background_tasks_total",
+    "Background task events by supervisor and outcome",
+    labelnames=("supervisor", "outcome")
+)
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+TIMED_OUT = "timed_out"
+CANCELLED = "cancelled"
+FINISHED_STATES = (SUCCEEDED, FAILED, TIMED_OUT, CANCELLED)
+
+class _Job:
+    def __init__(self, key: str, deadline: float):
+        self.key = key
+        self.deadline = deadline
+        self.state = QUEUED
+        self.error: Optional[str] = None
+        self.finished_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+
+class TaskSupervisor:
+    """Bounded, deduplicating runner for background coroutines"""
+
+    def __init__(
+        self,
+        name: str,
+        concurrency: int,
+        queue_size: int,
+        timeout: float,
+        result_ttl: float
+    ):
+        self.name = name
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.result_ttl = result_ttl
+        self.running = 0
+        self.queued = 0
+        self.accepting = True
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._jobs: Dict[str, _Job] = {}
+
+        Gauge(f"quiz_{name}_tasks_running", f"{name} tasks currently running", lambda: self.running)
+        Gauge(f"quiz_{name}_tasks_queued", f"{name} tasks waiting for a slot", lambda: self.queued)
+
+    def _count(self, outcome: str):
+        BACKGROUND_TASKS.inc(supervisor=self.name, outcome=outcome)
+
+    def _evict_expired(self):
+        now = time.monotonic()
+        expired = [
+            key for key, job in self._jobs.items()
+            if job.finished_at is not None and now - job.finished_at >= self.result_ttl
+        ]
+        for key in expired:
+            del self._jobs[key]
+            self._count("evicted")
+
+    def status(self, key: str) -> Optional[str]:
+        """State of the job for `key`, or None when unknown or evicted"""
+        self._evict_expired()
+        job = self._jobs.get(key)
+        return job.state if job else None
+
+    def cancel(self, key: str) -> bool:
+        """Cancel the job for `key` if it is still queued or running"""
+        job = self._jobs.get(key)
+        if job is None or job.task is None:
+            return False
+        job.task.cancel()
+        return True
+
+    def submit(self, key: str, factory: Callable[[], Awaitable[Any]], timeout: Optional[float] = None) -> str:
+        """
+        Schedule `factory()` under `key`. Returns "started", "queued",
+        "duplicate" (already queued, running or recently succeeded) or
+        "rejected" (queue full or shutting down).
+        """
+        self._evict_expired()
+        existing = self._jobs.get(key)
+        if existing is not None and existing.state in (QUEUED, RUNNING, SUCCEEDED):
+            self._count("deduplicated")
+            return "duplicate"
+
+        if not self.accepting or self.queued >= self.queue_size:
+            self._count("rejected")
+            logger.warning(f"⚠️ Rejected {self.name} task {key}: {self.running} running, {self.queued} queued")
+            return "rejected"
+
+        if self._slots is None:
+            # Created lazily so the semaphore binds to the running event loop
+            self._slots = asyncio.Semaphore(self.concurrency)
+
+        job = _Job(key, time.monotonic() + (timeout or self.timeout))
+        will_queue = self.running >= self.concurrency
+        self.queued += 1
+        job.task = asyncio.create_task(self._run(job, factory), name=f"{self.name}:{key}")
+        self._jobs[key] = job
+        self._count("submitted")
+        return "queued" if will_queue else "started"
+
+    async def _run(self, job: _Job, factory: Callable[[], Awaitable[Any]]):
+        acquired = False
+        try:
+            try:
+                await asyncio.wait_for(self._slots.acquire(), max(job.deadline - time.monotonic(), 0))
+                acquired = True
+            finally:
+                self.queued -= 1
+
+            self.running += 1
+            job.state = RUNNING
+            try:
+                await asyncio.wait_for(factory(), max(job.deadline - time.monotonic(), 0))
+            finally:
+                self.running -= 1
+            self._finish(job, SUCCEEDED)
+        except asyncio.TimeoutError:
+            self._finish(job, TIMED_OUT)
+            logger.warning(f"⚠️ {self.name} task {job.key} missed its deadline ({'running' if acquired else 'queued'})")
+        except asyncio.CancelledError:
+            self._finish(job, CANCELLED)
+            # Swallowed on purpose: nothing awaits these tasks, only cancel()/shutdown() cancel them
+        except Exception as e:
+            job.error = str(e)
+            self._finish(job, FAILED)
+            logger.error(f"❌ {self.name} task {job.key} failed: {str(e)}", exc_info=True)
+        finally:
+            if acquired:
+                self._slots.release()
+
+    def _finish(self, job: _Job, state: str):
+        job.state = state
+        job.finished_at = time.monotonic()
+        job.task = None
+        self._count(state)
+
+    async def shutdown(self, grace_seconds: float = SHUTDOWN_GRACE_SECONDS):
+        """Stop intake, wait up to `grace_seconds` for in-flight jobs, cancel the rest"""
+        self.accepting = False
+        pending = [job.task for job in self._jobs.values() if job.task is not None]
+        if not pending:
+            return
+        logger.info(f"🔄 Draining {len(pending)} {self.name} tasks (up to {grace_seconds:.0f}s)")
+        _, still_running = await asyncio.wait(pending, timeout=grace_seconds)
+        for task in still_running:
+            task.cancel()
+        if still_running:
+            await asyncio.wait(still_running)
+            logger.warning(f"⚠️ Cancelled {len(still_running)} {self.name} tasks at shutdown")
+
+prefetch_supervisor = TaskSupervisor(
+    "prefetch",
+    concurrency=PREFETCH_CONCURRENCY,
+    queue_size=PREFETCH_QUEUE_SIZE,
+    timeout=PREFETCH_TIMEOUT_SECONDS,
+    result_ttl=PREFETCH_RESULT_TTL_SECONDS
+)
@@ -1,19 +1,41 @@
 import time
 import logging
+from typing import Optional
+from utils.metrics import STAGE_SECONDS, STAGE_ERRORS
+from utils.tracing import Span
 
 logger = logging.getLogger(__name__)
 
 class Timer:
-    """Timer utility for tracking execution time"""
-    def __init__(self, name: str):
+    """
+    Timer utility for tracking execution time.
+    Works as a sync or async context manager and opens a tracing span for
+    its block; when `stage` is given the duration is also recorded in the
+    quiz_stage_duration_seconds histogram.
+    """
+    def __init__(self, name: str, stage: Optional[str] = None, **attributes):
         self.name = name
-        
-    async def __aenter__(self):
-        self.start = time.time()
-        logger.info(f"🔄 Starting {self.name}...")
+        self.stage = stage
+        self.duration = 0.0
+        self.span = Span(name, stage=stage, **attributes)
+
+    def __enter__(self):
+        logger.debug(f"🔄 Starting {self.name}...")
+        self.span.__enter__()
+        self.start = time.perf_counter()
         return self
-        
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.duration = time.perf_counter() - self.start
+        if self.stage:
+            STAGE_SECONDS.observe(self.duration, stage=self.stage)
+            if exc_type is not None:
+                STAGE_ERRORS.inc(stage=self.stage)
+        self.span.__exit__(exc_type, exc_val, exc_tb)
+        logger.info(f"⏱️ {self.name} took {self.duration:.2f} seconds")
+
+    async def __aenter__(self):
+        return self.__enter__()
+
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        duration = time.time() - self.start
-        logger.info(f"⏱️ {self.name} took {duration:.2f} seconds")
-        self.duration = duration
\ No newline at end of file
+        self.__exit__(exc_type, exc_val, exc_tb)
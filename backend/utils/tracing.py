@@ -0,0 +1,256 @@
+"""
+Lightweight in-process tracing.
+
+Every request gets a trace id; spans opened while handling it (directly,
+through Timer, or through @traced) nest under the request span via a
+context variable, which asyncio tasks and asyncio.to_thread inherit.
+Finished spans are handed to a background thread and exported in batches:
+
+Environment:
+    TRACE_EXPORTER          "none" (default), "file" or "otlp"
+    TRACE_EXPORT_PATH       JSON-lines file for the file exporter (default traces.jsonl)
+    TRACE_OTLP_ENDPOINT     OTLP/HTTP JSON endpoint (default http://localhost:4318/v1/traces)
+    TRACE_QUEUE_SIZE        finished spans buffered before new ones are dropped
+    TRACE_SERVICE_NAME      service.name resource attribute
+"""
+import atexit
+import functools
+import inspect
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+import urllib.request
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "none").lower()
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", "traces.jsonl")
+TRACE_OTLP_ENDPOINT = os.getenv("TRACE_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+TRACE_QUEUE_SIZE = int(os.getenv("TRACE_QUEUE_SIZE", "10000"))
+TRACE_SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "quiz-backend")
+TRACE_HEADER = "X-Trace-Id"
+
+EXPORT_BATCH_SIZE = 256
+EXPORT_INTERVAL_SECONDS = 1.0
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+def _new_id(bits: int) -> str:
+    return f"{random.getrandbits(bits):0{bits // 4}x}"
+
+class Span:
+    """
+    One timed operation. Works as a sync or async context manager; entering
+    makes it the current span, so spans opened inside become its children.
+    """
+    def __init__(self, name: str, trace_id: Optional[str] = None, parent_id: Optional[str] = None, **attributes):
+        self.name = name
+        self.trace_id = trace_id
+        self.parent_id = parent_id
+        self.span_id = _new_id(64)
+        self.attributes: Dict[str, Any] = {k: v for k, v in attributes.items() if v is not None}
+        self.status = "ok"
+        self.error: Optional[str] = None
+        self.start_ns = 0
+        self.end_ns = 0
+        self._token = None
+
+    def set_attribute(self, key: str, value: Any):
+        if value is not None:
+            self.attributes[key] = value
+
+    def __enter__(self):
+        parent = _current_span.get()
+        if self.trace_id is None:
+            self.trace_id = parent.trace_id if parent else _new_id(128)
+            self.parent_id = parent.span_id if parent else None
+        self.start_ns = time.time_ns()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.end_ns = time.time_ns()
+        if exc_type is not None:
+            self.status = "error"
+            self.error = f"{exc_type.__name__}: {exc_val}"
+        _current_span.reset(self._token)
+        _exporter.submit(self)
+
+    async def __aenter__(self):
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.__exit__(exc_type, exc_val, exc_tb)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes
+        }
+
+def span(name: str, **attributes) -> Span:
+    """Open a child of the current span (or a new trace when there is none)"""
+    return Span(name, **attributes)
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+def current_trace_id() -> Optional[str]:
+    active = _current_span.get()
+    return active.trace_id if active else None
+
+def set_attribute(key: str, value: Any):
+    """Attach an attribute to the current span, if any"""
+    active = _current_span.get()
+    if active is not None:
+        active.set_attribute(key, value)
+
+def parse_traceparent(header: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """(trace_id, parent span id) from a W3C traceparent header, or (None, None)"""
+    parts = (header or "").split("-")
+    if len(parts) == 4 and len(parts[1]) == 32 and len(parts[2]) == 16:
+        return parts[1], parts[2]
+    return None, None
+
+def traced(name: Optional[str] = None):
+    """Decorator wrapping every call of a sync or async function in a span"""
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with Span(span_name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with Span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, str):
+        return {"stringValue": value}
+    return {"stringValue": json.dumps(value, default=str)}
+
+def _otlp_span(finished: Span) -> Dict[str, Any]:
+    entry = {
+        "traceId": finished.trace_id,
+        "spanId": finished.span_id,
+        "name": finished.name,
+        "kind": 1,
+        "startTimeUnixNano": str(finished.start_ns),
+        "endTimeUnixNano": str(finished.end_ns),
+        "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in finished.attributes.items()],
+        "status": {"code": 2, "message": finished.error} if finished.status == "error" else {"code": 1}
+    }
+    if finished.parent_id:
+        entry["parentSpanId"] = finished.parent_id
+    return entry
+
+class _SpanExporter:
+    """Buffers finished spans and writes them out from a daemon thread"""
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.dropped = 0
+        self._queue: "queue.Queue[Optional[Span]]" = queue.Queue(maxsize=TRACE_QUEUE_SIZE)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, finished: Span):
+        if self.kind == "none":
+            return
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(finished)
+        except queue.Full:
+            self.dropped += 1
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch: List[Span] = []
+            deadline = time.monotonic() + EXPORT_INTERVAL_SECONDS
+            while len(batch) < EXPORT_BATCH_SIZE:
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0.01))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            if batch:
+                try:
+                    self._export(batch)
+                except Exception as e:
+                    logger.warning(f"⚠️ Dropped {len(batch)} spans, export failed: {str(e)}")
+
+    def _export(self, batch: List[Span]):
+        if self.kind == "file":
+            with open(TRACE_EXPORT_PATH, "a", encoding="utf-8") as f:
+                for finished in batch:
+                    f.write(json.dumps(finished.to_dict(), default=str) + "\n")
+        elif self.kind == "otlp":
+            body = {
+                "resourceSpans": [{
+                    "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": TRACE_SERVICE_NAME}}]},
+                    "scopeSpans": [{"scope": {"name": "quiz"}, "spans": [_otlp_span(s) for s in batch]}]
+                }]
+            }
+            request = urllib.request.Request(
+                TRACE_OTLP_ENDPOINT,
+                data=json.dumps(body).encode("utf-8"),
+                headers={"Content-Type": "application/json"},
+                method="POST"
+            )
+            with urllib.request.urlopen(request, timeout=5) as response:
+                response.read()
+
+    def shutdown(self, timeout: float = 5.0):
+        """Export what is buffered and stop the thread"""
+        if self._thread is None:
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+        self._thread = None
+
+_exporter = _SpanExporter(TRACE_EXPORTER)
+
+def shutdown_tracing():
+    _exporter.shutdown()
+
+atexit.register(shutdown_tracing)
@@ -0,0 +1,44 @@
+import argparse
+import asyncio
+from database import init_db
+from services.cache_warmer import load_targets, warm_companies
+from utils.logging_config import configure_logging
+
+def main():
+    """
+    Scrape and store summaries for known companies before they show up:
+        python warm_cache.py companies.csv --concurrency 4 --rate 30
+    Rerunning with the same checkpoint resumes where an interrupted run stopped.
+    """
+    parser = argparse.ArgumentParser(description="Warm the company summary cache")
+    parser.add_argument("input", help="CSV of company name and website URL (header optional)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Scrapes running at once")
+    parser.add_argument("--rate", type=float, default=30, help="Most scrapes started per minute (0 for no limit)")
+    parser.add_argument("--checkpoint", help="Progress file (defaults to <input>.checkpoint.jsonl)")
+    parser.add_argument("--force", action="store_true", help="Re-scrape companies that already have a fresh summary")
+    args = parser.parse_args()
+
+    configure_logging()
+    init_db()
+    targets = load_targets(args.input)
+    report = asyncio.run(warm_companies(
+        targets,
+        checkpoint_path=args.checkpoint or f"{args.input}.checkpoint.jsonl",
+        concurrency=args.concurrency,
+        rate_per_minute=args.rate or None,
+        force=args.force
+    ))
+
+    print(f"Companies:         {report['targets']} ({report['skipped_checkpoint']} already done in an earlier run)")
+    print(f"Warmed:            {report['warmed']}")
+    print(f"Already fresh:     {report['already_fresh']}")
+    print(f"Failed:            {len(report['failed'])}")
+    if "scrape_seconds" in report:
+        timing = report["scrape_seconds"]
+        print(f"Scrape time:       median {timing['median']:.2f}s, p95 {timing['p95']:.2f}s, max {timing['max']:.2f}s")
+    print(f"Elapsed:           {report['elapsed_seconds']:.2f}s")
+    for failure in report["failed"]:
+        print(f"  {failure['domain']}: {failure['error']}")
+
+if __name__ == "__main__":
+    main()
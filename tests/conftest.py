@@ -0,0 +1,84 @@
+import os
+import sys
+import tempfile
+
+# Tests import the backend modules the way the app does (services.*, utils.*)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+# Never touch a real database or cache file
+_scratch = tempfile.mkdtemp(prefix="quiz-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_scratch, 'quiz_app.db')}")
+os.environ.setdefault("SHARED_CACHE_PATH", os.path.join(_scratch, "shared_cache.db"))
+os.environ.setdefault("DEEPSEEK_API_KEY", "test")
+
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+import pytest
+
+def quiz_body(company: str = "Acme", website: str = "acme.test", **extra):
+    body = {
+        "user_info": {"name": "n", "company_name": company, "website_url": website},
+        "answers": [{"question_id": q, "answer": "A"} for q in range(1, 6)],
+    }
+    body.update(extra)
+    return body
+
+@asynccontextmanager
+async def local_site(routes):
+    """Serve `routes` ({(method, path): handler}) on 127.0.0.1; yields the base URL"""
+    from aiohttp import web
+    app = web.Application()
+    for (method, path), handler in routes.items():
+        app.router.add_route(method, path, handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    try:
+        yield f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+    finally:
+        await runner.cleanup()
+
+@pytest.fixture
+def fake_pipeline(monkeypatch):
+    """Stand-ins for the scrape and DeepSeek calls; `calls` records each call by name"""
+    from services import pipeline
+    fake = SimpleNamespace(calls=[], delay=0.01)
+    calls = fake.calls
+
+    async def scrape(company_name, website_url, *args, **kwargs):
+        calls.append("scrape")
+        return [f"{company_name} point {i}" for i in range(5)]
+
+    async def generate_all(influencer_style, industry, company_data, num_ideas=5):
+        calls.append("generate_all")
+        await asyncio.sleep(fake.delay)
+        ideas = [{"title": f"Idea {i}", "concept": "c", "appeal": "a"} for i in range(num_ideas)]
+        return {"ideas": ideas, "scripts": [{"title": idea["title"], "content": f"Script {i}"} for i, idea in enumerate(ideas)]}
+
+    async def generate_ideas(influencer_style, industry, company_data, num_ideas=5):
+        calls.append("generate_ideas")
+        await asyncio.sleep(fake.delay)
+        return [{"title": f"Idea {i}", "concept": "c", "appeal": "a"} for i in range(num_ideas)]
+
+    monkeypatch.setattr(pipeline, "scrape_company_data", scrape)
+    monkeypatch.setattr(pipeline, "generate_all_content", generate_all)
+    monkeypatch.setattr(pipeline, "generate_video_ideas", generate_ideas)
+    return fake
+
+@pytest.fixture
+def client():
+    """The app with its lifespan run; background supervisors accept work again afterwards"""
+    from fastapi.testclient import TestClient
+    import main
+    with TestClient(main.app) as test_client:
+        yield test_client
+    # Shutdown stops intake for the life of the process; later tests still need it
+    for supervisor in (
+        main.prefetch_supervisor,
+        main.speculation.speculation_supervisor,
+        main.script_prefetch_supervisor,
+        main.negative_cache.probe_supervisor,
+    ):
+        supervisor.accepting = True
@@ -0,0 +1,61 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from conftest import quiz_body
+from database import init_db
+from utils import admission
+from utils.admission import AdmissionController, Overloaded
+
+def test_full_pipeline_lane_sheds_with_retry_after(client, fake_pipeline, monkeypatch):
+    init_db()
+    monkeypatch.setattr(admission, "pipeline_admission", AdmissionController("pipeline", limit=1, queue_size=0))
+    fake_pipeline.delay = 0.5
+
+    with ThreadPoolExecutor(2) as pool:
+        first = pool.submit(client.post, "/api/submit-quiz", json=quiz_body(company="First", website="first-shed.test"))
+        time.sleep(0.2)
+        shed = client.post("/api/submit-quiz", json=quiz_body(company="Second", website="second-shed.test"))
+        # Cheap endpoints never wait for the pipeline lane
+        questions = client.get("/api/quiz-questions")
+        assert first.result().status_code == 200
+
+    assert shed.status_code == 503
+    assert int(shed.headers["Retry-After"]) >= 1
+    assert questions.status_code == 200
+    assert fake_pipeline.calls.count("generate_all") == 1
+
+def test_waiter_that_cannot_start_in_time_is_rejected_up_front():
+    controller = AdmissionController("test", limit=1, queue_size=4)
+    controller.service_seconds = 20.0
+
+    async def run():
+        await controller.acquire()
+        with pytest.raises(Overloaded) as shed:
+            # The expected wait (20s) is past this request's start-by time
+            await controller.acquire(deadline=time.monotonic() + 1)
+        return shed.value
+
+    assert asyncio.run(run()).reason == "deadline"
+    assert controller.queued == 0
+
+def test_released_slot_goes_to_the_oldest_waiter():
+    controller = AdmissionController("test", limit=1, queue_size=4)
+    order = []
+
+    async def take(name: str):
+        await controller.acquire()
+        order.append(name)
+
+    async def run():
+        await controller.acquire()
+        waiters = [asyncio.create_task(take(name)) for name in ("a", "b")]
+        await asyncio.sleep(0)
+        controller.release()
+        await asyncio.sleep(0)
+        controller.release()
+        await asyncio.gather(*waiters)
+
+    asyncio.run(run())
+    assert order == ["a", "b"]
+    assert controller.active == 1
@@ -0,0 +1,71 @@
+import asyncio
+import gc
+import json
+import uuid
+import pytest
+from conftest import quiz_body
+from database import init_db
+from services import batch, pipeline, shared_cache
+
+def _events(response) -> list:
+    return [json.loads(line) for line in response.iter_lines() if line]
+
+def test_resume_replays_finished_entries_and_runs_the_rest(client, fake_pipeline, monkeypatch):
+    init_db()
+    generate_all = pipeline.generate_all_content
+    flaky = {"down": True}
+
+    async def generate_unless_down(influencer_style, industry, company_data, num_ideas=5):
+        if flaky["down"] and company_data[0].startswith("Flaky"):
+            return {"ideas": [], "scripts": []}
+        return await generate_all(influencer_style, industry, company_data, num_ideas)
+
+    monkeypatch.setattr(pipeline, "generate_all_content", generate_unless_down)
+    entries = [quiz_body(company="Alpha", website="alpha.test"), quiz_body(company="Flaky", website="flaky.test")]
+    batch_id = str(uuid.uuid4())
+
+    with client.stream("POST", "/api/submit-quiz/batch", json={"entries": entries, "batch_id": batch_id}) as response:
+        first = _events(response)
+    assert first[0] == {"type": "batch", "batch_id": batch_id, "total": 2, "completed": 0}
+    assert first[-1]["succeeded"] == 1 and first[-1]["failed"] == 1
+
+    flaky["down"] = False
+    calls_before = fake_pipeline.calls.count("generate_all")
+    with client.stream("POST", "/api/submit-quiz/batch", json={"entries": entries, "batch_id": batch_id}) as response:
+        resumed = _events(response)
+
+    entry_events = {event["index"]: event for event in resumed if event["type"] == "entry"}
+    assert resumed[0]["completed"] == 1
+    assert entry_events[0]["replayed"] and entry_events[0]["result_id"] == next(
+        event["result_id"] for event in first if event.get("index") == 0
+    )
+    assert entry_events[1]["success"] and not entry_events[1].get("replayed")
+    assert resumed[-1] == {"type": "done", "batch_id": batch_id, "succeeded": 2, "failed": 0}
+    # Only the failed entry ran again
+    assert fake_pipeline.calls.count("generate_all") == calls_before + 1
+
+def test_reused_batch_id_with_other_entries_is_refused(client, fake_pipeline):
+    init_db()
+    batch_id = str(uuid.uuid4())
+    with client.stream("POST", "/api/submit-quiz/batch", json={"entries": [quiz_body()], "batch_id": batch_id}) as response:
+        _events(response)
+    other = client.post("/api/submit-quiz/batch", json={"entries": [quiz_body(company="Beta")], "batch_id": batch_id})
+    assert other.status_code == 422
+
+def test_unconsumed_stream_releases_its_lease(fake_pipeline):
+    init_db()
+    batch_id = str(uuid.uuid4())
+    entries = [quiz_body()]
+
+    async def run():
+        events = await batch.start_batch(entries, batch_id)
+        assert shared_cache.is_claimed(f"batch:{batch_id}")
+        with pytest.raises(batch.BatchInProgress):
+            await batch.start_batch(entries, batch_id)
+        # The client goes away before reading anything
+        del events
+        gc.collect()
+        await asyncio.sleep(0.05)
+        return shared_cache.is_claimed(f"batch:{batch_id}")
+
+    assert asyncio.run(run()) is False
@@ -0,0 +1,42 @@
+import asyncio
+from database import init_db
+from services import cache_warmer, shared_cache
+from services.cache_warmer import load_checkpoint, load_targets, warm_companies
+from services.scraper import PLACEHOLDER_MARKER
+
+def test_targets_come_from_a_headed_csv_deduplicated_by_host(tmp_path):
+    path = tmp_path / "companies.csv"
+    path.write_text("website,company\nhttps://www.one.test/,One\none.test,One again\n\nbroken\ntwo.test,Two\n")
+    assert load_targets(str(path)) == [("One", "https://www.one.test/"), ("Two", "two.test")]
+
+def test_warm_run_checkpoints_and_keeps_crashes_out_of_timings(monkeypatch, tmp_path):
+    init_db()
+    monkeypatch.setattr(shared_cache, "SHARED_CACHE_PATH", str(tmp_path / "shared_cache.db"))
+    scraped = []
+
+    async def scrape(company_name, website_url):
+        scraped.append(company_name)
+        if company_name == "Crashes":
+            raise RuntimeError("boom")
+        if company_name == "Placeholder":
+            return ["Site could not be accessed", PLACEHOLDER_MARKER]
+        return [f"{company_name} point {i}" for i in range(3)]
+
+    monkeypatch.setattr(cache_warmer, "scrape_company_data", scrape)
+    targets = [("Warmed", "warmed-ok.test"), ("Crashes", "warm-crash.test"), ("Placeholder", "warm-placeholder.test")]
+    checkpoint = str(tmp_path / "checkpoint.jsonl")
+
+    report = asyncio.run(warm_companies(targets, checkpoint, force=True))
+    assert report["warmed"] == 1
+    assert {failure["domain"] for failure in report["failed"]} == {"warm-crash.test", "warm-placeholder.test"}
+    # The crashed warm has no scrape time; the placeholder one does
+    assert sorted(failure["seconds"] is None for failure in report["failed"]) == [False, True]
+    assert report["scrape_seconds"]["max"] >= report["scrape_seconds"]["median"]
+    assert load_checkpoint(checkpoint) == {"warmed-ok.test"}
+    assert shared_cache.get(cache_warmer.company_cache_key("warmed-ok.test")) == [f"Warmed point {i}" for i in range(3)]
+
+    # A rerun skips what the checkpoint records and retries the failures
+    scraped.clear()
+    report = asyncio.run(warm_companies(targets, checkpoint, force=True))
+    assert report["skipped_checkpoint"] == 1
+    assert sorted(scraped) == ["Crashes", "Placeholder"]
@@ -0,0 +1,13 @@
+from database import SessionLocal, init_db
+from services.company_store import upsert_company
+
+def test_canonical_url_keeps_scraped_url():
+    init_db()
+    db = SessionLocal()
+    try:
+        company = upsert_company(db, "Shop", "http://www.shop.test:8080/store", ["Shop sells things"])
+        db.commit()
+        assert company.domain == "shop.test"
+        assert company.canonical_url == "http://www.shop.test:8080/store"
+    finally:
+        db.close()
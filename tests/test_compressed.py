@@ -0,0 +1,28 @@
+import sys
+from sqlalchemy import create_engine, text
+from models import compressed
+
+def _engine_with_dictionary(codec: bytes, data: bytes):
+    engine = create_engine("sqlite://")
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE compression_dictionaries (id INTEGER PRIMARY KEY, codec TEXT, data BLOB)"))
+        connection.execute(text("INSERT INTO compression_dictionaries VALUES (7, :codec, :data)"), {"codec": codec.decode(), "data": data})
+    return engine
+
+def test_compress_does_not_touch_the_database(monkeypatch):
+    # compress() runs inside flushes; it must never open a connection of its own
+    monkeypatch.setitem(sys.modules, "database", None)
+    value = ("**Hook:** Stop scrolling\n" * 40).encode("utf-8")
+    assert compressed.decompress(compressed.compress(value)) == value
+
+def test_loaded_dictionary_is_used_for_compression(monkeypatch):
+    monkeypatch.setattr(compressed, "_dictionaries", {})
+    monkeypatch.setattr(compressed, "_active_dictionary_id", 0)
+    samples = [f"**Hook:** idea {i}\n**Main Points:**\n- Point one\n- Point two\n**Call to Action:** Follow\n" * 3 for i in range(50)]
+    codec, data = compressed.train_dictionary(samples, size=4096)
+
+    assert compressed.load_dictionaries(_engine_with_dictionary(codec, data)) == 1
+    value = samples[0].encode("utf-8") * 2
+    stored = compressed.compress(value)
+    assert compressed.HEADER.unpack_from(stored)[2] == 7
+    assert compressed.decompress(stored) == value
@@ -0,0 +1,58 @@
+from sqlalchemy import text
+import database
+from database import create_db_engine
+
+def _pragma(engine, name: str):
+    with engine.connect() as connection:
+        return connection.execute(text(f"PRAGMA {name}")).scalar()
+
+def test_production_profile_applies_wal_and_tuned_pragmas(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'prod.db'}", profile="production")
+    assert _pragma(engine, "journal_mode") == "wal"
+    assert _pragma(engine, "synchronous") == 1  # NORMAL
+    assert _pragma(engine, "busy_timeout") == database.SQLITE_PRAGMAS["busy_timeout"]
+    assert _pragma(engine, "auto_vacuum") == 2  # INCREMENTAL
+    engine.dispose()
+
+def test_persistent_pragmas_are_only_written_when_they_differ(tmp_path):
+    path = tmp_path / "reopened.db"
+    create_db_engine(f"sqlite:///{path}", profile="production").connect().close()
+
+    engine = create_db_engine(f"sqlite:///{path}", profile="production")
+    statements = []
+    raw = engine.raw_connection()
+    try:
+        raw.driver_connection.set_trace_callback(statements.append)
+        database._apply_sqlite_pragmas(raw.driver_connection, None)
+    finally:
+        raw.close()
+    assert not any(s.startswith(("PRAGMA journal_mode=", "PRAGMA auto_vacuum=")) for s in statements)
+    assert "PRAGMA synchronous=NORMAL" in statements
+    engine.dispose()
+
+def test_default_profile_leaves_sqlite_stock(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'stock.db'}", profile="default")
+    assert _pragma(engine, "journal_mode") == "delete"
+    engine.dispose()
+
+def test_file_database_gets_an_instrumented_pool(monkeypatch, tmp_path):
+    monkeypatch.delenv("DB_POOL_SIZE", raising=False)
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'pooled.db'}", profile="production")
+    with engine.connect():
+        pass
+    stats = database.get_pool_stats(engine)
+    assert stats["pool_class"] == "InstrumentedQueuePool"
+    assert stats["size"] == database.BACKEND_POOL_DEFAULTS["sqlite"]["pool_size"]
+    assert stats["checkouts"] == 1
+    engine.dispose()
+
+def test_server_backends_get_their_pool_size_and_statement_timeout(monkeypatch):
+    monkeypatch.delenv("DB_POOL_SIZE", raising=False)
+    assert database._pool_settings("postgresql")["pool_size"] == database.BACKEND_POOL_DEFAULTS["postgresql"]["pool_size"]
+    monkeypatch.setenv("DB_POOL_SIZE", "3")
+    assert database._pool_settings("postgresql")["pool_size"] == 3
+
+    timeout_ms = database.DB_STATEMENT_TIMEOUT_MS
+    assert database._statement_timeout_args("postgresql", "psycopg2") == {"options": f"-c statement_timeout={timeout_ms}"}
+    assert database._statement_timeout_args("mysql", "pymysql") == {"init_command": f"SET SESSION max_execution_time={timeout_ms}"}
+    assert database._statement_timeout_args("postgresql", "asyncpg") == {}
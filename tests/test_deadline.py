@@ -0,0 +1,38 @@
+from conftest import quiz_body
+from database import init_db
+from services import pipeline
+
+def test_bad_deadline_header_is_rejected(client, fake_pipeline):
+    response = client.post("/api/submit-quiz", json=quiz_body(), headers={"X-Request-Deadline": "soon"})
+    assert response.status_code == 400
+    assert fake_pipeline.calls == []
+
+def test_tight_deadline_degrades_instead_of_overrunning(client, fake_pipeline, monkeypatch):
+    init_db()
+    # Starting guesses; earlier tests with instant fakes would otherwise have taught it anything fits
+    monkeypatch.setattr(pipeline, "_seconds_per_idea", {"eager": 8.0, "lazy": 2.0})
+
+    response = client.post(
+        "/api/submit-quiz",
+        json=quiz_body(company="Slow", website="slow-deadline.test"),
+        headers={"X-Request-Deadline": "5"}
+    )
+    body = response.json()
+
+    assert response.status_code == 200 and body["success"]
+    timing = body["timing"]
+    assert timing["deadline"] == 5 and timing["degraded"]
+    # No time to scrape: a placeholder summary, ideas only, and fewer of them
+    assert timing["degradations"] == ["placeholder_summary", "scripts_deferred", "fewer_ideas"]
+    assert "scrape" not in fake_pipeline.calls
+    assert body["script_mode"] == "lazy"
+    assert 0 < len(body["ideas"]) < pipeline.NUM_IDEAS
+
+def test_roomy_deadline_is_not_degraded(client, fake_pipeline, monkeypatch):
+    init_db()
+    monkeypatch.setattr(pipeline, "_seconds_per_idea", {"eager": 8.0, "lazy": 2.0})
+    body = client.post(
+        "/api/submit-quiz", json=quiz_body(company="Quick", website="quick-deadline.test", deadline_seconds=90)
+    ).json()
+    assert body["success"] and not body["timing"]["degraded"]
+    assert len(body["ideas"]) == pipeline.NUM_IDEAS and body["scripts"]
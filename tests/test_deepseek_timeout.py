@@ -0,0 +1,33 @@
+import asyncio
+import time
+from aiohttp import web
+from services import script_generator
+
+def test_stalled_deepseek_call_fails_without_a_request_deadline(monkeypatch):
+    async def run():
+        released = asyncio.Event()
+
+        async def stall(request):
+            await released.wait()
+            return web.json_response({})
+
+        app = web.Application()
+        app.router.add_post("/chat/completions", stall)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        monkeypatch.setattr(script_generator, "DEEPSEEK_API_URL", f"http://127.0.0.1:{port}/chat/completions")
+        monkeypatch.setattr(script_generator, "DEEPSEEK_TIMEOUT_SECONDS", 0.2)
+        try:
+            start = time.monotonic()
+            content = await script_generator.generate_all_content("style", "Technology", ["Acme builds widgets"])
+            return content, time.monotonic() - start
+        finally:
+            released.set()
+            await runner.cleanup()
+
+    content, seconds = asyncio.run(run())
+    assert content == {"ideas": [], "scripts": []}
+    assert seconds < 5
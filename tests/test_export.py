@@ -0,0 +1,38 @@
+import csv
+import io
+import json
+from conftest import quiz_body
+from database import init_db
+from services.exporter import EXPORT_COLUMNS, iter_export_rows
+
+def _submit(client) -> dict:
+    init_db()
+    body = client.post("/api/submit-quiz", json=quiz_body(company="Exported", website="exported.test")).json()
+    assert body["success"]
+    return body
+
+def test_ndjson_export_has_one_row_per_script(client, fake_pipeline):
+    submitted = _submit(client)
+    response = client.get("/api/export", params={"format": "ndjson"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    ours = [row for row in rows if row["result_id"] == submitted["result_id"]]
+    assert [row["script_content"] for row in ours] == [script["content"] for script in submitted["scripts"]]
+    assert ours[0]["company_name"] == "Exported"
+
+def test_csv_export_has_a_header_row(client, fake_pipeline):
+    submitted = _submit(client)
+    response = client.get("/api/export", params={"format": "csv"})
+    reader = csv.DictReader(io.StringIO(response.text))
+    assert reader.fieldnames == EXPORT_COLUMNS
+    assert any(row["result_id"] == str(submitted["result_id"]) for row in reader)
+
+def test_small_chunks_yield_the_same_rows_in_order(client, fake_pipeline):
+    _submit(client)
+    _submit(client)
+    assert list(iter_export_rows(chunk_size=1)) == list(iter_export_rows())
+
+def test_unknown_format_is_rejected(client):
+    assert client.get("/api/export", params={"format": "xml"}).status_code == 422
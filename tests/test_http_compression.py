@@ -0,0 +1,32 @@
+import json
+from conftest import quiz_body
+from database import init_db
+from utils.http_compression import choose_encoding
+
+def test_choose_encoding_honours_server_order_and_q_values():
+    assert choose_encoding(None) is None
+    assert choose_encoding("gzip, deflate", available=("br", "gzip")) == "gzip"
+    assert choose_encoding("gzip, br", available=("br", "gzip")) == "br"
+    assert choose_encoding("br;q=0, gzip;q=0.5", available=("br", "gzip")) == "gzip"
+    assert choose_encoding("*;q=0", available=("br", "gzip")) is None
+    assert choose_encoding("identity") is None
+
+def test_large_body_is_compressed_and_small_one_is_not(client):
+    large = client.get("/metrics", headers={"Accept-Encoding": "gzip"})
+    assert large.headers["content-encoding"] == "gzip"
+    assert "accept-encoding" in large.headers["vary"].lower()
+    assert "quiz_stage_duration_seconds" in large.text
+
+    small = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+
+def test_streamed_export_is_compressed_chunk_by_chunk(client, fake_pipeline):
+    init_db()
+    for i in range(3):
+        assert client.post("/api/submit-quiz", json=quiz_body(company=f"Zipped{i}", website=f"zipped{i}.test")).json()["success"]
+
+    response = client.get("/api/export", params={"format": "ndjson"}, headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert {"Zipped0", "Zipped1", "Zipped2"} <= {row["company_name"] for row in rows}
@@ -0,0 +1,70 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from conftest import quiz_body
+from database import SessionLocal, init_db
+from models.models import ScriptResult
+from services import shared_cache
+
+def _results() -> int:
+    db = SessionLocal()
+    try:
+        return db.query(ScriptResult).count()
+    finally:
+        db.close()
+
+def test_retry_is_replayed_from_the_stored_response(client, fake_pipeline):
+    init_db()
+    before = _results()
+    first = client.post("/api/submit-quiz", json=quiz_body(), headers={"Idempotency-Key": "replay-1"})
+    retry = client.post("/api/submit-quiz", json=quiz_body(), headers={"Idempotency-Key": "replay-1"})
+
+    assert first.status_code == retry.status_code == 200
+    assert first.json()["success"]
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.json()["result_id"] == first.json()["result_id"]
+    assert fake_pipeline.calls.count("generate_all") == 1
+    assert _results() == before + 1
+
+def test_key_reused_with_another_body_is_refused(client, fake_pipeline):
+    init_db()
+    assert client.post("/api/submit-quiz", json=quiz_body(), headers={"Idempotency-Key": "mismatch-1"}).status_code == 200
+    other = client.post("/api/submit-quiz", json=quiz_body(company="Beta"), headers={"Idempotency-Key": "mismatch-1"})
+    assert other.status_code == 422
+
+def test_concurrent_duplicates_run_once(client, fake_pipeline):
+    init_db()
+    fake_pipeline.delay = 0.3
+    before = _results()
+    def post(body):
+        return client.post("/api/submit-quiz", json=body, headers={"Idempotency-Key": "concurrent-1"})
+
+    with ThreadPoolExecutor(3) as pool:
+        first = pool.submit(post, quiz_body())
+        time.sleep(0.1)  # The first request owns the key; the others arrive while it runs
+        others = [pool.submit(post, body) for body in (quiz_body(company="Beta"), quiz_body())]
+        responses = [first.result()] + [future.result() for future in others]
+
+    assert sorted(r.status_code for r in responses) == [200, 200, 422]
+    ok = [r.json() for r in responses if r.status_code == 200]
+    assert ok[0]["result_id"] == ok[1]["result_id"]
+    assert fake_pipeline.calls.count("generate_all") == 1
+    assert _results() == before + 1
+
+def test_duplicate_waits_for_another_worker_within_its_deadline(client, fake_pipeline):
+    init_db()
+    # Another worker holds the key and keeps renewing its lease past this request's deadline
+    key = "idempotency:elsewhere-1"
+    owner = shared_cache.new_owner()
+    assert shared_cache.claim(key, owner, 60)
+    try:
+        response = client.post(
+            "/api/submit-quiz",
+            json=quiz_body(),
+            headers={"Idempotency-Key": "elsewhere-1", "X-Request-Deadline": "5"}
+        )
+    finally:
+        shared_cache.release(key, owner)
+
+    assert response.status_code == 409
+    assert response.headers["Retry-After"]
+    assert fake_pipeline.calls == []
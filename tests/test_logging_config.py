@@ -0,0 +1,40 @@
+import json
+import logging
+import queue
+from utils import logging_config
+from utils.logging_config import DroppingQueueHandler, JsonFormatter, SamplingFilter, get_payload_logger, truncate
+
+def _record(level: int, msg: str = "hello") -> logging.LogRecord:
+    return logging.LogRecord("services.test", level, __file__, 1, msg, None, None)
+
+def test_truncate_caps_long_bodies():
+    assert truncate("short", limit=10) == "short"
+    assert truncate("x" * 25, limit=10) == "xxxxxxxxxx... [15 more chars]"
+    assert truncate({"a": 1}, limit=100) == "{'a': 1}"
+
+def test_sampling_drops_info_but_keeps_warnings():
+    never = SamplingFilter(0.0)
+    assert not never.filter(_record(logging.INFO))
+    assert never.filter(_record(logging.WARNING))
+    assert SamplingFilter(1.0).filter(_record(logging.DEBUG))
+
+def test_full_queue_drops_instead_of_blocking(monkeypatch):
+    monkeypatch.setattr(DroppingQueueHandler, "dropped", 0)
+    handler = DroppingQueueHandler(queue.Queue(maxsize=1))
+    handler.handle(_record(logging.INFO, "kept"))
+    handler.handle(_record(logging.INFO, "dropped"))
+    assert handler.queue.qsize() == 1
+    assert DroppingQueueHandler.dropped == 1
+
+def test_json_formatter_writes_one_object_per_record():
+    line = JsonFormatter().format(_record(logging.ERROR, "broken ✅"))
+    entry = json.loads(line)
+    assert "\n" not in line
+    assert entry["level"] == "ERROR" and entry["logger"] == "services.test" and entry["msg"] == "broken ✅"
+
+def test_payload_logger_gets_one_sampling_filter(monkeypatch):
+    monkeypatch.setattr(logging_config, "LOG_PAYLOAD_SAMPLE_RATE", 0.0)
+    payload_logger = get_payload_logger("test_logging_config")
+    assert get_payload_logger("test_logging_config") is payload_logger
+    assert sum(isinstance(f, SamplingFilter) for f in payload_logger.filters) == 1
+    assert payload_logger.name == f"{logging_config.PAYLOAD_LOGGER_PREFIX}.test_logging_config"
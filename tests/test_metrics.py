@@ -0,0 +1,27 @@
+import re
+from conftest import quiz_body
+from database import init_db
+from utils.metrics import STAGE_SECONDS
+
+def _sample(text: str, series: str) -> float:
+    match = re.search(rf"^{re.escape(series)} (\S+)$", text, re.MULTILINE)
+    return float(match.group(1)) if match else 0.0
+
+def test_submission_is_counted_per_stage(client, fake_pipeline):
+    init_db()
+    before = {stage: STAGE_SECONDS.count(stage=stage) for stage in ("scrape", "content_generation", "db_write", "end_to_end")}
+    assert client.post("/api/submit-quiz", json=quiz_body(company="Measured", website="measured.test")).json()["success"]
+
+    for stage, count in before.items():
+        assert STAGE_SECONDS.count(stage=stage) == count + 1, stage
+
+    text = client.get("/metrics").text
+    assert _sample(text, 'quiz_stage_duration_seconds_count{stage="end_to_end"}') == before["end_to_end"] + 1
+    assert _sample(text, 'quiz_stage_duration_seconds_bucket{stage="end_to_end",le="+Inf"}') == before["end_to_end"] + 1
+    assert _sample(text, 'quiz_stage_duration_seconds_sum{stage="end_to_end"}') > 0
+
+def test_metrics_endpoint_is_prometheus_text(client):
+    response = client.get("/metrics", headers={"Accept-Encoding": "identity"})
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE quiz_stage_duration_seconds histogram" in response.text
+    assert "# TYPE quiz_db_pool_checkouts_total counter" in response.text
@@ -0,0 +1,67 @@
+import asyncio
+from aiohttp import web
+from conftest import local_site
+from services import negative_cache, scraper, shared_cache
+from services.scraper import PLACEHOLDER_MARKER
+from utils.task_supervisor import TaskSupervisor
+
+PAGE = """<html><head><title>Acme</title>
+<meta name="description" content="Acme builds collaborative widget software that helps distributed teams ship faster.">
+<script type="application/ld+json">{"@type": "Organization", "name": "Acme", "slogan": "Ship together",
+  "makesOffer": [{"name": "Acme Boards", "description": "Kanban boards"}], "areaServed": "Europe"}</script>
+</head><body></body></html>"""
+
+def test_unreachable_site_is_backed_off_then_reprobed(monkeypatch, tmp_path):
+    monkeypatch.setattr(shared_cache, "SHARED_CACHE_PATH", str(tmp_path / "shared_cache.db"))
+    # Every visit may probe, and probes run on this test's event loop
+    monkeypatch.setattr(negative_cache, "NEGATIVE_CACHE_PROBE_SECONDS", 0)
+    monkeypatch.setattr(negative_cache, "probe_supervisor", TaskSupervisor("site_probe_test", 2, 8, 15, 0))
+    site = {"status": 503, "hits": 0}
+
+    async def home(request):
+        site["hits"] += 1
+        if site["status"] != 200:
+            return web.Response(status=site["status"])
+        return web.Response(text=PAGE, content_type="text/html")
+
+    async def deepseek(request):
+        return web.json_response({"choices": [{"message": {"content": "Point one\nPoint two"}}], "usage": {}})
+
+    async def run():
+        async with local_site({("GET", "/"): home, ("POST", "/chat/completions"): deepseek}) as url:
+            monkeypatch.setattr(scraper, "DEEPSEEK_API_URL", f"{url}/chat/completions")
+            scrape = lambda: scraper.scrape_company_data("Acme", f"{url}/")
+
+            # The failed fetch is recorded
+            assert PLACEHOLDER_MARKER in await scrape()
+            assert site["hits"] == 1
+            entry = await asyncio.to_thread(negative_cache._backed_off, f"{url}/")
+            assert entry["failure"] == "http_503" and entry["failures"] == 1
+
+            # Inside the backoff: placeholder without a fetch
+            negative_cache.probe_supervisor.accepting = False
+            assert PLACEHOLDER_MARKER in await scrape()
+            await asyncio.sleep(0.3)
+            assert site["hits"] == 1
+
+            # ... and a background probe that fails again
+            negative_cache.probe_supervisor.accepting = True
+            assert PLACEHOLDER_MARKER in await scrape()
+            await asyncio.sleep(0.3)
+            assert site["hits"] == 2
+            entry = await asyncio.to_thread(negative_cache._backed_off, f"{url}/")
+            assert entry["failures"] == 2
+
+            # The site recovers: still backed off, but the probe clears the entry
+            site["status"] = 200
+            assert PLACEHOLDER_MARKER in await scrape()
+            await asyncio.sleep(0.3)
+            assert site["hits"] == 3
+            assert await asyncio.to_thread(negative_cache._backed_off, f"{url}/") is None
+
+            # The next visitor scrapes the recovered site
+            summary = await scrape()
+            assert PLACEHOLDER_MARKER not in summary
+            assert site["hits"] == 4
+
+    asyncio.run(run())
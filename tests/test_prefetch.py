@@ -0,0 +1,35 @@
+import asyncio
+from utils.task_supervisor import TaskSupervisor
+import main
+
+COMPANY = {"name": "Prefetch Co", "website_url": "prefetch.test"}
+
+def test_prefetch_is_deduplicated(client, fake_pipeline):
+    first = client.post("/api/pre-fetch-company", json=COMPANY).json()
+    again = client.post("/api/pre-fetch-company", json=COMPANY).json()
+    assert first["status"] == "fetching"
+    assert again["status"] in ("fetching", "cached")
+    assert fake_pipeline.calls.count("scrape") <= 1
+
+def test_full_prefetch_queue_answers_503_with_retry_after(client, fake_pipeline, monkeypatch):
+    monkeypatch.setattr(main.prefetch_supervisor, "queue_size", 0)
+    response = client.post("/api/pre-fetch-company", json={"name": "Busy Co", "website_url": "busy-prefetch.test"})
+    assert response.status_code == 503
+    assert int(response.headers["Retry-After"]) >= 1
+    assert fake_pipeline.calls == []
+
+def test_supervisor_times_out_and_forgets_jobs():
+    supervisor = TaskSupervisor("test_supervisor", concurrency=1, queue_size=1, timeout=0.05, result_ttl=0)
+
+    async def hang():
+        await asyncio.sleep(10)
+
+    async def run():
+        assert supervisor.submit("slow", hang) == "started"
+        assert supervisor.submit("slow", hang) == "duplicate"
+        await asyncio.sleep(0.2)
+        return supervisor.status("slow")
+
+    # Timed out, then evicted at once (result_ttl=0)
+    assert asyncio.run(run()) is None
+    assert supervisor.running == 0 and supervisor.queued == 0
@@ -0,0 +1,27 @@
+from services.question_bank import QUESTION_BANK_VERSION, QUESTIONS_ETAG
+
+def test_bank_is_served_with_etag_and_cache_headers(client):
+    # The test client asks for gzip by default
+    response = client.get("/api/quiz-questions", headers={"Accept-Encoding": "identity"})
+    assert response.status_code == 200
+    assert response.headers["etag"] == QUESTIONS_ETAG
+    assert "max-age" in response.headers["cache-control"]
+    assert response.json()["version"] == QUESTION_BANK_VERSION
+
+def test_matching_if_none_match_returns_304(client):
+    etag = client.get("/api/quiz-questions").headers["etag"]
+    response = client.get("/api/quiz-questions", headers={"If-None-Match": f"W/{etag}"})
+    assert response.status_code == 304
+    assert response.content == b""
+
+    stale = client.get("/api/quiz-questions", headers={"If-None-Match": '"something-else"'})
+    assert stale.status_code == 200
+
+def test_gzip_variant_has_its_own_etag(client):
+    response = client.get("/api/quiz-questions", headers={"Accept-Encoding": "gzip;q=1, br;q=0"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] != QUESTIONS_ETAG
+    assert response.json()["version"] == QUESTION_BANK_VERSION
+
+    # Either variant's ETag revalidates
+    assert client.get("/api/quiz-questions", headers={"If-None-Match": QUESTIONS_ETAG, "Accept-Encoding": "gzip"}).status_code == 304
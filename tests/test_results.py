@@ -0,0 +1,38 @@
+from conftest import quiz_body
+from database import init_db
+
+def _submit(client, company: str) -> int:
+    body = client.post("/api/submit-quiz", json=quiz_body(company=company, website=f"{company.lower()}.test")).json()
+    assert body["success"]
+    return body["result_id"]
+
+def test_pages_walk_every_result_once_newest_first(client, fake_pipeline):
+    init_db()
+    ours = [_submit(client, f"Paged{i}") for i in range(3)]
+
+    seen, cursor = [], None
+    while True:
+        page = client.get("/api/results", params={"limit": 2, **({"cursor": cursor} if cursor else {})}).json()
+        assert len(page["results"]) <= 2
+        seen.extend((r["created_at"], r["result_id"]) for r in page["results"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    ids = [result_id for _, result_id in seen]
+    assert len(ids) == len(set(ids))
+    assert seen == sorted(seen, reverse=True)
+    assert [result_id for result_id in ids if result_id in ours] == ours[::-1]
+
+def test_stored_result_matches_the_submit_response(client, fake_pipeline):
+    init_db()
+    submitted = client.post("/api/submit-quiz", json=quiz_body(company="Stored", website="stored.test")).json()
+    stored = client.get(f"/api/results/{submitted['result_id']}").json()
+    assert stored["user_info"]["company_name"] == "Stored"
+    assert [idea["title"] for idea in stored["ideas"]] == [idea["title"] for idea in submitted["ideas"]]
+    assert [script["content"] for script in stored["scripts"]] == [script["content"] for script in submitted["scripts"]]
+
+def test_bad_cursor_is_400_and_unknown_result_is_404(client):
+    init_db()
+    assert client.get("/api/results", params={"cursor": "not-a-cursor"}).status_code == 400
+    assert client.get("/api/results/999999999").status_code == 404
@@ -0,0 +1,42 @@
+import uuid
+from datetime import datetime, timedelta
+from database import SessionLocal, init_db
+from models.models import BatchEntry, BatchRun, IdempotencyKey, ScriptResult
+from services.result_store import save_submission
+from services.retention import archive_old_results
+
+def test_archiving_unlinks_idempotency_keys_and_batch_entries():
+    init_db()
+    db = SessionLocal()
+    try:
+        result = save_submission(
+            db,
+            user_info={"name": "n", "company_name": "Old", "website_url": "old.test"},
+            answers=[],
+            influencer="Gary",
+            influencer_style="style",
+            company_summary=["Old sells things"],
+            ideas=[{"title": "T", "concept": "c", "appeal": "a"}],
+            scripts=[{"title": "T", "content": "S"}],
+            summary_is_placeholder=False,
+            timing={"total": 1.0}
+        )
+        result.created_at = datetime.utcnow() - timedelta(days=400)
+        response = {"success": True, "result_id": result.id}
+        key = f"retention-{uuid.uuid4()}"
+        batch_id = str(uuid.uuid4())
+        db.add(IdempotencyKey(key=key, request_hash="h", result_id=result.id, response=response))
+        db.add(BatchRun(id=batch_id, request_hash="h", total=1))
+        db.add(BatchEntry(batch_id=batch_id, position=0, result_id=result.id, response=response))
+        db.commit()
+        result_id = result.id
+
+        archive_old_results(db, older_than_days=365)
+
+        assert db.query(ScriptResult).filter(ScriptResult.id == result_id).first() is None
+        assert db.query(IdempotencyKey).filter(IdempotencyKey.key == key).first() is None
+        entry = db.query(BatchEntry).filter(BatchEntry.batch_id == batch_id).one()
+        assert entry.result_id is None
+        assert entry.response == response
+    finally:
+        db.close()
@@ -0,0 +1,64 @@
+import asyncio
+from aiohttp import web
+from bs4 import BeautifulSoup
+from conftest import local_site
+from services import scraper, shared_cache
+from services.scraper import extract_metadata, metadata_completeness, summary_from_metadata
+
+PAGE = """<html><head><title>Acme</title>
+<meta name="description" content="Acme builds collaborative widget software that helps distributed teams ship faster.">
+<script type="application/ld+json">{"@graph": [
+  {"@type": "Organization", "name": "Acme", "slogan": "Ship together", "areaServed": {"name": "Europe"}},
+  {"@type": ["Product"], "name": "Acme Boards", "description": "Kanban boards for remote teams"},
+  {"@type": [{"a": 1}], "name": "Odd item"}
+]}</script>
+<script type="application/ld+json">{not json</script>
+</head><body></body></html>"""
+
+def test_extracts_structured_metadata_and_skips_malformed_items():
+    metadata = extract_metadata(BeautifulSoup(PAGE, "html.parser"))
+    assert metadata["name"] == "Acme"
+    assert metadata["offerings"] == [{"name": "Acme Boards", "description": "Kanban boards for remote teams"}]
+    assert metadata["audience"] == "Europe"
+    assert metadata_completeness(metadata) >= 0.7
+
+    summary = summary_from_metadata("Acme", metadata)
+    assert summary[0].startswith("Acme: Acme builds")
+    assert "Acme offers Acme Boards" in summary
+
+def test_page_without_metadata_scores_zero():
+    metadata = extract_metadata(BeautifulSoup("<html><p>Hello</p></html>", "html.parser"))
+    assert metadata_completeness(metadata) == 0
+    assert summary_from_metadata("Acme", metadata) == []
+
+def _deepseek_reply(summary: str) -> dict:
+    return {"choices": [{"message": {"content": summary}}], "usage": {}}
+
+def _scrape(monkeypatch, tmp_path, page: str):
+    """Scrape `page` from a local site with DeepSeek stubbed; returns (summary, DeepSeek calls)"""
+    monkeypatch.setattr(shared_cache, "SHARED_CACHE_PATH", str(tmp_path / "shared_cache.db"))
+    deepseek_calls = []
+
+    async def home(request):
+        return web.Response(text=page, content_type="text/html")
+
+    async def deepseek(request):
+        deepseek_calls.append(await request.json())
+        return web.json_response(_deepseek_reply("Point one\nPoint two"))
+
+    async def run():
+        async with local_site({("GET", "/"): home, ("POST", "/chat/completions"): deepseek}) as url:
+            monkeypatch.setattr(scraper, "DEEPSEEK_API_URL", f"{url}/chat/completions")
+            return await scraper.scrape_company_data("Acme", f"{url}/")
+
+    return asyncio.run(run()), deepseek_calls
+
+def test_complete_metadata_skips_the_llm_call(monkeypatch, tmp_path):
+    summary, deepseek_calls = _scrape(monkeypatch, tmp_path, PAGE)
+    assert summary == summary_from_metadata("Acme", extract_metadata(BeautifulSoup(PAGE, "html.parser")))
+    assert deepseek_calls == []
+
+def test_page_without_metadata_still_asks_the_llm(monkeypatch, tmp_path):
+    summary, deepseek_calls = _scrape(monkeypatch, tmp_path, "<html><p>Acme makes widgets for teams.</p></html>")
+    assert summary == ["Point one", "Point two"]
+    assert len(deepseek_calls) == 1
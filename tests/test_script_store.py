@@ -0,0 +1,69 @@
+import pytest
+from conftest import quiz_body
+from database import init_db
+from services import script_store
+
+@pytest.fixture
+def fake_writer(monkeypatch):
+    """Stand-ins for the per-idea DeepSeek calls; records what they were asked for"""
+    calls = []
+
+    async def generate_script(idea, influencer_style, company_data):
+        calls.append(("script", idea["title"]))
+        return f"Script for {idea['title']}"
+
+    async def generate_replacement_idea(influencer_style, industry, company_data, other_titles, rejected_title, with_script=True):
+        calls.append(("idea", rejected_title, industry))
+        idea = {"title": f"Instead of {rejected_title}", "concept": "new", "appeal": "new"}
+        return idea, ({"title": idea["title"], "content": f"Script for {idea['title']}"} if with_script else None)
+
+    monkeypatch.setattr(script_store, "generate_script", generate_script)
+    monkeypatch.setattr(script_store, "generate_replacement_idea", generate_replacement_idea)
+    monkeypatch.setattr(script_store, "SCRIPT_PREFETCH_FIRST", False)
+    return calls
+
+def _submit_lazy(client) -> dict:
+    init_db()
+    response = client.post("/api/submit-quiz", json=quiz_body(company="Lazy", website="lazy-scripts.test", script_mode="lazy"))
+    body = response.json()
+    assert body["success"] and body["script_mode"] == "lazy" and body["scripts"] == []
+    return body
+
+def test_lazy_script_is_written_once_for_the_idea_at_that_index(client, fake_pipeline, fake_writer):
+    result_id = _submit_lazy(client)["result_id"]
+    ideas = client.get(f"/api/results/{result_id}").json()["ideas"]
+
+    first = client.get(f"/api/results/{result_id}/scripts/2").json()
+    again = client.get(f"/api/results/{result_id}/scripts/2").json()
+
+    assert first["title"] == ideas[2]["title"]
+    assert first["generated"] and not again["generated"]
+    assert again["content"] == first["content"]
+    assert fake_writer == [("script", ideas[2]["title"])]
+    assert client.get(f"/api/results/{result_id}/scripts/{len(ideas)}").status_code == 404
+
+def test_regenerate_replaces_only_the_idea_at_that_index(client, fake_pipeline, fake_writer):
+    result_id = _submit_lazy(client)["result_id"]
+    before = client.get(f"/api/results/{result_id}").json()["ideas"]
+
+    response = client.post(f"/api/results/{result_id}/ideas/1/regenerate", params={"target": "idea"})
+    after = client.get(f"/api/results/{result_id}").json()["ideas"]
+
+    assert response.status_code == 200
+    assert response.json()["idea"]["title"] == f"Instead of {before[1]['title']}"
+    assert after[1] == response.json()["idea"]
+    assert after[:1] + after[2:] == before[:1] + before[2:]
+    # Written for the same industry as its siblings, not the answer-derived one kept for stats
+    assert fake_writer == [("idea", before[1]["title"], "Technology")]
+
+def test_script_for_a_replaced_idea_is_not_stored(client, fake_pipeline, fake_writer):
+    result_id = _submit_lazy(client)["result_id"]
+    started_for = script_store.load_idea(result_id, 0)
+
+    client.post(f"/api/results/{result_id}/ideas/0/regenerate", params={"target": "idea"})
+    # The script that was being written for the old idea finishes now
+    assert script_store.store_script(started_for["idea_id"], started_for["idea"], "Old script") is None
+
+    script = client.get(f"/api/results/{result_id}/scripts/0").json()
+    assert script["content"] == f"Script for {script['title']}"
+    assert script["title"].startswith("Instead of")
@@ -0,0 +1,149 @@
+import asyncio
+import pytest
+from services import shared_cache
+
+@pytest.fixture(autouse=True)
+def cache_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(shared_cache, "SHARED_CACHE_PATH", str(tmp_path / "shared_cache.db"))
+    monkeypatch.setattr(shared_cache, "POLL_INTERVAL_SECONDS", 0.01)
+
+def test_concurrent_callers_share_one_computation():
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return ["summary"]
+
+    async def run():
+        return await asyncio.gather(*(shared_cache.get_or_compute("company:acme.com", compute, 60) for _ in range(5)))
+
+    assert asyncio.run(run()) == [["summary"]] * 5
+    assert len(calls) == 1
+    assert shared_cache.get("company:acme.com") == ["summary"]
+
+def test_owner_cancellation_does_not_cancel_waiters():
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.2)
+        return ["summary"]
+
+    async def run():
+        owner = asyncio.create_task(shared_cache.get_or_compute("company:acme.com", compute, 60))
+        await asyncio.sleep(0.05)
+        waiter = asyncio.create_task(shared_cache.get_or_compute("company:acme.com", compute, 60))
+        await asyncio.sleep(0.05)
+        owner.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await owner
+        return await waiter
+
+    # The waiter takes over the computation instead of inheriting the cancellation
+    assert asyncio.run(run()) == ["summary"]
+    assert len(calls) == 2
+    assert shared_cache.get("company:acme.com") == ["summary"]
+    assert not shared_cache._inflight
+
+def test_waiter_cancellation_leaves_owner_running():
+    async def compute():
+        await asyncio.sleep(0.1)
+        return "value"
+
+    async def run():
+        owner = asyncio.create_task(shared_cache.get_or_compute("key", compute, 60))
+        await asyncio.sleep(0.02)
+        waiter = asyncio.create_task(shared_cache.get_or_compute("key", compute, 60))
+        await asyncio.sleep(0.02)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        return await owner
+
+    assert asyncio.run(run()) == "value"
+
+def test_failure_reaches_waiters_and_is_not_cached():
+    async def compute():
+        await asyncio.sleep(0.05)
+        raise RuntimeError("scrape failed")
+
+    async def run():
+        return await asyncio.gather(
+            *(shared_cache.get_or_compute("key", compute, 60) for _ in range(3)), return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert shared_cache.get("key") is None
+    assert not shared_cache.is_claimed("key")
+
+def test_none_result_is_not_cached():
+    async def compute():
+        return None
+
+    assert asyncio.run(shared_cache.get_or_compute("key", compute, 60)) is None
+    assert shared_cache.get("key") is None
+
+# Short enough that a waiter would see it lapse several times if the owner stopped renewing
+LEASE_SECONDS = 0.3
+
+def _other_worker(key: str, value, seconds: float, calls: list):
+    """Compute `key` the way another process would: its own lease, renewed while it works"""
+    async def work():
+        owner = shared_cache.new_owner()
+        assert shared_cache.claim(key, owner, LEASE_SECONDS)
+        keeper = asyncio.create_task(shared_cache.keep_lease(key, owner, LEASE_SECONDS))
+        calls.append(1)
+        await asyncio.sleep(seconds)
+        shared_cache.put(key, value, 60)
+        keeper.cancel()
+        shared_cache.release(key, owner)
+    return work()
+
+def test_waiter_outlasts_slow_owner_without_computing():
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return "local"
+
+    async def run():
+        other = asyncio.create_task(_other_worker("key", "shared", 4 * LEASE_SECONDS, calls))
+        await asyncio.sleep(0.02)
+        value = await shared_cache.get_or_compute("key", compute, 60, lease_seconds=LEASE_SECONDS)
+        await other
+        return value
+
+    # The owner runs for several lease lengths; it keeps renewing, so the waiter never takes over
+    assert asyncio.run(run()) == "shared"
+    assert len(calls) == 1
+
+def test_bounded_waiter_times_out_instead_of_computing():
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return "local"
+
+    async def run():
+        other = asyncio.create_task(_other_worker("key", "shared", 2 * LEASE_SECONDS, calls))
+        await asyncio.sleep(0.02)
+        with pytest.raises(asyncio.TimeoutError):
+            await shared_cache.get_or_compute("key", compute, 60, lease_seconds=LEASE_SECONDS, wait_seconds=0.1)
+        await other
+
+    asyncio.run(run())
+    assert len(calls) == 1
+
+def test_expired_lease_is_taken_over():
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return "value"
+
+    # A crashed owner: claimed, never renewed
+    assert shared_cache.claim("key", shared_cache.new_owner(), 0.05)
+    assert asyncio.run(shared_cache.get_or_compute("key", compute, 60)) == "value"
+    assert len(calls) == 1
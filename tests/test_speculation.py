@@ -0,0 +1,44 @@
+import asyncio
+from services import shared_cache, speculation
+
+USER_INFO = {"company_name": "Acme", "website_url": "acme.com"}
+
+def test_abandoned_sessions_are_pruned(tmp_path, monkeypatch):
+    monkeypatch.setattr(shared_cache, "SHARED_CACHE_PATH", str(tmp_path / "shared_cache.db"))
+    monkeypatch.setattr(speculation, "_active", {})
+    monkeypatch.setattr(speculation.speculation_supervisor, "result_ttl", 0)
+
+    async def generate(*args):
+        return None
+
+    monkeypatch.setattr(speculation, "_generate", generate)
+
+    async def run():
+        assert await speculation.speculate("abandoned", USER_INFO, []) == "started"
+        await asyncio.sleep(0.05)  # The speculation finishes; nobody ever submits
+        assert "abandoned" in speculation._active
+        monkeypatch.setattr(speculation, "_last_prune", 0.0)
+        await speculation.speculate("next", USER_INFO, [])
+        return dict(speculation._active)
+
+    active = asyncio.run(run())
+    assert "abandoned" not in active
+    assert "next" in active
+
+def test_speculation_generates_in_the_submit_script_mode(tmp_path, monkeypatch, fake_pipeline):
+    monkeypatch.setattr(shared_cache, "SHARED_CACHE_PATH", str(tmp_path / "shared_cache.db"))
+    monkeypatch.setattr(speculation, "_active", {})
+    user_info = {"company_name": "Lazy Co", "website_url": "lazy.test"}
+
+    async def run():
+        assert await speculation.speculate("lazy-1", user_info, [], script_mode="lazy") == "started"
+        lazy = await speculation.adopt("lazy-1", {"user_info": user_info, "script_mode": "lazy"})
+        assert await speculation.speculate("lazy-2", user_info, [], script_mode="lazy") == "started"
+        eager = await speculation.adopt("lazy-2", {"user_info": user_info, "script_mode": "eager"})
+        return lazy, eager
+
+    lazy, eager = asyncio.run(run())
+    assert lazy["content"]["scripts"] == [] and lazy["content"]["ideas"]
+    # Content speculated for lazy mode is not adopted by an eager submit
+    assert eager is None
+    assert "generate_all" not in fake_pipeline.calls
@@ -0,0 +1,18 @@
+import os
+import sqlite3
+import subprocess
+import sys
+
+BACKEND = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend")
+
+def test_importing_main_is_side_effect_free_and_defers_heavy_imports(tmp_path):
+    path = tmp_path / "untouched.db"
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{path}", "AUTO_MIGRATE": "false"}
+    script = "import sys, main; print(','.join(m for m in ('aiohttp', 'bs4') if m in sys.modules))"
+    output = subprocess.run([sys.executable, "-c", script], cwd=BACKEND, env=env, capture_output=True, text=True, check=True)
+
+    assert output.stdout.strip() == ""
+    # No schema work at import: the file is either absent or has no tables
+    if path.exists():
+        with sqlite3.connect(path) as connection:
+            assert connection.execute("SELECT count(*) FROM sqlite_master WHERE type = 'table'").fetchone()[0] == 0
@@ -0,0 +1,45 @@
+from datetime import datetime, timedelta
+from database import SessionLocal, init_db
+from models.models import ScriptResult
+from services.result_store import save_submission
+from services.retention import archive_old_results
+from services.stats import get_stats, rebuild_stats
+
+def _submit(db, days_ago: int, industry_answer: str):
+    result = save_submission(
+        db,
+        user_info={"name": "n", "company_name": "Acme", "website_url": "acme.com"},
+        answers=[{"question_id": 1, "answer": industry_answer}],
+        influencer="Gary",
+        influencer_style="style",
+        company_summary=["Acme builds widgets"],
+        ideas=[{"title": "T", "concept": "c", "appeal": "a"}],
+        scripts=[{"title": "T", "content": "S"}],
+        summary_is_placeholder=False,
+        industry=None,  # Rows from before the industry column
+        timing={"total": 1.5}
+    )
+    result.created_at = datetime.utcnow() - timedelta(days=days_ago)
+    db.commit()
+
+def test_rebuild_keeps_archived_history():
+    init_db()
+    db = SessionLocal()
+    try:
+        # Other tests share the database, so everything is measured against what is already there
+        live_before = db.query(ScriptResult).count()
+        rebuilt_before = rebuild_stats(db)
+        stats_before = get_stats(db, days=365)
+        latency_before = stats_before["latency"].get("total", {}).get("count", 0)
+
+        for days_ago in (0, 1, 200, 300):
+            _submit(db, days_ago, "A")
+        archive_old_results(db, older_than_days=90)
+        assert db.query(ScriptResult).count() == live_before + 2
+
+        assert rebuild_stats(db) == rebuilt_before + 4
+        stats = get_stats(db, days=365)
+        assert stats["total_submissions"] == stats_before["total_submissions"] + 4
+        assert stats["latency"]["total"]["count"] == latency_before + 4
+    finally:
+        db.close()
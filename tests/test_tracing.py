@@ -0,0 +1,45 @@
+import asyncio
+import pytest
+from utils import tracing
+from utils.tracing import TRACE_HEADER, Span, current_trace_id, parse_traceparent, span, traced
+
+@pytest.fixture
+def exported(monkeypatch):
+    """Finished spans, captured instead of exported"""
+    finished = []
+    monkeypatch.setattr(tracing._exporter, "submit", finished.append)
+    return finished
+
+def test_nested_spans_share_the_trace_and_link_to_their_parent(exported):
+    @traced("inner")
+    async def inner():
+        return current_trace_id()
+
+    async def run():
+        with span("outer") as outer:
+            return outer, await inner()
+
+    outer, inner_trace_id = asyncio.run(run())
+    assert inner_trace_id == outer.trace_id
+    child = next(s for s in exported if s.name == "inner")
+    assert child.parent_id == outer.span_id and child.trace_id == outer.trace_id
+    assert outer.parent_id is None
+    assert current_trace_id() is None
+
+def test_exception_marks_the_span_as_failed(exported):
+    with pytest.raises(ValueError):
+        with Span("failing"):
+            raise ValueError("bad input")
+    assert exported[-1].status == "error"
+    assert exported[-1].error == "ValueError: bad input"
+
+def test_request_continues_an_incoming_traceparent(client, exported):
+    trace_id, parent_id = "4bf92f3577b34da6a3ce929d0e0e4736", "00f067aa0ba902b7"
+    response = client.get("/", headers={"traceparent": f"00-{trace_id}-{parent_id}-01"})
+    assert response.headers[TRACE_HEADER] == trace_id
+    request_span = next(s for s in exported if s.name == "GET /")
+    assert request_span.parent_id == parent_id
+    assert request_span.attributes["http.status_code"] == 200
+
+    assert parse_traceparent("garbage") == (None, None)
+    assert client.get("/").headers[TRACE_HEADER] != trace_id